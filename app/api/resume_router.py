@@ -1,42 +1,197 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.models.resume import OptimizationRequest, OptimizationResponse, Resume
-from app.services.resume_optimizer import ResumeOptimizer
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.models.resume import (
+    BatchOptimizationRequest, OptimizationJob, OptimizationRequest, OptimizationResponse, Resume,
+    ResponseOptions
+)
+from app.services.job_queue import JobQueue, QueueFullError
+from app.utils.async_parser import ParserBusyError, ParserTimeoutError, get_document_parser
+from app.utils.document_parser import DocumentTooLargeError, detect_file_type
+from app.utils.lazy import lazy_import
+from app.utils.metrics import collect_timings, track_stage
+from app.utils.projection import project
+from app.utils.uploads import InvalidUploadError, UploadTooLargeError, receive_upload
+import asyncio
+import json
+import logging
 
 router = APIRouter(
     prefix="/api/resume",
     tags=["resume"]
 )
 
-resume_optimizer = ResumeOptimizer()
+logger = logging.getLogger(__name__)
+
+# Built on first request: importing langchain and creating the LLM client is slow
+resume_optimizer = lazy_import("app.services.resume_optimizer:get_resume_optimizer")
+document_parser = get_document_parser()
+job_queue = JobQueue.from_env(resume_optimizer)
+
+def _trim(result: OptimizationResponse, options: ResponseOptions) -> Dict[str, Any]:
+    return project(result, options.fields, options.exclude_fields, options.compact)
+
+def _format_sse(event: Dict[str, Any], options: Optional[ResponseOptions] = None) -> str:
+    """Encode an optimizer event as a Server-Sent Events message."""
+    payload = {key: value for key, value in event.items() if key != "event"}
+    if isinstance(payload.get("result"), OptimizationResponse):
+        payload["result"] = _trim(payload["result"], options or ResponseOptions())
+    return f"event: {event['event']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
 
 @router.post("/optimize", response_model=OptimizationResponse)
 async def optimize_resume(request: OptimizationRequest) -> OptimizationResponse:
     """
     Optimize a resume based on a job description.
+    Set include_timings for a per-stage timing breakdown in the response, and
+    fields, exclude_fields or compact to return a smaller response.
     """
     try:
-        return await resume_optimizer.optimize_resume(
-            resume=request.resume,
-            job_description=request.job_description,
-            optimization_level=request.optimization_level
-        )
+        with collect_timings() as timings:
+            result = await resume_optimizer.optimize_resume(
+                resume=request.resume,
+                job_description=request.job_description,
+                optimization_level=request.optimization_level,
+                mode=request.mode,
+                formatter=request.formatter
+            )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if request.include_timings:
+        result.timings = timings
+    if request.trims_response:
+        return JSONResponse(_trim(result, request))
+    return result
+
+@router.post("/optimize/jobs", response_model=OptimizationJob, status_code=202)
+async def submit_optimization_job(request: OptimizationRequest, http_request: Request,
+                                  response: Response) -> OptimizationJob:
+    """
+    Queue a resume optimization to run in the background.
+    Returns the job immediately; poll its Location for the status and result.
+    """
+    try:
+        job = await job_queue.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "10"})
+    response.headers["Location"] = str(
+        http_request.url_for("get_optimization_job", job_id=job.job_id)
+    )
+    return job
+
+@router.get("/optimize/jobs/{job_id}", response_model=OptimizationJob)
+async def get_optimization_job(job_id: str) -> OptimizationJob:
+    """
+    Status of a background optimization, with the result once it has succeeded.
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/optimize/stream")
+async def optimize_resume_stream(request: OptimizationRequest) -> StreamingResponse:
+    """
+    Optimize a resume, streaming tokens section by section as Server-Sent Events.
+    The final "done" event carries the full OptimizationResponse. Streaming is
+    sectioned by nature, so mode="one_shot" is rejected.
+    """
+    if request.mode != "sectioned":
+        raise HTTPException(
+            status_code=422, detail="Streaming only supports mode=\"sectioned\""
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in resume_optimizer.stream_optimize_resume(
+                resume=request.resume,
+                job_description=request.job_description,
+                optimization_level=request.optimization_level,
+                formatter=request.formatter
+            ):
+                yield _format_sse(event, request)
+        except Exception as e:
+            logger.error(f"Error during streaming optimization: {str(e)}", exc_info=True)
+            yield _format_sse({"event": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/optimize/batch")
+async def optimize_resume_batch(request: BatchOptimizationRequest) -> StreamingResponse:
+    """
+    Optimize one resume against many job descriptions, or many resumes against one.
+    Streams one JSON BatchOptimizationResult per line as each item completes.
+    """
+    async def result_stream() -> AsyncIterator[str]:
+        async for item in resume_optimizer.optimize_batch(
+            resumes=request.resume_list(),
+            job_descriptions=request.job_description_list(),
+            optimization_level=request.optimization_level,
+            mode=request.mode,
+            formatter=request.formatter
+        ):
+            if not request.trims_response:
+                yield item.model_dump_json() + "\n"
+                continue
+            payload = item.model_dump(mode="json", exclude={"result"}, exclude_none=request.compact)
+            if item.result is not None:
+                payload["result"] = _trim(item.result, request)
+            yield json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+# The body is read by receive_upload rather than a File parameter, so it is
+# documented here
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {"file": {"type": "string", "format": "binary"}},
+        "required": ["file"],
+    }}},
+}
+
+@router.post("/upload", openapi_extra={"requestBody": UPLOAD_REQUEST_BODY})
+async def upload_resume(request: Request) -> Resume:
+    """
+    Upload and parse a resume file (PDF or DOCX) sent as the "file" form field.
+
+    The file type is detected from its content, not its name. The upload is
+    read straight from the request body, so an oversized one is rejected
+    before (or as soon as) it exceeds the limit. Large uploads are spooled to
+    disk and parsed from there without blocking the event loop.
+    """
+    try:
+        upload = await receive_upload(request)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        file_type = await asyncio.to_thread(detect_file_type, upload.source)
+        if file_type is None:
+            raise HTTPException(status_code=415, detail="Unsupported file format. Please upload a PDF or DOCX file.")
+        with track_stage("parse"):
+            if upload.path is not None:
+                resume = await document_parser.parse_path(upload.path, file_type)
+            else:
+                resume = await document_parser.parse(upload.content, file_type)
+    except HTTPException:
+        raise
+    except ParserBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ParserTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Could not parse file: {str(e)}")
+    finally:
+        upload.close()
 
-@router.post("/upload")
-async def upload_resume(file: UploadFile = File(...)) -> Resume:
-    """
-    Upload and parse a resume file (PDF or DOCX).
-    """
-    # This is a placeholder for the actual file processing logic
-    # In a real implementation, this would:
-    # 1. Validate the file type
-    # 2. Parse the file content
-    # 3. Extract sections and metadata
-    # 4. Return a structured Resume object
-    
-    return Resume(
-        sections=[],
-        raw_text="Placeholder text",
-        metadata={"filename": file.filename}
-    ) 
\ No newline at end of file
+    resume.metadata = {**(resume.metadata or {}), "filename": upload.filename, "size": upload.size}
+    return resume
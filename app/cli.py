@@ -0,0 +1,262 @@
+"""
+Bulk resume rewriting from the command line.
+
+Optimizes every PDF/DOCX resume in a directory against every job description
+in a JSONL or CSV file, and appends one JSON line per (resume, job) pair to
+the output file as soon as it completes. The output doubles as the
+checkpoint: re-running the same command skips the pairs already written as
+succeeded, so an interrupted run picks up where it stopped and failed pairs
+are retried.
+
+Usage:
+    resume-rewriter RESUME_DIR JOBS.jsonl|JOBS.csv --output results.jsonl [--concurrency 8]
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from app.models.resume import JobDescription, Resume
+from app.utils.async_parser import AsyncDocumentParser, SUPPORTED_FILE_TYPES
+from app.utils.document_parser import detect_file_type
+from app.utils.tokens import load_encoding
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+@dataclass
+class JobEntry:
+    job_id: str
+    job: JobDescription
+
+@dataclass
+class RunSummary:
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+def load_jobs(path: str) -> List[JobEntry]:
+    """
+    Read job descriptions from JSONL (one object per line) or CSV (one row
+    each), with title and description fields and optional company and
+    requirements (a list, or ";"-separated in CSV). An "id" field names the
+    job in the output; see default_job_id otherwise.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [dict(row) for row in csv.DictReader(f)]
+        for row in rows:
+            if row.get("requirements"):
+                row["requirements"] = [item.strip() for item in row["requirements"].split(";") if item.strip()]
+            else:
+                row.pop("requirements", None)
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    entries = []
+    for row in rows:
+        job_id = str(row.pop("id", "") or "")
+        fields = {key: value for key, value in row.items() if value not in ("", None)}
+        job = JobDescription(**fields)
+        entries.append(JobEntry(job_id or default_job_id(job), job))
+    if len({entry.job_id for entry in entries}) != len(entries):
+        raise ValueError(f"Duplicate job ids in {path}")
+    return entries
+
+def default_job_id(job: JobDescription) -> str:
+    """
+    Id for a job without one: a hash of its title and description, so the
+    checkpoint still matches after the jobs file is reordered or edited
+    elsewhere.
+    """
+    payload = json.dumps([job.title, job.description], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+def find_resumes(directory: str) -> List[str]:
+    """PDF and DOCX files under directory, as sorted paths relative to it."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in (".pdf", ".docx"):
+                paths.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(paths)
+
+def load_checkpoint(output: str) -> Set[Tuple[str, str]]:
+    """
+    (resume, job_id) pairs already written as succeeded. A line cut short by
+    an interrupted write is removed so appending starts on a fresh line.
+    """
+    if not os.path.exists(output):
+        return set()
+    with open(output, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    finished = set()
+    for line in data.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if record.get("status") == "succeeded":
+            finished.add((record["resume"], record["job_id"]))
+    return finished
+
+def _append(out: TextIO, record: Dict) -> None:
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+def _pending(resumes: List[str], jobs: List[JobEntry],
+             finished: Set[Tuple[str, str]]) -> Iterator[Tuple[str, List[JobEntry]]]:
+    for resume in resumes:
+        todo = [entry for entry in jobs if (resume, entry.job_id) not in finished]
+        if todo:
+            yield resume, todo
+
+async def run_batch(resume_dir: str, jobs_path: str, output: str, optimizer=None,
+                    parser: Optional[AsyncDocumentParser] = None, optimization_level: float = 0.5,
+                    mode: str = "sectioned", concurrency: int = DEFAULT_CONCURRENCY,
+                    parse_workers: Optional[int] = None, formatter: str = "local") -> RunSummary:
+    """
+    Optimize every pending (resume, job) pair and append the results to output.
+
+    Resumes are parsed in the parser's process pool a few at a time, ahead of
+    the optimizations. At most `concurrency` pairs are optimized at once and
+    their LLM calls share one limit of the same size.
+    """
+    if optimizer is None:
+        from app.services.resume_optimizer import get_resume_optimizer
+        optimizer = get_resume_optimizer()
+    # No timeout: a slow document should not fail a run nobody is waiting on
+    parser = parser or AsyncDocumentParser(executor_type="process", max_workers=parse_workers, timeout=None)
+
+    # File access runs in threads so it never blocks the event loop
+    await load_encoding(optimizer.compactor.model)
+    jobs = await asyncio.to_thread(load_jobs, jobs_path)
+    prepared = {entry.job_id: optimizer.compactor.prepare_job(entry.job.description) for entry in jobs}
+    resumes = await asyncio.to_thread(find_resumes, resume_dir)
+    finished = await asyncio.to_thread(load_checkpoint, output)
+    summary = RunSummary(skipped=sum(1 for r in resumes for e in jobs if (r, e.job_id) in finished))
+    logger.info(f"{len(resumes)} resumes x {len(jobs)} jobs, {summary.skipped} pairs already done")
+
+    limiter = asyncio.Semaphore(concurrency)
+    queue: "asyncio.Queue[Optional[Tuple[str, Optional[Resume], Optional[str], JobEntry]]]" = (
+        asyncio.Queue(maxsize=concurrency * 2)
+    )
+    records: "asyncio.Queue[Optional[Dict]]" = asyncio.Queue(maxsize=concurrency)
+
+    async def parse(resume: str) -> Tuple[Optional[Resume], Optional[str]]:
+        path = os.path.join(resume_dir, resume)
+        try:
+            file_type = await asyncio.to_thread(detect_file_type, path)
+            if file_type not in SUPPORTED_FILE_TYPES:
+                return None, "Not a PDF or DOCX document"
+            return await parser.parse_path(path, file_type), None
+        except Exception as e:
+            return None, f"Could not parse resume: {str(e)}"
+
+    async def produce() -> None:
+        # Parse ahead of the optimizations, one document per parser worker
+        window: List[Tuple[str, List[JobEntry], asyncio.Task]] = []
+        pending = _pending(resumes, jobs, finished)
+        while True:
+            while len(window) < parser.max_workers:
+                item = next(pending, None)
+                if item is None:
+                    break
+                window.append((item[0], item[1], asyncio.create_task(parse(item[0]))))
+            if not window:
+                break
+            resume, todo, task = window.pop(0)
+            parsed, error = await task
+            for entry in todo:
+                await queue.put((resume, parsed, error, entry))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                await records.put(None)
+                return
+            resume_name, resume, error, entry = item
+            record = {"resume": resume_name, "job_id": entry.job_id}
+            if resume is not None:
+                try:
+                    result = await optimizer.optimize_resume(
+                        resume, entry.job, optimization_level, mode=mode, limiter=limiter,
+                        prepared_job=prepared[entry.job_id], formatter=formatter
+                    )
+                    record.update(status="succeeded", result=result.model_dump(mode="json"))
+                except Exception as e:
+                    logger.error(f"Error optimizing {resume_name} for job {entry.job_id}: {str(e)}")
+                    error = str(e)
+            if error is not None:
+                record.update(status="failed", error=error)
+            await records.put(record)
+
+    async def write(out: TextIO) -> None:
+        # A single writer keeps lines whole; it stops once every worker is done
+        done = 0
+        while done < concurrency:
+            record = await records.get()
+            if record is None:
+                done += 1
+                continue
+            await asyncio.to_thread(_append, out, record)
+            if record["status"] == "succeeded":
+                summary.succeeded += 1
+            else:
+                summary.failed += 1
+
+    out = await asyncio.to_thread(open, output, "a", encoding="utf-8")
+    tasks = [asyncio.create_task(write(out)), asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        parser.shutdown(wait=False)
+        out.close()
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(prog="resume-rewriter", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resume_dir", help="Directory of PDF/DOCX resumes, searched recursively")
+    parser.add_argument("jobs", help="Job descriptions, .jsonl or .csv")
+    parser.add_argument("--output", "-o", required=True, help="JSONL results file, also the checkpoint")
+    parser.add_argument("--level", type=float, default=0.5, help="Optimization level, 0.0 to 1.0")
+    parser.add_argument("--mode", choices=("sectioned", "one_shot"), default="sectioned")
+    parser.add_argument("--formatter", choices=("local", "llm"), default="local",
+                        help="Format sectioned results locally or with an extra LLM call")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Pairs optimized, and LLM calls made, at once")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Parser processes, 0 for min(4, CPUs)")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run_batch(
+        args.resume_dir, args.jobs, args.output, optimization_level=args.level, mode=args.mode,
+        concurrency=args.concurrency, parse_workers=args.parse_workers or None,
+        formatter=args.formatter
+    ))
+    print(f"{summary.succeeded} succeeded, {summary.failed} failed, {summary.skipped} already done",
+          file=sys.stderr)
+    if summary.failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import gradio as gr
-from app.utils.document_parser import DocumentParser
-from app.services.resume_optimizer import ResumeOptimizer
+from app.utils.async_parser import get_document_parser
+from app.services.optimization_session import SessionStore
 from app.models.resume import JobDescription
+from app.utils.lazy import lazy_import
+from app.utils.metrics import STAGE_IN_FLIGHT, record_stage, track_stage
+from typing import AsyncIterator, List
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -11,19 +15,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize the resume optimizer
-resume_optimizer = ResumeOptimizer()
+# Shared with the API, so both use one LLM connection pool and rate limit;
+# built on first use
+resume_optimizer = lazy_import("app.services.resume_optimizer:get_resume_optimizer")
+
+# Parses uploads in a worker pool so large documents don't block the event loop
+document_parser = get_document_parser()
+
+# Per-browser-session state, so repeat clicks only re-optimize what changed
+optimization_sessions = SessionStore()
 
 async def process_resume(
     resume_file,
     job_title: str,
     job_description: str,
     company_name: str,
-    optimization_level: float
-) -> tuple[str, str, float]:
+    optimization_level: float,
+    request: gr.Request = None
+) -> AsyncIterator[tuple[str, str, float]]:
     """
-    Process the resume and return the optimized version
+    Process the resume and stream the optimized version.
+
+    Yields (optimized_text, changes, match_score) tuples: the text grows as
+    section tokens arrive, and the last tuple holds the formatted resume,
+    the changes made and the match score. Gradio passes the request, whose
+    session hash selects the optimization session reused across clicks.
     """
+    # Measured by hand: a context-variable stage cannot span the yields below
+    start = time.perf_counter()
+    STAGE_IN_FLIGHT.inc(stage="process_resume")
     try:
         # Debug logging for inputs
         logger.info("Received inputs for resume processing:")
@@ -36,21 +56,23 @@ async def process_resume(
         # Check if file was uploaded
         if not resume_file:
             logger.warning("No resume file uploaded")
-            return "Error: Please upload a file.", "", 0.0
+            yield "Error: Please upload a file.", "", 0.0
+            return
             
         # Debug logging
         logger.debug(f"File type: {type(resume_file)}")
         logger.debug(f"File attributes: {dir(resume_file)}")
             
-        # Get the file content as bytes
+        # Get the file content as bytes, or the path of Gradio's temp file
+        file_path = None
+        file_content = None
         try:
             # Handle Gradio's NamedString type (which contains a file path)
             if str(type(resume_file).__name__) == 'NamedString':
                 file_name = resume_file.name
                 logger.debug(f"Processing NamedString file: {file_name}")
-                # Read the actual file from the path
-                with open(str(resume_file), 'rb') as f:
-                    file_content = f.read()
+                # The parser reads the temp file itself (memory-mapped for PDFs)
+                file_path = str(resume_file)
             # Handle Gradio file upload (new format)
             elif hasattr(resume_file, 'name') and hasattr(resume_file, 'orig_name'):
                 file_name = resume_file.orig_name  # Use the original filename
@@ -64,27 +86,36 @@ async def process_resume(
             else:
                 error_msg = f"Error: Invalid file format. Got type {type(resume_file)}"
                 logger.error(error_msg)
-                return error_msg, "", 0.0
+                yield error_msg, "", 0.0
+                return
         except Exception as e:
             error_msg = f"Error: Could not read file content: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            return error_msg, "", 0.0
+            yield error_msg, "", 0.0
+            return
         
         # Determine file type and parse accordingly
         if not file_name:
             logger.error("Could not determine file type - no filename available")
-            return "Error: Could not determine file type.", "", 0.0
+            yield "Error: Could not determine file type.", "", 0.0
+            return
             
         if file_name.lower().endswith('.pdf'):
-            logger.info(f"Parsing PDF file: {file_name}")
-            resume = DocumentParser.parse_pdf(file_content)
+            file_type = "pdf"
         elif file_name.lower().endswith('.docx'):
-            logger.info(f"Parsing DOCX file: {file_name}")
-            resume = DocumentParser.parse_docx(file_content)
+            file_type = "docx"
         else:
             error_msg = "Error: Unsupported file format. Please upload a PDF or DOCX file."
             logger.error(f"{error_msg} Got filename: {file_name}")
-            return error_msg, "", 0.0
+            yield error_msg, "", 0.0
+            return
+
+        logger.info(f"Parsing {file_type.upper()} file: {file_name}")
+        with track_stage("parse"):
+            if file_path is not None:
+                resume = await document_parser.parse_path(file_path, file_type)
+            else:
+                resume = await document_parser.parse(file_content, file_type)
             
         # Create job description object
         job_desc = JobDescription(
@@ -93,28 +124,46 @@ async def process_resume(
             company=company_name
         )
         
+        session_hash = getattr(request, "session_hash", None)
+        session = optimization_sessions.get(session_hash) if session_hash else None
+
         logger.info("Starting resume optimization")
-        # Optimize the resume
-        result = await resume_optimizer.optimize_resume(
+        # Optimize the resume, showing section tokens as they stream in
+        sections: List[str] = []
+        async for event in resume_optimizer.stream_optimize_resume(
             resume=resume,
             job_description=job_desc,
-            optimization_level=optimization_level
-        )
-        
-        # Format the changes made for display
-        changes_summary = "\n".join([f"• {change}" for change in result.changes_made])
-        logger.info(f"Resume optimization completed. Match score: {result.match_score}")
-        
-        return (
-            result.optimized_resume.raw_text,
-            changes_summary,
-            result.match_score
-        )
+            optimization_level=optimization_level,
+            session=session
+        ):
+            if event["event"] == "section_start":
+                sections.append("")
+            elif event["event"] == "token":
+                sections[-1] += event["text"]
+            elif event["event"] == "section_end":
+                sections[-1] = event["text"]
+            elif event["event"] == "formatted":
+                sections = [event["text"]]
+            elif event["event"] == "done":
+                result = event["result"]
+                # Format the changes made for display
+                changes_summary = "\n".join([f"• {change}" for change in result.changes_made])
+                logger.info(f"Resume optimization completed. Match score: {result.match_score}")
+                yield (
+                    result.optimized_resume.raw_text,
+                    changes_summary,
+                    result.match_score
+                )
+                return
+            yield "\n\n".join(sections), "", 0.0
         
     except Exception as e:
         error_msg = f"Error: {str(e)}"
         logger.error(error_msg, exc_info=True)
-        return error_msg, "", 0.0
+        yield error_msg, "", 0.0
+    finally:
+        STAGE_IN_FLIGHT.dec(stage="process_resume")
+        record_stage("process_resume", time.perf_counter() - start)
 
 # Create the Gradio interface
 def create_ui():
@@ -1,13 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.resume_router import router as resume_router
-from app.gradio_ui import create_ui
-import gradio as gr
+from fastapi.responses import PlainTextResponse
+from app.api.resume_router import job_queue, router as resume_router
+from app.utils.async_parser import get_document_parser
+from app.utils.compression import GZipMiddleware
+from app.utils.metrics import REGISTRY
+from app.utils.tokens import load_encoding
 from dotenv import load_dotenv
+import os
 
 # Load environment variables
 load_dotenv()
 
+# Set to false for API-only deployments: gradio is then never imported,
+# which makes cold starts several seconds faster
+SERVE_UI = os.getenv("SERVE_UI", "true").lower() == "true"
+
+# Responses of at least this many bytes are gzipped for clients that accept it
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+
 app = FastAPI(
     title="Resume Rewriter LLM",
     description="An AI-powered resume optimization service",
@@ -23,12 +34,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create Gradio UI
-ui = create_ui()
-app = gr.mount_gradio_app(app, ui, path="/")
+# Streamed responses (SSE, NDJSON) are left uncompressed so events are not held back
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
 
 # Include API routes for programmatic access
-app.include_router(resume_router, prefix="/api")
+app.include_router(resume_router)
+
+@app.on_event("startup")
+async def start_job_queue():
+    # Also resumes jobs left unfinished by the previous run
+    await job_queue.start()
+
+@app.on_event("startup")
+async def load_token_encoding():
+    # Otherwise the first request that counts tokens loads it on the event loop
+    await load_encoding(os.getenv("LLM_MODEL", "gpt-4-turbo-preview"))
+
+@app.on_event("shutdown")
+async def shutdown_job_queue():
+    await job_queue.stop()
+
+@app.on_event("shutdown")
+async def close_llm_provider():
+    # Imported here: the provider is only loaded once a request needs it
+    from app.services.llm_provider import close_llm_provider
+    await close_llm_provider()
+
+@app.on_event("shutdown")
+async def shutdown_document_parser():
+    get_document_parser().shutdown(wait=False)
 
 @app.get("/health")
 async def health_check():
@@ -37,8 +71,22 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage latencies, in-flight stages, LLM tokens and cost, and cache hits in Prometheus format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Import and include routers
 # This will be uncommented as we add more routes
 # from app.api import resume_router, jobs_router
 # app.include_router(resume_router.router)
-# app.include_router(jobs_router.router) 
\ No newline at end of file
+# app.include_router(jobs_router.router) 
+
+# Create Gradio UI. Mounted last: a mount at "/" matches every path, so
+# routes added after it would never be reached
+if SERVE_UI:
+    import gradio as gr
+    from app.gradio_ui import create_ui
+
+    ui = create_ui()
+    app = gr.mount_gradio_app(app, ui, path="/")
@@ -1,5 +1,10 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, model_validator
+from typing import Dict, List, Literal, Optional
+from app.utils.projection import field_tree
+import os
+
+# Largest number of (resume, job description) pairs accepted in one batch request
+BATCH_MAX_ITEMS = int(os.getenv("OPTIMIZER_BATCH_MAX_ITEMS", "50"))
 
 class ResumeSection(BaseModel):
     title: str
@@ -16,13 +21,93 @@ class JobDescription(BaseModel):
     company: Optional[str] = None
     requirements: Optional[List[str]] = None
 
-class OptimizationRequest(BaseModel):
+class ResponseOptions(BaseModel):
+    """Trims the OptimizationResponse sent back, to keep payloads small."""
+    fields: Optional[List[str]] = None  # Only these response fields, dotted for nested ones, e.g. "optimized_resume.sections"
+    exclude_fields: Optional[List[str]] = None  # Response fields to leave out, e.g. "original_resume"
+    compact: bool = False  # Leave out fields that are null or at their default value
+
+    @model_validator(mode="after")
+    def check_response_fields(self) -> "ResponseOptions":
+        for paths in (self.fields, self.exclude_fields):
+            if paths:
+                field_tree(OptimizationResponse, paths)
+        return self
+
+    @property
+    def trims_response(self) -> bool:
+        return bool(self.fields or self.exclude_fields or self.compact)
+
+class OptimizationRequest(ResponseOptions):
     resume: Resume
     job_description: JobDescription
     optimization_level: Optional[float] = 0.5  # 0.0 to 1.0, how aggressive the changes should be
+    mode: Literal["sectioned", "one_shot"] = "sectioned"  # one_shot rewrites and formats in a single LLM call
+    formatter: Literal["local", "llm"] = "local"  # llm formats sectioned results with an extra LLM call
+    include_timings: bool = False  # Add a per-stage timing breakdown to the response
+
+class SectionScore(BaseModel):
+    title: str
+    score: float  # 0.0 to 1.0, similarity of the section to the job description
+
+class MatchScore(BaseModel):
+    score: float  # 0.0 to 1.0, blend of similarity and keyword coverage
+    similarity: float  # BM25-weighted cosine similarity of resume and job description
+    keyword_coverage: Optional[float] = None  # Share of JobDescription.requirements found, if any
+    matched_keywords: List[str] = []
+    missing_keywords: List[str] = []
+    section_scores: List[SectionScore] = []
 
 class OptimizationResponse(BaseModel):
     original_resume: Resume
     optimized_resume: Resume
     changes_made: List[str]
-    match_score: float  # 0.0 to 1.0, how well the resume matches the job description 
\ No newline at end of file
+    match_score: float  # 0.0 to 1.0, how well the resume matches the job description
+    match_details: Optional[MatchScore] = None 
+    tokens_saved: int = 0
+    timings: Optional[Dict[str, float]] = None  # Seconds per stage, if requested; concurrent stages add up
+
+class BatchOptimizationRequest(ResponseOptions):
+    """Either one resume with many job descriptions, or many resumes with one job description."""
+    resume: Optional[Resume] = None
+    resumes: Optional[List[Resume]] = None
+    job_description: Optional[JobDescription] = None
+    job_descriptions: Optional[List[JobDescription]] = None
+    optimization_level: Optional[float] = 0.5
+    mode: Literal["sectioned", "one_shot"] = "sectioned"
+    formatter: Literal["local", "llm"] = "local"
+
+    @model_validator(mode="after")
+    def check_batch_shape(self) -> "BatchOptimizationRequest":
+        one_to_many = self.resume is not None and bool(self.job_descriptions)
+        many_to_one = bool(self.resumes) and self.job_description is not None
+        if one_to_many == many_to_one:
+            raise ValueError(
+                "Provide either resume with job_descriptions, or resumes with job_description"
+            )
+        items = len(self.resumes or ()) + len(self.job_descriptions or ())
+        if items > BATCH_MAX_ITEMS:
+            raise ValueError(f"A batch can have at most {BATCH_MAX_ITEMS} items, got {items}")
+        return self
+
+    def resume_list(self) -> List[Resume]:
+        return [self.resume] if self.resume is not None else list(self.resumes)
+
+    def job_description_list(self) -> List[JobDescription]:
+        return [self.job_description] if self.job_description is not None else list(self.job_descriptions)
+
+class BatchOptimizationResult(BaseModel):
+    index: int  # Position of the (resume, job description) pair in the batch
+    resume_index: int
+    job_index: int
+    result: Optional[OptimizationResponse] = None
+    error: Optional[str] = None
+class OptimizationJob(BaseModel):
+    """State of an optimization submitted to run in the background."""
+    job_id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: float  # Unix timestamps
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[OptimizationResponse] = None
+    error: Optional[str] = None
@@ -0,0 +1,158 @@
+from typing import Any, AsyncIterator, List, Optional
+import asyncio
+import json
+import math
+import os
+import random
+import re
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+import httpx
+import openai
+
+from app.services.match_scorer import tokenize
+from app.utils.tokens import CHARS_PER_TOKEN
+
+LATENCY_DISTRIBUTIONS = ("fixed", "lognormal", "heavy_tail")
+
+# Markers from the ResumeOptimizer prompt templates, used to tell the stages apart
+SECTION_MARKER = "Current Resume Section:"
+SECTION_END_MARKER = "Please rewrite this section"
+ONE_SHOT_MARKER = "Resume Sections (JSON):"
+ONE_SHOT_END_MARKER = "Please rewrite every section"
+JOB_MARKER = "Job Description:"
+FORMAT_MARKER = "preserving all content:"
+
+CHUNK_PATTERN = re.compile(r"\S+\s*|\s+")
+
+def _between(text: str, start: str, end: Optional[str] = None) -> str:
+    text = text.split(start, 1)[1]
+    if end is not None:
+        text = text.rsplit(end, 1)[0]
+    return text.strip()
+
+def rewrite_section(section_text: str, job_description: str) -> str:
+    """
+    Deterministic stand-in for an LLM section rewrite: one bullet per line,
+    plus a line listing the job description terms the section mentions.
+    """
+    lines = [line.strip().lstrip("•-* ").strip() for line in section_text.splitlines()]
+    bullets = [f"• {line[0].upper()}{line[1:]}" for line in lines if line]
+    section_terms = set(tokenize(section_text))
+    shared = list(dict.fromkeys(
+        term for term in tokenize(job_description) if term in section_terms
+    ))
+    if shared:
+        bullets.append(f"• Relevant to the role: {', '.join(shared[:5])}")
+    return "\n".join(bullets)
+
+def format_text(resume_text: str) -> str:
+    """Deterministic stand-in for the formatting pass: tidy whitespace only."""
+    lines = [line.rstrip() for line in resume_text.strip().splitlines()]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+class FakeChatModel:
+    """
+    Offline chat model for load tests and benchmarks.
+
+    Replies are computed from the prompt, so the same request always gets
+    the same rewrite. Latency to the first token is sampled from a fixed,
+    lognormal (median latency_ms) or heavy-tailed Pareto (minimum
+    latency_ms) distribution. The reply then streams at tokens_per_second.
+    A share of calls (error_rate) fails with the given HTTP status, raised
+    as the matching OpenAI error so retries behave as in production.
+    """
+
+    def __init__(self, model_name: str = "gpt-4-turbo-preview", latency: str = "fixed",
+                 latency_ms: float = 500.0, latency_sigma: float = 0.5, tail_alpha: float = 1.5,
+                 tokens_per_second: float = 50.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        self.model_name = f"fake-{model_name}"
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tail_alpha = tail_alpha
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_env(cls, model_name: str) -> "FakeChatModel":
+        seed = os.getenv("LLM_FAKE_SEED")
+        return cls(
+            model_name=model_name,
+            latency=os.getenv("LLM_FAKE_LATENCY", "fixed"),
+            latency_ms=float(os.getenv("LLM_FAKE_LATENCY_MS", "500")),
+            latency_sigma=float(os.getenv("LLM_FAKE_LATENCY_SIGMA", "0.5")),
+            tail_alpha=float(os.getenv("LLM_FAKE_TAIL_ALPHA", "1.5")),
+            tokens_per_second=float(os.getenv("LLM_FAKE_TOKENS_PER_SECOND", "50")),
+            error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", "0")),
+            error_status=int(os.getenv("LLM_FAKE_ERROR_STATUS", "503")),
+            seed=int(seed) if seed else None
+        )
+
+    def sample_latency(self) -> float:
+        """Seconds until the first token."""
+        base = self.latency_ms / 1000
+        if self.latency == "lognormal":
+            return self._random.lognormvariate(math.log(base), self.latency_sigma) if base > 0 else 0.0
+        if self.latency == "heavy_tail":
+            return base * self._random.paretovariate(self.tail_alpha)
+        return base
+
+    def reply(self, messages: List[Any]) -> str:
+        prompt = messages[-1].content
+        if ONE_SHOT_MARKER in prompt:
+            sections = json.loads(_between(prompt, ONE_SHOT_MARKER, ONE_SHOT_END_MARKER))
+            job_description = _between(prompt, JOB_MARKER, ONE_SHOT_MARKER)
+            return json.dumps({
+                "sections": [
+                    {"title": section["title"].upper(),
+                     "content": rewrite_section(section["content"], job_description)}
+                    for section in sections
+                ],
+                "changes": ["Rewrote every section as bullet points"]
+            }, ensure_ascii=False)
+        if SECTION_MARKER in prompt:
+            return rewrite_section(
+                _between(prompt, SECTION_MARKER, SECTION_END_MARKER),
+                _between(prompt, JOB_MARKER, SECTION_MARKER)
+            )
+        if FORMAT_MARKER in prompt:
+            return format_text(_between(prompt, FORMAT_MARKER))
+        return prompt
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate <= 0 or self._random.random() >= self.error_rate:
+            return
+        request = httpx.Request("POST", "https://fake-llm.local/v1/chat/completions")
+        response = httpx.Response(self.error_status, request=request)
+        message = f"Injected fake LLM error ({self.error_status})"
+        if self.error_status == 429:
+            raise openai.RateLimitError(message, response=response, body=None)
+        if self.error_status >= 500:
+            raise openai.InternalServerError(message, response=response, body=None)
+        raise openai.APIStatusError(message, response=response, body=None)
+
+    def _chunk_delay(self, chunk: str) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return len(chunk) / CHARS_PER_TOKEN / self.tokens_per_second
+
+    async def ainvoke(self, messages: List[Any]) -> AIMessage:
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        content = self.reply(messages)
+        await asyncio.sleep(self._chunk_delay(content))
+        return AIMessage(content=content)
+
+    async def astream(self, messages: List[Any]) -> AsyncIterator[AIMessageChunk]:
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        for chunk in CHUNK_PATTERN.findall(self.reply(messages)):
+            await asyncio.sleep(self._chunk_delay(chunk))
+            yield AIMessageChunk(content=chunk)
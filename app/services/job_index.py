@@ -0,0 +1,169 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+import itertools
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from app.services.match_scorer import tokenize
+from app.utils.metrics import CACHE_REQUESTS
+
+# splitmix64 finalizer constants, used to derive one hash function per signature position
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: a cheap, well-distributed 64-bit mix (wraps on overflow)."""
+    values = (values ^ (values >> np.uint64(30))) * _MIX_1
+    values = (values ^ (values >> np.uint64(27))) * _MIX_2
+    return values ^ (values >> np.uint64(31))
+
+@dataclass
+class JobMatch:
+    value: Any
+    similarity: float
+
+@dataclass
+class _Entry:
+    namespace: str
+    signature: np.ndarray
+    value: Any
+
+class JobIndex:
+    """
+    MinHash/LSH index over job description texts, used to find the result of
+    an earlier request for a reposted or lightly edited posting, which
+    exact-hash caching misses.
+
+    Each description becomes the set of its word shingles, summarized by a
+    MinHash signature: the share of positions where two signatures agree
+    estimates the Jaccard similarity of the two sets. Signatures are cut
+    into bands and only descriptions sharing a whole band with the query are
+    compared, so a lookup costs one signature and a few dict probes however
+    large the index grows. Entries only match within their namespace (e.g.
+    one resume and optimization level), and the least recently used are
+    evicted beyond max_entries; 0 disables the index.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 3, max_entries: int = 1024, seed: int = 1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be between 0 and 1")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        # Position i hashes a shingle as mix64(shingle ^ seed_i)
+        rng = np.random.default_rng(seed)
+        self._seeds = rng.integers(
+            0, np.iinfo(np.uint64).max, size=(num_perm, 1), dtype=np.uint64, endpoint=True
+        )
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, bytes], Set[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "JobIndex":
+        return cls(
+            threshold=float(os.getenv("JOB_INDEX_THRESHOLD", "0.85")),
+            num_perm=int(os.getenv("JOB_INDEX_NUM_PERM", "128")),
+            bands=int(os.getenv("JOB_INDEX_BANDS", "16")),
+            # Off unless configured: reuse across different postings must be asked for
+            max_entries=int(os.getenv("JOB_INDEX_MAX_ENTRIES", "0"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the text's word shingles, or None if it has no words."""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        size = min(self.shingle_size, len(tokens))
+        shingles = {
+            zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8"))
+            for i in range(len(tokens) - size + 1)
+        }
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        return _mix64(self._seeds ^ hashes).min(axis=1)
+
+    def _band_keys(self, namespace: str, signature: np.ndarray):
+        for band in range(self.bands):
+            yield namespace, band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _best_match(self, namespace: str, signature: np.ndarray) -> Optional[Tuple[int, float]]:
+        candidates: Set[int] = set()
+        for key in self._band_keys(namespace, signature):
+            candidates.update(self._buckets.get(key, ()))
+        best = None
+        for entry_id in candidates:
+            similarity = float(np.mean(self._entries[entry_id].signature == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (entry_id, similarity)
+        return best
+
+    def query(self, namespace: str, text: str) -> Optional[JobMatch]:
+        """The value stored for the most similar description at or above the threshold."""
+        if not self.enabled:
+            return None
+        signature = self.signature(text)
+        with self._lock:
+            best = self._best_match(namespace, signature) if signature is not None else None
+            if best is not None:
+                self._entries.move_to_end(best[0])
+                match = JobMatch(self._entries[best[0]].value, best[1])
+                self.hits += 1
+            else:
+                match = None
+                self.misses += 1
+        CACHE_REQUESTS.inc(cache="job_index", stage="optimize", result="hit" if match else "miss")
+        return match
+
+    def add(self, namespace: str, text: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        signature = self.signature(text)
+        if signature is None:
+            return
+        with self._lock:
+            best = self._best_match(namespace, signature)
+            if best is not None and best[1] == 1.0:
+                # Same shingles as an indexed description: refresh it rather than add a twin
+                self._entries[best[0]].value = value
+                self._entries.move_to_end(best[0])
+                return
+            entry_id = next(self._ids)
+            self._entries[entry_id] = _Entry(namespace, signature, value)
+            for key in self._band_keys(namespace, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for key in self._band_keys(entry.namespace, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
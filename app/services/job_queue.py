@@ -0,0 +1,234 @@
+from typing import List, Optional
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.models.resume import OptimizationJob, OptimizationRequest, OptimizationResponse
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(RuntimeError):
+    """Raised when too many optimization jobs are already queued or running."""
+
+class JobStore:
+    """
+    Optimization jobs persisted in a SQLite table, so queued and finished
+    jobs survive a restart.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+                "result TEXT, error TEXT, created_at REAL NOT NULL, "
+                "started_at REAL, finished_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+
+    def create(self, request: OptimizationRequest) -> OptimizationJob:
+        job = OptimizationJob(job_id=uuid.uuid4().hex, status="queued", created_at=time.time())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, request, created_at) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status, request.model_dump_json(), job.created_at)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[OptimizationJob]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, status, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, status, result, error, created_at, started_at, finished_at = row
+        return OptimizationJob(
+            job_id=job_id, status=status, created_at=created_at, started_at=started_at,
+            finished_at=finished_at, error=error,
+            result=OptimizationResponse.model_validate_json(result) if result else None
+        )
+
+    def get_request(self, job_id: str) -> Optional[OptimizationRequest]:
+        with self._lock:
+            row = self._conn.execute("SELECT request FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return OptimizationRequest.model_validate_json(row[0]) if row else None
+
+    def mark_running(self, job_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?",
+                (time.time(), job_id)
+            )
+
+    def mark_succeeded(self, job_id: str, result: OptimizationResponse) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, finished_at = ? WHERE job_id = ?",
+                (result.model_dump_json(), time.time(), job_id)
+            )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                (error, time.time(), job_id)
+            )
+
+    def requeue_unfinished(self) -> List[str]:
+        """Reset jobs interrupted by a restart to queued and return them oldest first."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [job_id for (job_id,) in rows]
+
+    def purge_finished(self, older_than: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (older_than,)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class JobQueue:
+    """
+    Runs optimization requests in the background on a bounded pool of workers.
+
+    Jobs are persisted in a JobStore; unfinished jobs are picked up again when
+    the queue starts. At most max_depth jobs may be queued or running at
+    once; beyond that submit() fails fast with QueueFullError. Finished jobs
+    are kept for result_ttl seconds.
+    """
+
+    def __init__(self, optimizer, path: str = "jobs.db", workers: int = 4,
+                 max_depth: int = 100, result_ttl: Optional[float] = 86400):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.optimizer = optimizer
+        self.path = path
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self._store: Optional[JobStore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._depth = 0
+
+    @classmethod
+    def from_env(cls, optimizer) -> "JobQueue":
+        ttl = float(os.getenv("JOB_RESULT_TTL", "86400"))
+        return cls(
+            optimizer,
+            path=os.getenv("JOB_QUEUE_PATH", "jobs.db"),
+            workers=int(os.getenv("JOB_QUEUE_WORKERS", "4")),
+            max_depth=int(os.getenv("JOB_QUEUE_MAX_DEPTH", "100")),
+            result_ttl=ttl if ttl > 0 else None
+        )
+
+    @property
+    def depth(self) -> int:
+        """Jobs queued or running."""
+        return self._depth
+
+    async def start(self) -> None:
+        """Open the store and start the workers; safe to call more than once."""
+        if self._tasks:
+            return
+        if self._store is None:
+            # Opened on first use so importing the app does not create the database
+            self._store = JobStore(self.path)
+        self._queue = asyncio.Queue()
+        self._purge()
+        for job_id in self._store.requeue_unfinished():
+            self._queue.put_nowait(job_id)
+        self._depth = self._queue.qsize()
+        if self._depth:
+            logger.info(f"Resuming {self._depth} unfinished optimization jobs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def submit(self, request: OptimizationRequest) -> OptimizationJob:
+        await self.start()
+        if self._depth >= self.max_depth:
+            raise QueueFullError(
+                f"Too many optimization jobs in progress ({self._depth}), try again later"
+            )
+        job = self._store.create(request)
+        self._depth += 1
+        self._queue.put_nowait(job.job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[OptimizationJob]:
+        await self.start()
+        return self._store.get(job_id)
+
+    def _purge(self) -> None:
+        if self.result_ttl is not None:
+            self._store.purge_finished(time.time() - self.result_ttl)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # A store error must not end the worker; only cancellation stops it
+                logger.error(f"Optimization job {job_id} could not be run: {str(e)}", exc_info=True)
+                self._mark_failed(job_id, str(e))
+            finally:
+                self._depth -= 1
+                self._queue.task_done()
+
+    def _mark_failed(self, job_id: str, error: str) -> None:
+        try:
+            self._store.mark_failed(job_id, error)
+        except Exception as e:
+            logger.error(f"Could not record optimization job {job_id} as failed: {str(e)}")
+
+    async def _run(self, job_id: str) -> None:
+        request = self._store.get_request(job_id)
+        if request is None:
+            return
+        self._store.mark_running(job_id)
+        try:
+            result = await self.optimizer.optimize_resume(
+                resume=request.resume,
+                job_description=request.job_description,
+                optimization_level=request.optimization_level,
+                mode=request.mode,
+                formatter=request.formatter
+            )
+        except asyncio.CancelledError:
+            # Left as running, so it is queued again on the next start
+            raise
+        except Exception as e:
+            logger.error(f"Optimization job {job_id} failed: {str(e)}", exc_info=True)
+            self._store.mark_failed(job_id, str(e))
+            return
+        self._store.mark_succeeded(job_id, result)
+        self._purge()
@@ -0,0 +1,67 @@
+from collections import defaultdict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import threading
+
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+from app.utils.metrics import CACHE_REQUESTS
+
+class LLMCache:
+    """
+    Content-addressed cache of LLM responses with per-stage hit/miss counters.
+
+    Keys are SHA-256 hashes of everything that determines the response (model
+    name, prompt template and the prompt inputs), so identical requests are
+    served without calling the LLM again.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 86400,
+                 path: Optional[str] = None, disk_max_entries: int = 10000):
+        disk = SQLiteCache(path, max_entries=disk_max_entries, ttl=ttl, table="llm_cache") if path else None
+        self._cache = TieredCache(LRUCache(max_entries=max_entries, ttl=ttl), disk)
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        ttl = float(os.getenv("LLM_CACHE_TTL", "86400"))
+        return cls(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+            ttl=ttl if ttl > 0 else None,
+            path=os.getenv("LLM_CACHE_PATH") or None,
+            disk_max_entries=int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "10000"))
+        )
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, stage: str, key: str) -> Optional[str]:
+        return self._count(stage, self._cache.get(key))
+
+    def set(self, stage: str, key: str, value: str) -> None:
+        self._cache.set(key, value)
+
+    async def aget(self, stage: str, key: str) -> Optional[str]:
+        """get() for callers on the event loop: the disk tier is read in a thread."""
+        return self._count(stage, await self._cache.aget(key))
+
+    async def aset(self, stage: str, key: str, value: str) -> None:
+        await self._cache.aset(key, value)
+
+    def _count(self, stage: str, value: Optional[str]) -> Optional[str]:
+        with self._lock:
+            self._stats[stage]["hits" if value is not None else "misses"] += 1
+        CACHE_REQUESTS.inc(cache="llm", stage=stage, result="hit" if value is not None else "miss")
+        return value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counts per stage, e.g. {"optimize_section": {"hits": 3, "misses": 1}}."""
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._stats.items()}
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,255 @@
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, List, Optional
+import asyncio
+import logging
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+import httpx
+import openai
+
+from app.services.fake_llm import FakeChatModel
+from app.utils.hedging import mark_sending, mark_waiting
+from app.utils.metrics import record_llm_usage
+from app.utils.rate_limit import TokenBucket
+from app.utils.tokens import count_tokens
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "openai": the OpenAI API; "fake": a deterministic local model for offline load tests
+LLM_BACKENDS = ("openai", "fake")
+
+# HTTP status codes worth retrying besides 5xx
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from Retry-After(-ms) headers."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+class LLMProvider:
+    """
+    Process-wide access to the LLM.
+
+    The backend ("openai" or "fake") and model are chosen by configuration;
+    the fake backend needs no API key. Every chat model handed out shares one keep-alive HTTP connection pool and
+    one pair of token buckets: requests per minute and tokens per minute.
+    Prompt tokens are charged before a call and completion tokens after it.
+    Retryable failures (connection errors, timeouts, 408/409/429 and 5xx) are
+    retried with full-jitter exponential backoff, waiting at least as long as
+    the provider's Retry-After header asks.
+    """
+
+    def __init__(self, backend: str = "openai", model: str = "gpt-4-turbo-preview",
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0, request_timeout: float = 60.0,
+                 requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_retries: int = 4, retry_base_delay: float = 1.0,
+                 retry_max_delay: float = 30.0, prompt_cost_per_1k: float = 0.0,
+                 completion_cost_per_1k: float = 0.0):
+        if backend not in LLM_BACKENDS:
+            raise ValueError(f"Unknown LLM backend: {backend}")
+        self.backend = backend
+        self.model = model
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.prompt_cost_per_1k = prompt_cost_per_1k
+        self.completion_cost_per_1k = completion_cost_per_1k
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> "LLMProvider":
+        return cls(
+            backend=os.getenv("LLM_BACKEND", "openai"),
+            model=os.getenv("LLM_MODEL", "gpt-4-turbo-preview"),
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")),
+            request_timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "60")),
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "0")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            retry_base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "1")),
+            retry_max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "30")),
+            prompt_cost_per_1k=float(os.getenv("LLM_PROMPT_COST_PER_1K", "0.01")),
+            completion_cost_per_1k=float(os.getenv("LLM_COMPLETION_COST_PER_1K", "0.03"))
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(self.request_timeout, connect=10.0)
+            )
+        return self._http_client
+
+    def chat_model(self, model_name: Optional[str] = None,
+                   temperature: float = 0.7) -> "RateLimitedChatModel":
+        model_name = model_name or self.model
+        if self.backend == "fake":
+            return RateLimitedChatModel(FakeChatModel.from_env(model_name), self)
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key not found in environment variables")
+        # Retries are handled here, so the OpenAI client must not retry as well
+        async_client = openai.AsyncOpenAI(
+            api_key=api_key, max_retries=0, http_client=self.http_client
+        ).chat.completions
+        llm = ChatOpenAI(
+            model_name=model_name,
+            temperature=temperature,
+            api_key=api_key,
+            max_retries=0,
+            async_client=async_client
+        )
+        return RateLimitedChatModel(llm, self)
+
+    async def acquire(self, prompt_tokens: int) -> None:
+        await self.request_bucket.acquire(1)
+        await self.token_bucket.acquire(prompt_tokens)
+
+    def record_completion(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """Charge the completion to the rate limit and record the call's usage and cost."""
+        self.token_bucket.debit(completion_tokens)
+        cost = (prompt_tokens * self.prompt_cost_per_1k
+                + completion_tokens * self.completion_cost_per_1k) / 1000
+        record_llm_usage(prompt_tokens, completion_tokens, cost)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retry number attempt + 1, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        backoff = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            # Jitter on top spreads out callers that were told to come back at the same time
+            return retry_after + backoff
+        return backoff
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+class RateLimitedChatModel:
+    """A backend chat model behind the provider's rate limits and retry policy."""
+
+    def __init__(self, llm: Any, provider: LLMProvider):
+        self.llm = llm
+        self.provider = provider
+
+    @property
+    def model_name(self) -> str:
+        return self.llm.model_name
+
+    @staticmethod
+    def _prompt_tokens(messages: List[Any], model_name: str) -> int:
+        return sum(count_tokens(message.content, model_name) for message in messages)
+
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        prompt_tokens = self._prompt_tokens(messages, self.model_name)
+        attempt = 0
+        while True:
+            # A hedged call is not hedged while it waits for the rate limit or
+            # backs off, only while its request is out
+            mark_waiting()
+            await self.provider.acquire(prompt_tokens)
+            mark_sending()
+            try:
+                response = await self.llm.ainvoke(messages)
+            except Exception as e:
+                delay = self.provider.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"LLM call failed ({str(e)}), retry {attempt} in {delay:.1f}s")
+                mark_waiting()
+                await asyncio.sleep(delay)
+                continue
+            self.provider.record_completion(
+                prompt_tokens, count_tokens(response.content, self.model_name)
+            )
+            return response
+
+    async def astream(self, messages: List[Any]) -> AsyncIterator[Any]:
+        """Stream chunks; a failure is only retried if nothing was streamed yet."""
+        prompt_tokens = self._prompt_tokens(messages, self.model_name)
+        attempt = 0
+        while True:
+            await self.provider.acquire(prompt_tokens)
+            completion = []
+            try:
+                async for chunk in self.llm.astream(messages):
+                    completion.append(chunk.content)
+                    yield chunk
+            except Exception as e:
+                delay = None if completion else self.provider.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"LLM stream failed ({str(e)}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                if completion:
+                    self.provider.record_completion(
+                        prompt_tokens, count_tokens("".join(completion), self.model_name)
+                    )
+            return
+
+_provider: Optional[LLMProvider] = None
+
+def get_llm_provider() -> LLMProvider:
+    """The process-wide LLMProvider, configured from the environment on first use."""
+    global _provider
+    if _provider is None:
+        _provider = LLMProvider.from_env()
+    return _provider
+
+async def close_llm_provider() -> None:
+    """Close the shared provider's connections, if it was ever created."""
+    if _provider is not None:
+        await _provider.aclose()
@@ -0,0 +1,148 @@
+from typing import Dict, List, Optional, Sequence
+import re
+
+import numpy as np
+
+from app.models.resume import JobDescription, MatchScore, Resume, SectionScore
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be been being below between both
+but by can could did do does doing down during each etc few for from further had has have
+having he her here hers him his how i if in into is it its itself just me more most my no nor
+not of off on once only or other our ours out over own per same she should so some such than
+that the their theirs them then there these they this those through to too under until up
+upon us very via was we were what when where which while who whom why will with within would
+you your yours
+""".split())
+
+# Words common to nearly every resume and job posting. They carry little
+# signal, so they get GENERIC_TERM_WEIGHT instead of the full weight of 1
+GENERIC_TERMS = frozenset("""
+ability able across build built building candidate company could create created degree
+design designed developed developing development environment excellent experience experienced
+help including job knowledge lead led looking manage managed management new plus preferred
+professional project projects provide required requirements responsibilities responsible role
+skills strong support team teams use used using work worked working year years
+""".split())
+GENERIC_TERM_WEIGHT = 0.3
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping tech terms like c++, c# and node.js intact."""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+class MatchScorer:
+    """
+    Local resume/job description match scoring.
+
+    Documents are weighted with BM25 term saturation, with lengths relative
+    to a fixed reference_length, and static term weights (GENERIC_TERMS count
+    for less), then compared by cosine similarity. Nothing depends on the
+    other documents in a call, so a pair scores the same alone or in a
+    batch. When a job description lists requirements, keyword coverage of
+    those requirements is blended in. Everything is computed with NumPy, so
+    scoring one resume against many job descriptions is a single matrix
+    product.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, similarity_weight: float = 0.6,
+                 reference_length: float = 100.0):
+        if not 0.0 <= similarity_weight <= 1.0:
+            raise ValueError("similarity_weight must be between 0 and 1")
+        self.k1 = k1
+        self.b = b
+        self.similarity_weight = similarity_weight
+        self.reference_length = reference_length
+
+    def score(self, resume: Resume, job_description: JobDescription) -> MatchScore:
+        return self.score_many(resume, [job_description])[0]
+
+    def score_many(self, resume: Resume,
+                   job_descriptions: Sequence[JobDescription]) -> List[MatchScore]:
+        """Score one resume against several job descriptions in one vectorized pass."""
+        if not job_descriptions:
+            return []
+        sections = [section for section in resume.sections if section.content.strip()]
+        resume_text = resume.raw_text or "\n".join(section.content for section in sections)
+
+        # Row 0 is the whole resume, then its sections, then the job descriptions
+        documents = [tokenize(resume_text)]
+        documents += [tokenize(section.content) for section in sections]
+        documents += [tokenize(f"{jd.title}\n{jd.description}") for jd in job_descriptions]
+        matrix = self._normalize(self._bm25_matrix(documents))
+
+        resume_vector = matrix[0]
+        section_matrix = matrix[1:1 + len(sections)]
+        jd_matrix = matrix[1 + len(sections):]
+        similarities = jd_matrix @ resume_vector                # (n_jd,)
+        section_similarities = section_matrix @ jd_matrix.T     # (n_sections, n_jd)
+
+        resume_tokens = set(documents[0])
+        results = []
+        for jd_index, jd in enumerate(job_descriptions):
+            similarity = float(np.clip(similarities[jd_index], 0.0, 1.0))
+            coverage, matched, missing = self._keyword_coverage(jd.requirements, resume_tokens)
+            if coverage is None:
+                score = similarity
+            else:
+                score = self.similarity_weight * similarity + (1 - self.similarity_weight) * coverage
+            results.append(MatchScore(
+                score=round(score, 4),
+                similarity=round(similarity, 4),
+                keyword_coverage=None if coverage is None else round(coverage, 4),
+                matched_keywords=matched,
+                missing_keywords=missing,
+                section_scores=[
+                    SectionScore(
+                        title=section.title,
+                        score=round(float(np.clip(section_similarities[i, jd_index], 0.0, 1.0)), 4)
+                    )
+                    for i, section in enumerate(sections)
+                ]
+            ))
+        return results
+
+    def _bm25_matrix(self, documents: List[List[str]]) -> np.ndarray:
+        vocabulary: Dict[str, int] = {}
+        for tokens in documents:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+        tf = np.zeros((len(documents), max(len(vocabulary), 1)), dtype=np.float64)
+        for row, tokens in enumerate(documents):
+            if tokens:
+                np.add.at(tf[row], [vocabulary[token] for token in tokens], 1.0)
+
+        lengths = tf.sum(axis=1, keepdims=True)
+        saturation = tf * (self.k1 + 1) / (
+            tf + self.k1 * (1 - self.b + self.b * lengths / self.reference_length) + 1e-12
+        )
+        weights = np.ones(tf.shape[1])
+        for token, column in vocabulary.items():
+            if token in GENERIC_TERMS:
+                weights[column] = GENERIC_TERM_WEIGHT
+        return saturation * weights
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    @staticmethod
+    def _keyword_coverage(requirements: Optional[List[str]], resume_tokens: set):
+        """A requirement is covered when all of its tokens appear in the resume."""
+        if not requirements:
+            return None, [], []
+        matched, missing = [], []
+        for requirement in requirements:
+            tokens = tokenize(requirement)
+            if not tokens:
+                continue
+            (matched if all(token in resume_tokens for token in tokens) else missing).append(requirement)
+        total = len(matched) + len(missing)
+        if total == 0:
+            return None, [], []
+        return len(matched) / total, matched, missing
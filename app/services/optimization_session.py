@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+
+from app.models.resume import ResumeSection
+from app.services.match_scorer import tokenize
+
+# Level changes up to this much reuse a section's previous rewrite, 0 re-runs on any change
+SESSION_LEVEL_TOLERANCE = float(os.getenv("SESSION_LEVEL_TOLERANCE", "0"))
+
+# Slack for float error, so e.g. 0.4 vs 0.3 counts as a 0.1 change
+_LEVEL_EPSILON = 1e-9
+
+# Sessions kept in memory for the UI, and seconds before an idle one is dropped
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "256"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "3600"))
+
+@dataclass
+class SectionResult:
+    text: str
+    changes: List[str]
+    optimization_level: float
+
+class OptimizationSession:
+    """
+    Remembers the previous run's section rewrites so a repeat request only
+    re-optimizes the sections whose inputs changed.
+
+    A section's inputs are its title and content, the optimization level and
+    the job description lines that share a term with the section. Editing a
+    job description line that no section mentions, or re-running with the
+    same inputs, reuses the earlier rewrites. The formatting pass is skipped
+    when the merged sections are unchanged.
+    """
+
+    def __init__(self, level_tolerance: float = SESSION_LEVEL_TOLERANCE):
+        self.level_tolerance = level_tolerance
+        self._sections: Dict[str, SectionResult] = {}
+        self._formatted: Optional[Tuple[str, str]] = None
+        self.reused = 0
+        self.optimized = 0
+
+    @staticmethod
+    def relevant_lines(section_text: str, job_text: str) -> List[str]:
+        """Job description lines sharing at least one term with the section."""
+        terms: Set[str] = set(tokenize(section_text))
+        return [
+            line.strip() for line in job_text.splitlines()
+            if terms.intersection(tokenize(line))
+        ]
+
+    def section_key(self, section: ResumeSection, job_text: str) -> str:
+        payload = json.dumps(
+            [section.title, section.content, self.relevant_lines(section.content, job_text)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str, optimization_level: float) -> Optional[SectionResult]:
+        result = self._sections.get(key)
+        if result is None or (abs(result.optimization_level - optimization_level)
+                              > self.level_tolerance + _LEVEL_EPSILON):
+            return None
+        self.reused += 1
+        return result
+
+    def remember(self, key: str, text: str, changes: List[str], optimization_level: float) -> None:
+        self.optimized += 1
+        self._sections[key] = SectionResult(text, list(changes), optimization_level)
+
+    def copy(self) -> "OptimizationSession":
+        """A new session that starts from this one's results, with its own counters."""
+        session = OptimizationSession(self.level_tolerance)
+        session._sections = dict(self._sections)
+        session._formatted = self._formatted
+        return session
+
+    def formatted_for(self, raw_text: str) -> Optional[str]:
+        if self._formatted is not None and self._formatted[0] == raw_text:
+            return self._formatted[1]
+        return None
+
+    def remember_formatted(self, raw_text: str, formatted_text: str) -> None:
+        self._formatted = (raw_text, formatted_text)
+
+    def retain(self, keys: Iterable[str]) -> None:
+        """Drop results for sections that are no longer part of the resume."""
+        keep = set(keys)
+        self._sections = {key: value for key, value in self._sections.items() if key in keep}
+
+class SessionStore:
+    """Per-client OptimizationSession objects, evicted when idle or over capacity."""
+
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES,
+                 ttl: Optional[float] = SESSION_TTL or None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Tuple[OptimizationSession, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> OptimizationSession:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None or (self.ttl is not None and now - entry[1] > self.ttl):
+                session = OptimizationSession()
+            else:
+                session = entry[0]
+            self._sessions[session_id] = (session, now)
+            while len(self._sessions) > max(self.max_entries, 1):
+                self._sessions.popitem(last=False)
+            return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+from typing import List, Optional
+import os
+import re
+
+from app.utils.section_segmenter import KNOWN_HEADINGS
+from app.utils.tokens import CHARS_PER_TOKEN, count_tokens
+
+# Lines that are boilerplate wherever they appear in a job description
+BOILERPLATE_LINE_PATTERNS = [
+    r"equal (employment )?opportunity",
+    r"\beeo\b",
+    r"without regard to (race|age|sex|gender|religion|color)",
+    r"reasonable accommodations?",
+    r"\b(protected )?veteran status\b",
+    r"\be-?verify\b",
+    r"background (check|screening)",
+    r"drug[- ]free workplace",
+    r"privacy (policy|notice)",
+    r"\bapply (now|today)\b",
+    r"recruit(ment|ing) agencies",
+]
+
+# Headings that start a boilerplate block, dropped up to the next heading
+BOILERPLATE_HEADINGS = [
+    r"benefits?", r"perks( and benefits)?", r"what we offer", r"why (join|work (with|for)) us",
+    r"about (us|the company)", r"who we are", r"our (culture|values|mission)", r"compensation",
+    r"equal (employment )?opportunity.*", r"eeo( statement)?", r"how to apply",
+]
+
+BOILERPLATE_LINE = re.compile("|".join(BOILERPLATE_LINE_PATTERNS), re.IGNORECASE)
+BOILERPLATE_HEADING = re.compile(
+    r"^\W*(" + "|".join(BOILERPLATE_HEADINGS) + r")\W*$", re.IGNORECASE
+)
+HEADING_LINE = re.compile(r"^\W*[A-Za-z][A-Za-z ,&/'\-]{0,50}:?\s*$")
+
+# Sections sent through without an LLM call regardless of length. Not
+# "header": parsers put everything before the first heading there, which is
+# the whole resume when a document has no headings
+NON_REWRITABLE_TITLES = frozenset({
+    "contact", "contact information", "contact info", "personal information",
+    "personal details", "references",
+})
+
+# Email addresses, phone numbers and URLs, the marks of a contact block
+CONTACT_DETAIL = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\d[\d ().-]{7,}\d|https?://\S+|www\.\S+|linkedin\.com/\S+",
+    re.IGNORECASE
+)
+
+@dataclass
+class PreparedJob:
+    """A job description compacted once per request and reused for every LLM call."""
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+class PromptCompactor:
+    """
+    Shrinks prompts before they are sent to the LLM.
+
+    Job descriptions are stripped of boilerplate (benefits, EEO statements,
+    company blurbs) and duplicate lines once per request, then trimmed to a
+    token budget. Each section call is kept within call_token_budget by
+    trimming the job description further; resume content is never cut.
+    Sections that are trivially short or not worth rewriting (contact
+    details, references) are passed through without an LLM call. So is a
+    short block of contact details (up to contact_max_tokens, with an email,
+    phone number or URL) when the resume has other sections to rewrite, but
+    only under a title that is not a known resume heading, such as the
+    "Header" text before the first heading: a Summary or Projects section
+    with a portfolio link is still rewritten.
+    """
+
+    def __init__(self, job_token_budget: int = 1500, call_token_budget: int = 3000,
+                 min_job_tokens: int = 200, passthrough_max_tokens: int = 8,
+                 contact_max_tokens: int = 60, model: str = "gpt-4"):
+        self.job_token_budget = job_token_budget
+        self.call_token_budget = call_token_budget
+        self.min_job_tokens = min_job_tokens
+        self.passthrough_max_tokens = passthrough_max_tokens
+        self.contact_max_tokens = contact_max_tokens
+        self.model = model
+
+    @classmethod
+    def from_env(cls) -> "PromptCompactor":
+        return cls(
+            job_token_budget=int(os.getenv("PROMPT_JOB_TOKEN_BUDGET", "1500")),
+            call_token_budget=int(os.getenv("PROMPT_CALL_TOKEN_BUDGET", "3000")),
+            min_job_tokens=int(os.getenv("PROMPT_MIN_JOB_TOKENS", "200")),
+            passthrough_max_tokens=int(os.getenv("PROMPT_PASSTHROUGH_MAX_TOKENS", "8"))
+        )
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def prepare_job(self, description: str) -> PreparedJob:
+        """Strip boilerplate and duplicates from a job description and apply the budget."""
+        original_tokens = self.count(description)
+        text = self.truncate(self.strip_boilerplate(description), self.job_token_budget)
+        return PreparedJob(text=text, original_tokens=original_tokens, tokens=self.count(text))
+
+    def job_for_section(self, job: PreparedJob, section_text: str,
+                        overhead_tokens: int = 0) -> str:
+        """The job description text to send with a section, within the per-call budget."""
+        available = self.call_token_budget - overhead_tokens - self.count(section_text)
+        budget = max(available, self.min_job_tokens)
+        if job.tokens <= budget:
+            return job.text
+        return self.truncate(job.text, budget)
+
+    def is_passthrough(self, title: str, content: str, section_count: int = 1) -> bool:
+        normalized = " ".join(title.lower().strip().rstrip(":").split())
+        if normalized in NON_REWRITABLE_TITLES:
+            return True
+        tokens = self.count(content)
+        if tokens <= self.passthrough_max_tokens:
+            return True
+        return (section_count > 1 and normalized not in KNOWN_HEADINGS
+                and tokens <= self.contact_max_tokens
+                and CONTACT_DETAIL.search(content) is not None)
+
+    @staticmethod
+    def strip_boilerplate(text: str) -> str:
+        kept: List[str] = []
+        seen = set()
+        in_boilerplate = False
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                if kept and kept[-1]:
+                    kept.append("")
+                continue
+            if BOILERPLATE_HEADING.match(stripped):
+                in_boilerplate = True
+                continue
+            if in_boilerplate:
+                # A new (non-boilerplate) heading ends the block
+                if HEADING_LINE.match(stripped) and len(stripped.split()) <= 6:
+                    in_boilerplate = False
+                else:
+                    continue
+            if BOILERPLATE_LINE.search(stripped):
+                continue
+            key = " ".join(stripped.lower().split())
+            if key in seen:
+                continue
+            seen.add(key)
+            kept.append(stripped)
+        return "\n".join(kept).strip()
+
+    def truncate(self, text: str, budget: Optional[int]) -> str:
+        """Cut text at a line boundary so that it fits within budget tokens."""
+        if budget is None or self.count(text) <= budget:
+            return text
+        kept: List[str] = []
+        used = 0
+        for line in text.splitlines():
+            line_tokens = self.count(line) + 1
+            if used + line_tokens > budget:
+                break
+            kept.append(line)
+            used += line_tokens
+        if not kept:
+            # A single oversized line: fall back to an approximate character cut
+            return text[:budget * CHARS_PER_TOKEN].strip()
+        return "\n".join(kept).strip()
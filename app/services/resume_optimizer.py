@@ -1,7 +1,22 @@
-from typing import List, Tuple
-from app.models.resume import Resume, JobDescription, OptimizationResponse
-from langchain_openai import ChatOpenAI
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from app.models.resume import (
+    BatchOptimizationResult, JobDescription, MatchScore, OptimizationResponse, Resume, ResumeSection
+)
 from langchain.prompts import ChatPromptTemplate
+from app.services.job_index import JobIndex
+from app.services.llm_cache import LLMCache
+from app.services.llm_provider import get_llm_provider
+from app.services.match_scorer import MatchScorer
+from app.services.optimization_session import OptimizationSession
+from app.services.prompt_compactor import PreparedJob, PromptCompactor
+from app.utils.hedging import HedgePolicy
+from app.utils.metrics import STAGE_ERRORS, timed_stage, track_stage
+from app.utils.resume_formatter import format_resume_text
+from app.utils.single_flight import SingleFlight
+from contextlib import nullcontext
+import asyncio
+import itertools
+import json
 import os
 from dotenv import load_dotenv
 import logging
@@ -11,17 +26,54 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of section rewrites in flight at once for a single resume
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("OPTIMIZER_MAX_CONCURRENCY", "4"))
+
+# Shared LLM call budget for all items of a batch optimization
+DEFAULT_BATCH_MAX_CONCURRENCY = int(os.getenv("OPTIMIZER_BATCH_MAX_CONCURRENCY", "8"))
+
+# "sectioned": one LLM call per section plus a formatting pass (see FORMATTERS)
+# "one_shot": a single structured call that rewrites and formats every section
+OPTIMIZATION_MODES = ("sectioned", "one_shot")
+
+# How sectioned mode formats the merged resume: "local" applies the
+# formatting rules in code, "llm" makes the extra formatting LLM call
+FORMATTERS = ("local", "llm")
+
+# Change note recorded for sections that are returned without an LLM call
+PASSTHROUGH_CHANGE = "Section kept as is (no rewrite needed)"
+
+# Change notes of sections whose rewrite failed start with this
+SECTION_ERROR_PREFIX = "Error during optimization"
+
+# Added to the change notes of a result reused for a near-identical job description
+JOB_REUSE_CHANGE = "Reused section rewrites from a near-identical job description"
+
 class ResumeOptimizer:
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OpenAI API key not found in environment variables")
-            
-        self.llm = ChatOpenAI(
-            model_name="gpt-4-turbo-preview",
-            temperature=0.7,
-            api_key=api_key
+    def __init__(self, max_concurrency: Optional[int] = None, cache: Optional[LLMCache] = None,
+                 job_index: Optional[JobIndex] = None, hedge_policy: Optional[HedgePolicy] = None):
+        self.max_concurrency = (
+            DEFAULT_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
         )
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.cache = cache if cache is not None else LLMCache.from_env()
+        # Earlier results per resume, found by near-duplicate job description
+        self.job_index = job_index if job_index is not None else JobIndex.from_env()
+        self.scorer = MatchScorer()
+        self.compactor = PromptCompactor.from_env()
+        # Identical section rewrites and formatting calls in flight at the
+        # same time (e.g. many requests for one popular posting) share one LLM call
+        self._section_flight = SingleFlight("optimize_section")
+        self._format_flight = SingleFlight("format_resume")
+        # Duplicates section calls stuck in the latency tail; off unless LLM_HEDGE_BUDGET is set
+        self.hedge_policy = hedge_policy or HedgePolicy.from_env("optimize_section")
+
+        # Backend and model come from LLM_BACKEND and LLM_MODEL. The llm shares
+        # the connection pool and rate limits with every other optimizer
+        self.llm = get_llm_provider().chat_model(temperature=0.7)
+        # Names the backend too, so fake responses are never cached for a real model
+        self.model_name = self.llm.model_name
         
         self.optimization_prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an expert resume writer and career coach. Your task is to optimize 
@@ -68,75 +120,641 @@ class ResumeOptimizer:
             ("user", "Please format this resume while preserving all content: {resume_text}")
         ])
 
+        self.one_shot_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert resume writer and career coach. Your task is to optimize 
+                      every section of a resume to better match a job description while maintaining 
+                      truthfulness and professional standards, and to return it fully formatted.
+
+                      Format each section's content following these rules:
+                      1. Use clear section headers in ALL CAPS (e.g., EXPERIENCE, EDUCATION)
+                      2. Use consistent spacing - one blank line between entries, no double spacing
+                      3. Use bullet points (•) for listing achievements and responsibilities
+                      4. Align dates to the right for experience and education entries
+                      5. Use bold for job titles and company names (wrap in ** for markdown)
+                      6. Remove any unnecessary whitespace, tabs and trailing whitespace
+                      7. Ensure consistent indentation for bullet points
+                      8. Use proper line breaks to separate different entries
+                      9. Format contact information in a clean, professional header
+                      10. Use a consistent date format (e.g., MM/YYYY)
+
+                      Respond with a single JSON object and nothing else, of the form:
+                      {{"sections": [{{"title": "...", "content": "..."}}], "changes": ["..."]}}
+                      Return exactly one entry in "sections" per input section, in the same order."""),
+            ("user", """Job Description: {job_description}
+
+                    Resume Sections (JSON): {resume_sections}
+
+                    Please rewrite every section to better match the job description while maintaining 
+                    truthfulness, and list the changes you made. Optimization level: {optimization_level}""")
+        ])
+
+        # Template text per stage, part of every cache key so that editing a
+        # prompt invalidates the responses cached for it
+        self._prompt_templates = {
+            "optimize_section": self._template_text(self.optimization_prompt),
+            "format_resume": self._template_text(self.formatting_prompt),
+            "one_shot": self._template_text(self.one_shot_prompt),
+        }
+        self._template_tokens = {
+            stage: self.compactor.count(text) for stage, text in self._prompt_templates.items()
+        }
+
+    @staticmethod
+    def _template_text(prompt: ChatPromptTemplate) -> str:
+        return "\n".join(message.prompt.template for message in prompt.messages)
+
+    def _cache_key(self, stage: str, *parts) -> str:
+        return LLMCache.make_key(self.model_name, self._prompt_templates[stage], *parts)
+
+    @timed_stage("optimize")
     async def optimize_resume(self, resume: Resume, job_description: JobDescription, 
-                            optimization_level: float = 0.5) -> OptimizationResponse:
+                            optimization_level: float = 0.5,
+                            mode: str = "sectioned",
+                            limiter: Optional[asyncio.Semaphore] = None,
+                            prepared_job: Optional[PreparedJob] = None,
+                            session: Optional[OptimizationSession] = None,
+                            formatter: str = "local") -> OptimizationResponse:
+        """
+        Optimize a resume for a job description.
+
+        If a limiter is given, every LLM call made for this resume acquires it,
+        which lets several optimizations share one concurrency budget. A
+        prepared_job (see PromptCompactor.prepare_job) skips compacting the
+        job description again when it is reused across calls. With a session,
+        sectioned mode only re-optimizes the sections whose inputs changed
+        since the session's previous run. Without one, and if the JobIndex is
+        enabled, a sectioned run for a job description nearly identical to one
+        this resume was optimized for before starts from that run's results
+        as if it were a session: only the sections that share a term with a
+        changed job description line are re-optimized.
+        The formatter picks how sectioned mode formats the merged resume (see
+        FORMATTERS); one-shot mode formats within its single call.
+        """
+        if mode not in OPTIMIZATION_MODES:
+            raise ValueError(f"Unknown optimization mode: {mode}")
+        if formatter not in FORMATTERS:
+            raise ValueError(f"Unknown formatter: {formatter}")
+
+        index_key = None
+        match = None
+        if session is None and mode == "sectioned" and self.job_index.enabled:
+            # The optimization level is part of the key, so no tolerance is needed
+            index_key = self._job_index_key(resume, optimization_level, mode, formatter)
+            match = self.job_index.query(index_key, job_description.description)
+            session = match.value.copy() if match is not None else OptimizationSession(0.0)
+
+        job = prepared_job or self.compactor.prepare_job(job_description.description)
+
+        result = None
+        if mode == "one_shot":
+            result = await self._optimize_one_shot(
+                resume, job, optimization_level, limiter
+            )
+            if result is None:
+                logger.warning("One-shot optimization failed, falling back to sectioned mode")
+        if result is None:
+            result = await self._optimize_sectioned(
+                resume, job, optimization_level, limiter, session, formatter
+            )
+        sections, formatted_text, changes_made, tokens_saved = result
+        if match is not None and session.reused:
+            changes_made = changes_made + [
+                f"{JOB_REUSE_CHANGE} for {session.reused} of {len(sections)} sections "
+                f"(similarity {match.similarity:.2f})"
+            ]
+        response = await self._build_response(
+            resume, job_description, sections, formatted_text, changes_made, tokens_saved
+        )
+        if index_key is not None:
+            # Failed sections are not remembered by the session, so they are retried
+            self.job_index.add(index_key, job_description.description, session)
+        return response
+
+    def _job_index_key(self, resume: Resume, optimization_level: float, mode: str,
+                       formatter: str = "local") -> str:
+        """Namespace of a resume's JobIndex entries: everything but the job description."""
+        return LLMCache.make_key(
+            self.model_name, self._prompt_templates, mode, formatter, optimization_level,
+            [(section.title, section.content) for section in resume.sections], resume.metadata
+        )
+
+    async def optimize_batch(self, resumes: List[Resume], job_descriptions: List[JobDescription],
+                             optimization_level: float = 0.5, mode: str = "sectioned",
+                             max_concurrency: Optional[int] = None, formatter: str = "local"
+                             ) -> AsyncIterator[BatchOptimizationResult]:
+        """
+        Optimize one resume against many job descriptions, or many resumes against one.
+
+        All LLM calls of the batch share a single concurrency budget, and
+        results are yielded as soon as each item completes, in completion
+        order. Items are started as earlier ones finish, at most as many at
+        once as the budget allows. A failing item yields a result with an
+        error instead of aborting the batch.
+        """
+        if len(resumes) != 1 and len(job_descriptions) != 1:
+            raise ValueError("A batch needs either one resume or one job description")
+        if mode not in OPTIMIZATION_MODES:
+            raise ValueError(f"Unknown optimization mode: {mode}")
+        if formatter not in FORMATTERS:
+            raise ValueError(f"Unknown formatter: {formatter}")
+        window = max_concurrency or DEFAULT_BATCH_MAX_CONCURRENCY
+        limiter = asyncio.Semaphore(window)
+        # Each resume is shared by every pair it appears in, and each job
+        # description is compacted once for all of its pairs. Token counting
+        # is CPU work, so it runs off the event loop
+        shared_job = None
+        if len(job_descriptions) == 1:
+            shared_job = await asyncio.to_thread(
+                self.compactor.prepare_job, job_descriptions[0].description
+            )
+        pairs = (
+            (resume_index, job_index)
+            for resume_index in range(len(resumes))
+            for job_index in range(len(job_descriptions))
+        )
+
+        async def run(index: int, resume_index: int, job_index: int) -> BatchOptimizationResult:
+            try:
+                prepared_job = shared_job or await asyncio.to_thread(
+                    self.compactor.prepare_job, job_descriptions[job_index].description
+                )
+                response = await self.optimize_resume(
+                    resumes[resume_index], job_descriptions[job_index],
+                    optimization_level, mode=mode, limiter=limiter,
+                    prepared_job=prepared_job, formatter=formatter
+                )
+                return BatchOptimizationResult(
+                    index=index, resume_index=resume_index, job_index=job_index, result=response
+                )
+            except Exception as e:
+                logger.error(f"Error optimizing batch item {index}: {str(e)}", exc_info=True)
+                return BatchOptimizationResult(
+                    index=index, resume_index=resume_index, job_index=job_index, error=str(e)
+                )
+
+        pending = enumerate(pairs)
+        running: Set[asyncio.Task] = set()
+        try:
+            while True:
+                for index, (resume_index, job_index) in itertools.islice(
+                    pending, window - len(running)
+                ):
+                    running.add(asyncio.create_task(run(index, resume_index, job_index)))
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def stream_optimize_resume(self, resume: Resume, job_description: JobDescription,
+                                     optimization_level: float = 0.5,
+                                     session: Optional[OptimizationSession] = None,
+                                     formatter: str = "local"
+                                     ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Optimize a resume in sectioned mode, yielding progress events as tokens arrive.
+
+        Sections are rewritten concurrently (bounded by max_concurrency) but
+        their events are emitted strictly in section order:
+          {"event": "section_start", "index": i, "title": ...}
+          {"event": "token", "index": i, "text": ...}
+          {"event": "section_end", "index": i, "text": <final section text>, "changes": [...]}
+          {"event": "formatted", "text": <formatted resume>}
+          {"event": "done", "result": OptimizationResponse}
+        A section that fails mid-stream ends with its original text in
+        "section_end", so clients should replace the streamed tokens with it.
+        With a session, unchanged sections replay their previous rewrite as a
+        single token event.
+        """
+        if formatter not in FORMATTERS:
+            raise ValueError(f"Unknown formatter: {formatter}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        queues: List[asyncio.Queue] = [asyncio.Queue() for _ in resume.sections]
+        job = self.compactor.prepare_job(job_description.description)
+        job_texts, tokens_saved = self._plan_sections(resume.sections, job)
+        session_keys = self._session_keys(session, resume.sections, job_texts)
+
+        async def produce(index: int, section_text: str, job_text: Optional[str]) -> None:
+            queue = queues[index]
+            key = session_keys[index]
+            previous = session.lookup(key, optimization_level) if key else None
+            if job_text is None or previous is not None:
+                text, changes = (
+                    (section_text, [PASSTHROUGH_CHANGE]) if previous is None
+                    else (previous.text, previous.changes)
+                )
+                queue.put_nowait({"event": "token", "text": text})
+                queue.put_nowait({"event": "section_end", "text": text, "changes": changes})
+                queue.put_nowait(None)
+                return
+            async with semaphore:
+                try:
+                    with track_stage("optimize_section"):
+                        async for event in self._stream_section(
+                            section_text, job_text, optimization_level
+                        ):
+                            if event["event"] == "section_end" and key:
+                                self._remember_section(
+                                    session, key, event["text"], event["changes"], optimization_level
+                                )
+                            queue.put_nowait(event)
+                finally:
+                    queue.put_nowait(None)
+
+        producers = [
+            asyncio.create_task(produce(index, section.content, job_text))
+            for index, (section, job_text) in enumerate(zip(resume.sections, job_texts))
+        ]
         optimized_sections = []
         changes_made = []
-        
-        for section in resume.sections:
-            optimized_section, changes = await self._optimize_section(
-                section.content,
-                job_description.description,
-                optimization_level
-            )
-            optimized_sections.append(optimized_section)
-            changes_made.extend(changes)
-            
-        # Join sections and apply final formatting
-        raw_optimized_text = "\n\n".join(optimized_sections)
-        
-        # Apply additional formatting pass
-        formatted_text = await self._format_resume(raw_optimized_text)
-            
+        try:
+            for index, section in enumerate(resume.sections):
+                yield {"event": "section_start", "index": index, "title": section.title}
+                while (event := await queues[index].get()) is not None:
+                    if event["event"] == "section_end":
+                        optimized_sections.append(event["text"])
+                        changes_made.extend(event["changes"])
+                    yield {**event, "index": index}
+        finally:
+            for producer in producers:
+                producer.cancel()
+
+        formatted_text = await self._format_merged(
+            "\n\n".join(optimized_sections), session, session_keys, formatter
+        )
+        yield {"event": "formatted", "text": formatted_text}
+
+        response = await self._build_response(
+            resume, job_description, self._with_contents(resume.sections, optimized_sections),
+            formatted_text, changes_made, tokens_saved
+        )
+        yield {"event": "done", "result": response}
+
+    async def _build_response(self, resume: Resume, job_description: JobDescription,
+                              sections: List[ResumeSection], formatted_text: str,
+                              changes_made: List[str], tokens_saved: int = 0) -> OptimizationResponse:
         optimized_resume = Resume(
-            sections=[
-                section for section in resume.sections
-            ],
+            sections=sections,
             raw_text=formatted_text,
             metadata=resume.metadata
         )
         
-        match_score = await self._calculate_match_score(
-            optimized_resume.raw_text,
-            job_description.description
+        match_details = await self._calculate_match_score(
+            optimized_resume,
+            job_description
         )
         
         return OptimizationResponse(
             original_resume=resume,
             optimized_resume=optimized_resume,
             changes_made=changes_made,
-            match_score=match_score
+            match_score=match_details.score,
+            match_details=match_details,
+            tokens_saved=tokens_saved
         )
 
-    async def _format_resume(self, resume_text: str) -> str:
+    def _plan_sections(self, sections: List[ResumeSection],
+                       job: PreparedJob) -> Tuple[List[Optional[str]], int]:
+        """
+        Decide per section which job description text to send, or None to pass
+        the section through without an LLM call, and estimate the tokens this
+        saves compared to sending the full job description with every section.
+        """
+        job_texts: List[Optional[str]] = []
+        tokens_saved = 0
+        overhead = self._template_tokens["optimize_section"]
+        for section in sections:
+            if self.compactor.is_passthrough(section.title, section.content, len(sections)):
+                job_texts.append(None)
+                # The whole call is skipped: prompt plus a rewrite of similar length
+                section_tokens = self.compactor.count(section.content)
+                tokens_saved += overhead + job.original_tokens + 2 * section_tokens
+                continue
+            job_text = self.compactor.job_for_section(job, section.content, overhead)
+            job_texts.append(job_text)
+            tokens_saved += job.original_tokens - self.compactor.count(job_text)
+        return job_texts, tokens_saved
+
+    @staticmethod
+    def _session_keys(session: Optional[OptimizationSession], sections: List[ResumeSection],
+                      job_texts: List[Optional[str]]) -> List[Optional[str]]:
+        """Per-section session keys, None for passthrough sections or without a session."""
+        return [
+            session.section_key(section, job_text) if session and job_text is not None else None
+            for section, job_text in zip(sections, job_texts)
+        ]
+
+    @staticmethod
+    def _remember_section(session: OptimizationSession, key: str, text: str,
+                          changes: List[str], optimization_level: float) -> None:
+        # Failed sections are retried on the next run rather than replayed
+        if not any(change.startswith(SECTION_ERROR_PREFIX) for change in changes):
+            session.remember(key, text, changes, optimization_level)
+
+    async def _format_merged(self, raw_text: str, session: Optional[OptimizationSession],
+                             session_keys: List[Optional[str]], formatter: str = "local",
+                             limiter: Optional[asyncio.Semaphore] = None) -> str:
+        """
+        Formatting pass. The LLM call holds the limiter and is skipped when the
+        session already formatted the same sections.
+        """
+        if session is not None:
+            session.retain(key for key in session_keys if key)
+        if formatter == "local":
+            with track_stage("format_local"):
+                return format_resume_text(raw_text)
+        if session is None:
+            return await self._format_resume(raw_text, limiter)
+        formatted_text = session.formatted_for(raw_text)
+        if formatted_text is None:
+            formatted_text = await self._try_format_resume(raw_text, limiter)
+            if formatted_text is None:
+                # Retried on the next run rather than replayed
+                return raw_text
+            session.remember_formatted(raw_text, formatted_text)
+        return formatted_text
+
+    @staticmethod
+    def _with_contents(sections: List[ResumeSection], contents: List[str]) -> List[ResumeSection]:
+        """Pair original section titles with their rewritten contents."""
+        return [
+            ResumeSection(title=section.title, content=content)
+            for section, content in zip(sections, contents)
+        ]
+
+    async def _optimize_sectioned(self, resume: Resume, job: PreparedJob,
+                                  optimization_level: float,
+                                  limiter: Optional[asyncio.Semaphore] = None,
+                                  session: Optional[OptimizationSession] = None,
+                                  formatter: str = "local"
+                                  ) -> Tuple[List[ResumeSection], str, List[str], int]:
+        """Rewrite each section with its own LLM call, then apply a formatting pass."""
+        optimized_sections = []
+        changes_made = []
+        job_texts, tokens_saved = self._plan_sections(resume.sections, job)
+        session_keys = self._session_keys(session, resume.sections, job_texts)
+        
+        # Rewrite sections concurrently, bounded by max_concurrency (or the
+        # caller's limiter). gather() preserves input order, and
+        # _optimize_section never raises, so a failing section falls back to
+        # its original text without affecting the others.
+        semaphore = limiter or asyncio.Semaphore(self.max_concurrency)
+
+        async def optimize_bounded(section_text: str, job_text: Optional[str],
+                                   key: Optional[str]) -> Tuple[str, List[str]]:
+            if job_text is None:
+                return section_text, [PASSTHROUGH_CHANGE]
+            previous = session.lookup(key, optimization_level) if key else None
+            if previous is not None:
+                return previous.text, previous.changes
+            text, changes = await self._optimize_section(
+                section_text,
+                job_text,
+                optimization_level,
+                semaphore
+            )
+            if key:
+                self._remember_section(session, key, text, changes, optimization_level)
+            return text, changes
+
+        results = await asyncio.gather(*(
+            optimize_bounded(section.content, job_text, key)
+            for section, job_text, key in zip(resume.sections, job_texts, session_keys)
+        ))
+        for optimized_section, changes in results:
+            optimized_sections.append(optimized_section)
+            changes_made.extend(changes)
+            
+        # Join sections and apply final formatting
+        raw_optimized_text = "\n\n".join(optimized_sections)
+        
+        # Apply additional formatting pass
+        formatted_text = await self._format_merged(
+            raw_optimized_text, session, session_keys, formatter, limiter
+        )
+
+        sections = self._with_contents(resume.sections, optimized_sections)
+        return sections, formatted_text, changes_made, tokens_saved
+
+    @timed_stage("one_shot")
+    async def _optimize_one_shot(self, resume: Resume, job: PreparedJob,
+                                 optimization_level: float,
+                                 limiter: Optional[asyncio.Semaphore] = None
+                                 ) -> Optional[Tuple[List[ResumeSection], str, List[str], int]]:
+        """
+        Rewrite and format all sections in a single structured LLM call.
+
+        Sections that need no rewrite are left out of the call and merged back
+        in place. Returns None if the call fails or the response cannot be
+        matched back to the input sections, so the caller can fall back to
+        sectioned mode.
+        """
+        rewritable = [
+            index for index, section in enumerate(resume.sections)
+            if not self.compactor.is_passthrough(section.title, section.content, len(resume.sections))
+        ]
+        passthrough = [section for index, section in enumerate(resume.sections)
+                       if index not in rewritable]
+        if not rewritable:
+            return None
+        resume_sections = json.dumps(
+            [{"title": resume.sections[index].title, "content": resume.sections[index].content}
+             for index in rewritable],
+            ensure_ascii=False
+        )
+        available = (self.compactor.call_token_budget - self._template_tokens["one_shot"]
+                     - self.compactor.count(resume_sections))
+        job_text = self.compactor.truncate(job.text, max(available, self.compactor.min_job_tokens))
+        tokens_saved = job.original_tokens - self.compactor.count(job_text)
+        for section in passthrough:
+            # Left out of both the prompt and the completion
+            tokens_saved += 2 * self.compactor.count(
+                json.dumps({"title": section.title, "content": section.content},
+                           ensure_ascii=False)
+            )
+        cache_key = self._cache_key(
+            "one_shot", resume_sections, job_text, optimization_level
+        )
+        content = await self.cache.aget("one_shot", cache_key)
+        if content is None:
+            try:
+                async with limiter or nullcontext():
+                    response = await self.llm.ainvoke(
+                        self.one_shot_prompt.format_messages(
+                            job_description=job_text,
+                            resume_sections=resume_sections,
+                            optimization_level=optimization_level
+                        )
+                    )
+            except Exception as e:
+                logger.error(f"Error during one-shot optimization: {str(e)}", exc_info=True)
+                STAGE_ERRORS.inc(stage="one_shot")
+                return None
+            content = response.content
+
+        parsed = self._parse_one_shot_response(content, len(rewritable))
+        if parsed is None:
+            return None
+        # Only cache responses that could be matched to the input sections
+        await self.cache.aset("one_shot", cache_key, content)
+        rewritten, changes = parsed
+        sections = list(resume.sections)
+        for index, section in zip(rewritable, rewritten):
+            sections[index] = section
+        if passthrough:
+            changes = changes + [PASSTHROUGH_CHANGE]
+        formatted_text = "\n\n".join(section.content for section in sections)
+        changes = changes or ["Resume optimized and formatted in a single pass"]
+        return sections, formatted_text, changes, tokens_saved
+
+    @staticmethod
+    def _parse_one_shot_response(content: str, expected_sections: int
+                                 ) -> Optional[Tuple[List[ResumeSection], List[str]]]:
+        text = content.strip()
+        # Tolerate a markdown code fence around the JSON payload
+        if text.startswith("```"):
+            text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+        try:
+            payload = json.loads(text)
+            sections = [
+                ResumeSection(title=str(item["title"]), content=str(item["content"]).strip())
+                for item in payload["sections"]
+            ]
+            changes = [str(change) for change in payload.get("changes", [])]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not parse one-shot response: {str(e)}")
+            return None
+        if len(sections) != expected_sections:
+            logger.warning(
+                f"One-shot response returned {len(sections)} sections, expected {expected_sections}"
+            )
+            return None
+        return sections, changes
+
+    async def _format_resume(self, resume_text: str,
+                             limiter: Optional[asyncio.Semaphore] = None) -> str:
         """Apply final formatting to ensure consistent, clean output."""
+        formatted_text = await self._try_format_resume(resume_text, limiter)
+        return resume_text if formatted_text is None else formatted_text  # Original text if formatting fails
+
+    @timed_stage("format_resume")
+    async def _try_format_resume(self, resume_text: str,
+                                 limiter: Optional[asyncio.Semaphore] = None) -> Optional[str]:
+        cache_key = self._cache_key("format_resume", resume_text)
+        cached = await self.cache.aget("format_resume", cache_key)
+        if cached is not None:
+            return cached
+        return await self._format_flight.do(
+            cache_key, lambda: self._call_format_llm(resume_text, cache_key, limiter)
+        )
+
+    async def _call_format_llm(self, resume_text: str, cache_key: str,
+                               limiter: Optional[asyncio.Semaphore] = None) -> Optional[str]:
+        # Only the leading caller takes a limiter slot; coalesced callers wait
+        # on its result without holding one
         try:
-            response = await self.llm.ainvoke(
-                self.formatting_prompt.format_messages(
-                    resume_text=resume_text
+            async with limiter or nullcontext():
+                response = await self.llm.ainvoke(
+                    self.formatting_prompt.format_messages(
+                        resume_text=resume_text
+                    )
                 )
-            )
-            return response.content.strip()
+            formatted_text = response.content.strip()
+            await self.cache.aset("format_resume", cache_key, formatted_text)
+            return formatted_text
         except Exception as e:
             logger.error(f"Error during resume formatting: {str(e)}", exc_info=True)
-            return resume_text  # Return original text if formatting fails
+            STAGE_ERRORS.inc(stage="format_resume")
+            return None
 
+    @timed_stage("optimize_section")
     async def _optimize_section(self, section_text: str, job_description: str, 
-                              optimization_level: float) -> Tuple[str, List[str]]:
+                              optimization_level: float,
+                              limiter: Optional[asyncio.Semaphore] = None) -> Tuple[str, List[str]]:
+        cache_key = self._cache_key(
+            "optimize_section", section_text, job_description, optimization_level
+        )
+        cached = await self.cache.aget("optimize_section", cache_key)
+        if cached is not None:
+            return cached, ["Section optimized and reformatted"]
+        optimized_text, changes = await self._section_flight.do(
+            cache_key,
+            lambda: self._call_section_llm(
+                section_text, job_description, optimization_level, cache_key, limiter
+            )
+        )
+        # Coalesced callers share the result, so each gets its own changes list
+        return optimized_text, list(changes)
+
+    async def _call_section_llm(self, section_text: str, job_description: str,
+                                optimization_level: float, cache_key: str,
+                                limiter: Optional[asyncio.Semaphore] = None) -> Tuple[str, List[str]]:
+        messages = self.optimization_prompt.format_messages(
+            job_description=job_description,
+            resume_section=section_text,
+            optimization_level=optimization_level
+        )
+        # Only the leading caller takes a limiter slot, see _call_format_llm
+        try:
+            async with limiter or nullcontext():
+                response = await self.hedge_policy.run(lambda: self.llm.ainvoke(messages))
+            optimized_text = response.content.strip()
+            await self.cache.aset("optimize_section", cache_key, optimized_text)
+            return optimized_text, ["Section optimized and reformatted"]
+        except Exception as e:
+            logger.error(f"Error during section optimization: {str(e)}", exc_info=True)
+            STAGE_ERRORS.inc(stage="optimize_section")
+            return section_text, [f"{SECTION_ERROR_PREFIX}: {str(e)}"]
+
+    async def _stream_section(self, section_text: str, job_description: str,
+                              optimization_level: float) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming counterpart of _optimize_section, yielding token and section_end events."""
+        cache_key = self._cache_key(
+            "optimize_section", section_text, job_description, optimization_level
+        )
+        cached = await self.cache.aget("optimize_section", cache_key)
+        if cached is not None:
+            yield {"event": "token", "text": cached}
+            yield {"event": "section_end", "text": cached,
+                   "changes": ["Section optimized and reformatted"]}
+            return
+        chunks = []
         try:
-            response = await self.llm.ainvoke(
+            async for chunk in self.llm.astream(
                 self.optimization_prompt.format_messages(
                     job_description=job_description,
                     resume_section=section_text,
                     optimization_level=optimization_level
                 )
-            )
-            return response.content.strip(), ["Section optimized and reformatted"]
+            ):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield {"event": "token", "text": chunk.content}
         except Exception as e:
             logger.error(f"Error during section optimization: {str(e)}", exc_info=True)
-            return section_text, [f"Error during optimization: {str(e)}"]
+            STAGE_ERRORS.inc(stage="optimize_section")
+            yield {"event": "section_end", "text": section_text,
+                   "changes": [f"{SECTION_ERROR_PREFIX}: {str(e)}"]}
+            return
+        optimized_text = "".join(chunks).strip()
+        await self.cache.aset("optimize_section", cache_key, optimized_text)
+        yield {"event": "section_end", "text": optimized_text,
+               "changes": ["Section optimized and reformatted"]}
+
+    @timed_stage("match_score")
+    async def _calculate_match_score(self, resume: Resume,
+                                     job_description: JobDescription) -> MatchScore:
+        """Score the resume locally; see MatchScorer. Runs in milliseconds, no LLM call."""
+        return self.scorer.score(resume, job_description) 
+
+_resume_optimizer: Optional[ResumeOptimizer] = None
 
-    async def _calculate_match_score(self, resume_text: str, job_description: str) -> float:
-        # This is a placeholder for the actual matching logic
-        # In a real implementation, this would use the LLM to calculate a match score
-        return 0.75 
\ No newline at end of file
+def get_resume_optimizer() -> ResumeOptimizer:
+    """Process-wide optimizer shared by the API and the Gradio UI."""
+    global _resume_optimizer
+    if _resume_optimizer is None:
+        _resume_optimizer = ResumeOptimizer()
+    return _resume_optimizer
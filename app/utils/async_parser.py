@@ -0,0 +1,162 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Union
+import asyncio
+import logging
+import os
+import threading
+
+from app.models.resume import Resume
+from app.utils.document_parser import DocumentParser
+from app.utils.parse_cache import ParseCache
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FILE_TYPES = ("pdf", "docx")
+
+class ParserBusyError(RuntimeError):
+    """Raised when too many documents are already waiting to be parsed."""
+
+class ParserTimeoutError(TimeoutError):
+    """Raised when a document takes longer than the configured timeout to parse."""
+
+def _parse(file_content: bytes, file_type: str) -> Resume:
+    # Module-level so it can be pickled into process pool workers
+    if file_type == "pdf":
+        return DocumentParser.parse_pdf(file_content)
+    if file_type == "docx":
+        return DocumentParser.parse_docx(file_content)
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+def _parse_path(path: str, file_type: str) -> Resume:
+    if file_type == "pdf":
+        return DocumentParser.parse_pdf_path(path)
+    if file_type == "docx":
+        return DocumentParser.parse_docx_path(path)
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+class AsyncDocumentParser:
+    """
+    Runs DocumentParser off the event loop in a process or thread pool.
+
+    pypdf and python-docx are pure Python and hold the GIL, so the default
+    process pool keeps large documents from stalling other requests. At most
+    max_pending documents may be queued or parsing at once; beyond that
+    parse() fails fast with ParserBusyError. A document that exceeds the
+    timeout raises ParserTimeoutError; its worker finishes in the background
+    and still counts toward max_pending until it does.
+    If a ParseCache is given, documents seen before are returned from it
+    without using the pool.
+    """
+
+    def __init__(self, executor_type: str = "process", max_workers: Optional[int] = None,
+                 timeout: Optional[float] = 30.0, max_pending: int = 32,
+                 cache: Optional[ParseCache] = None):
+        if executor_type not in ("process", "thread"):
+            raise ValueError(f"Unknown executor type: {executor_type}")
+        self.executor_type = executor_type
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.cache = cache
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        # Workers finish on their own threads, so the count is updated under a lock
+        self._pending_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AsyncDocumentParser":
+        timeout = float(os.getenv("PARSER_TIMEOUT", "30"))
+        return cls(
+            executor_type=os.getenv("PARSER_EXECUTOR", "process"),
+            max_workers=int(os.getenv("PARSER_MAX_WORKERS", "0")) or None,
+            timeout=timeout if timeout > 0 else None,
+            max_pending=int(os.getenv("PARSER_MAX_PENDING", "32")),
+            cache=ParseCache.from_env() if os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true" else None
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _future=None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _get_executor(self) -> Executor:
+        # Created on first use so importing the app does not spawn workers
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="document-parser"
+                )
+        return self._executor
+
+    async def parse(self, file_content: bytes, file_type: str) -> Resume:
+        """Parse a PDF or DOCX document without blocking the event loop."""
+        return await self._cached_run(
+            _parse, file_content, file_type, ParseCache.key_for_bytes
+        )
+
+    async def parse_path(self, path: Union[str, os.PathLike], file_type: str) -> Resume:
+        """
+        Parse a PDF or DOCX file on disk. Only the path is sent to the worker,
+        which reads the file itself, so the upload is never copied into memory here.
+        """
+        return await self._cached_run(
+            _parse_path, os.fspath(path), file_type, ParseCache.key_for_path
+        )
+
+    async def _cached_run(self, parse_fn, source, file_type: str, key_fn) -> Resume:
+        if self.cache is None or file_type not in SUPPORTED_FILE_TYPES:
+            return await self._run(parse_fn, source, file_type)
+        # Hashing large files is not free, so keep it off the event loop too
+        key = await asyncio.to_thread(key_fn, source, file_type)
+        resume = await self.cache.aget(key)
+        if resume is None:
+            resume = await self._run(parse_fn, source, file_type)
+            await self.cache.aset(key, resume)
+        return resume
+
+    async def _run(self, parse_fn, source, file_type: str) -> Resume:
+        if file_type not in SUPPORTED_FILE_TYPES:
+            raise ValueError(f"Unsupported file type: {file_type}")
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise ParserBusyError(
+                    f"Too many documents being parsed ({self._pending}), try again later"
+                )
+            self._pending += 1
+        try:
+            work = self._get_executor().submit(parse_fn, source, file_type)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the worker is done, not when we stop waiting: a
+        # document that timed out keeps its worker busy until it finishes
+        work.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(work), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise ParserTimeoutError(f"Parsing the {file_type} file took longer than {self.timeout}s")
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool for the next request
+            logger.error("Document parser process pool is broken, recreating it")
+            self.shutdown(wait=False)
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+_document_parser: Optional[AsyncDocumentParser] = None
+
+def get_document_parser() -> AsyncDocumentParser:
+    """Process-wide parser facade shared by the API and the Gradio UI."""
+    global _document_parser
+    if _document_parser is None:
+        _document_parser = AsyncDocumentParser.from_env()
+    return _document_parser
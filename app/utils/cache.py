@@ -0,0 +1,193 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+import asyncio
+import sqlite3
+import threading
+import time
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache of string values with optional TTL.
+
+    Entries are evicted least-recently-used first once either max_entries or
+    max_bytes (total length of the stored values) is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.max_entries <= 0 or (self.max_bytes is not None and len(value) > self.max_bytes):
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic())
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+class SQLiteCache:
+    """
+    On-disk cache of string values backed by a single SQLite table.
+
+    Expired entries are dropped on read; once more than max_entries are stored
+    the least recently accessed ones are deleted. The entry count is kept as
+    a running total and only re-read from the table when trimming (other
+    processes may share the file), which deletes a tenth of max_entries more
+    than needed so the next inserts do not trim again.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None,
+                 table: str = "cache"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)"
+            )
+            (self._count,) = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                self._count -= self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key = ?", (key,)
+                ).rowcount
+                return None
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.max_entries <= 0:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            exists = self._conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if exists is None:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._trim()
+
+    def _trim(self) -> None:
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        if count > self.max_entries:
+            target = self.max_entries - self.max_entries // 10
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                (count - target,)
+            )
+            count = target
+        self._count = count
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class TieredCache:
+    """
+    Two-tier cache: an in-memory LRU in front of an optional SQLite tier.
+    Disk hits are promoted into memory. aget() and aset() run the disk tier in
+    a thread, for callers on the event loop.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    async def aget(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    async def aset(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
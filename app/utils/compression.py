@@ -0,0 +1,40 @@
+from typing import Collection
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Streamed a message at a time: gzip would hold messages back until enough
+# output builds up to compress, so these are always sent uncompressed
+STREAMING_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+class GZipMiddleware:
+    """
+    Gzip responses for clients that send Accept-Encoding: gzip, like
+    Starlette's GZipMiddleware, except for streamed media types. Responses
+    smaller than minimum_size bytes are not worth compressing.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, compresslevel: int = 6,
+                 streaming_media_types: Collection[str] = STREAMING_MEDIA_TYPES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.streaming_media_types = streaming_media_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("Accept-Encoding", ""):
+            await self.app(scope, receive, send)
+            return
+        responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        responder.send = send
+        streaming = False
+
+        async def send_maybe_compressed(message: Message) -> None:
+            nonlocal streaming
+            if message["type"] == "http.response.start":
+                media_type = Headers(raw=message["headers"]).get("content-type", "")
+                streaming = media_type.split(";")[0].strip() in self.streaming_media_types
+            await (send if streaming else responder.send_with_gzip)(message)
+
+        await self.app(scope, receive, send_maybe_compressed)
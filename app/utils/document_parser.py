@@ -1,44 +1,153 @@
-from typing import List, Dict
-from docx import Document
-from pypdf import PdfReader
+from typing import BinaryIO, Callable, List, Dict, Optional, Tuple, Union
 import io
+import mmap
+import os
+import zipfile
 from app.models.resume import ResumeSection, Resume
+from app.utils.section_segmenter import LineCollector, TextLine, segment_lines
+
+# Bump whenever parsing output changes, to invalidate cached parse results
+PARSER_VERSION = "3"
+
+# Upload guards; oversized documents are rejected before any text is extracted
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_BYTES", str(20 * 1024 * 1024)))
+
+class DocumentTooLargeError(ValueError):
+    """Raised when a document exceeds the configured page or size limits."""
+
+def detect_file_type(source: Union[bytes, str, os.PathLike]) -> Optional[str]:
+    """
+    Identify a PDF or DOCX document by its content rather than its file name.
+    Returns "pdf", "docx" or None for anything else.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        header = bytes(source[:1024])
+    else:
+        with open(source, "rb") as f:
+            header = f.read(1024)
+    # The PDF spec allows the header anywhere in the first 1024 bytes
+    if b"%PDF-" in header:
+        return "pdf"
+    if header.startswith(b"PK\x03\x04"):
+        # DOCX is a ZIP container; tell it apart from XLSX, JAR, etc. by its main part
+        try:
+            stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+            with zipfile.ZipFile(stream) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            return None
+    return None
+
+def _open_bytes(file_content: bytes) -> Callable[[], BinaryIO]:
+    # BytesIO over a bytes object shares its buffer, so each opener is cheap
+    return lambda: io.BytesIO(file_content)
+
+def _open_mmap(path: str) -> Callable[[], BinaryIO]:
+    def opener() -> BinaryIO:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return opener
 
 class DocumentParser:
     @staticmethod
-    def parse_pdf(file_content: bytes) -> Resume:
+    def _check_size(size: int, max_bytes: Optional[int]) -> None:
+        max_bytes = DOCUMENT_MAX_BYTES if max_bytes is None else max_bytes
+        if size > max_bytes:
+            raise DocumentTooLargeError(
+                f"Document is {size} bytes, larger than the {max_bytes} byte limit"
+            )
+
+    @staticmethod
+    def _extract_pdf(open_stream: Callable[[], BinaryIO],
+                     max_pages: Optional[int]) -> Tuple[str, List[TextLine]]:
+        # pypdf and python-docx are imported on first parse to keep app startup fast
+        from pypdf import PdfReader
+
+        # Pages are extracted one after another with a single reader: pypdf
+        # holds the GIL, so threads would not help, and documents are already
+        # parsed in parallel by AsyncDocumentParser's process pool
+        stream = open_stream()
+        try:
+            reader = PdfReader(stream)
+            page_count = len(reader.pages)
+            max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+            if page_count > max_pages:
+                raise DocumentTooLargeError(
+                    f"PDF has {page_count} pages, more than the {max_pages} page limit"
+                )
+            page_texts: List[str] = []
+            lines: List[TextLine] = []
+            for page in reader.pages:
+                collector = LineCollector()
+                page_texts.append(page.extract_text(visitor_text=collector) or "")
+                lines += collector.finish()
+        finally:
+            stream.close()
+        # Join once at the end instead of growing a string page by page
+        return "\n".join(page_texts), lines
+
+    @staticmethod
+    def parse_pdf(file_content: bytes, max_pages: Optional[int] = None,
+                  max_bytes: Optional[int] = None) -> Resume:
         """
         Parse a PDF file and extract its content into a structured Resume object.
         """
-        pdf = PdfReader(io.BytesIO(file_content))
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text()
-            
-        # This is a basic implementation
-        # In a real application, you would want to:
-        # 1. Use more sophisticated text extraction
-        # 2. Identify section boundaries
-        # 3. Extract structured information
-        # 4. Handle formatting
-        
+        DocumentParser._check_size(len(file_content), max_bytes)
+        text, lines = DocumentParser._extract_pdf(_open_bytes(file_content), max_pages)
+        return DocumentParser._build_pdf_resume(text, lines)
+
+    @staticmethod
+    def parse_pdf_path(path: Union[str, os.PathLike], max_pages: Optional[int] = None,
+                       max_bytes: Optional[int] = None) -> Resume:
+        """
+        Parse a PDF file on disk, memory-mapping it instead of reading it into memory.
+        """
+        path = os.fspath(path)
+        DocumentParser._check_size(os.path.getsize(path), max_bytes)
+        text, lines = DocumentParser._extract_pdf(_open_mmap(path), max_pages)
+        return DocumentParser._build_pdf_resume(text, lines)
+
+    @staticmethod
+    def _build_pdf_resume(text: str, lines: List[TextLine]) -> Resume:
+        # Split into sections from heading text and font/layout signals; fall
+        # back to a single section when no headings can be identified
+        sections = segment_lines(lines) or [
+            ResumeSection(
+                title="Content",
+                content=text
+            )
+        ]
         return Resume(
-            sections=[
-                ResumeSection(
-                    title="Content",
-                    content=text
-                )
-            ],
+            sections=sections,
             raw_text=text,
             metadata={"file_type": "pdf"}
         )
 
     @staticmethod
-    def parse_docx(file_content: bytes) -> Resume:
+    def parse_docx(file_content: bytes, max_bytes: Optional[int] = None) -> Resume:
         """
         Parse a DOCX file and extract its content into a structured Resume object.
         """
-        doc = Document(io.BytesIO(file_content))
+        from docx import Document
+
+        DocumentParser._check_size(len(file_content), max_bytes)
+        return DocumentParser._parse_docx_document(Document(io.BytesIO(file_content)))
+
+    @staticmethod
+    def parse_docx_path(path: Union[str, os.PathLike], max_bytes: Optional[int] = None) -> Resume:
+        """
+        Parse a DOCX file on disk without first reading it into a bytes object.
+        """
+        from docx import Document
+
+        path = os.fspath(path)
+        DocumentParser._check_size(os.path.getsize(path), max_bytes)
+        return DocumentParser._parse_docx_document(Document(path))
+
+    @staticmethod
+    def _parse_docx_document(doc) -> Resume:
         sections: List[Dict] = []
         full_text = []
         
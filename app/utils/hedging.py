@@ -0,0 +1,159 @@
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Optional, Tuple, TypeVar
+import asyncio
+import os
+import time
+
+from app.utils.metrics import LLM_HEDGE_WINS, LLM_HEDGES
+
+T = TypeVar("T")
+
+class _Attempt:
+    """Whether an attempt's request is being sent, and since when."""
+
+    def __init__(self):
+        self.sending = asyncio.Event()
+        self.sending.set()
+        self.since = time.perf_counter()
+
+_attempt: ContextVar[Optional[_Attempt]] = ContextVar("hedge_attempt", default=None)
+
+def mark_waiting() -> None:
+    """
+    Called by a hedged call while it is not sending its request, e.g. waiting
+    for a rate limiter or backing off before a retry. It is not hedged until
+    it calls mark_sending() again.
+    """
+    attempt = _attempt.get()
+    if attempt is not None:
+        attempt.sending.clear()
+
+def mark_sending() -> None:
+    """Called by a hedged call once its request is sent; the hedge delay starts now."""
+    attempt = _attempt.get()
+    if attempt is not None:
+        attempt.since = time.perf_counter()
+        attempt.sending.set()
+
+class HedgePolicy:
+    """
+    Hedged requests: when a call has run longer than the given percentile of
+    recent call latencies, a duplicate is started and whichever succeeds
+    first wins; the other is cancelled. A failed attempt leaves the other one
+    running, so a hedge also serves as a fallback.
+
+    Hedges are capped at budget times the number of calls (0.05 allows 5%
+    extra calls; 0 disables hedging), and none are sent until min_samples
+    latencies have been seen. The delay never drops below min_delay seconds,
+    so fast calls are not duplicated over noise.
+
+    Calls that wait for a rate limiter or back off between retries report it
+    with mark_waiting() and mark_sending(); the delay and the recorded
+    latency only count time spent sending. Other calls count from the start.
+    """
+
+    def __init__(self, name: str, budget: float = 0.0, percentile: float = 0.95,
+                 min_delay: float = 1.0, min_samples: int = 20, window: int = 200):
+        if not 0.0 < percentile < 1.0:
+            raise ValueError("percentile must be between 0 and 1")
+        self.name = name
+        self.budget = budget
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "HedgePolicy":
+        return cls(
+            name,
+            budget=float(os.getenv("LLM_HEDGE_BUDGET", "0")),
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),
+            min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", "1")),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        if len(self._latencies) < max(self.min_samples, 1):
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(ordered[index], self.min_delay)
+
+    def _take_budget(self) -> bool:
+        if self.hedges + 1 > self.budget * self.calls:
+            return False
+        self.hedges += 1
+        LLM_HEDGES.inc(stage=self.name)
+        return True
+
+    @staticmethod
+    def _start(fn: Callable[[], Awaitable[T]]) -> Tuple["asyncio.Future[T]", _Attempt]:
+        attempt = _Attempt()
+        # The task copies the context, so fn() reports on its own attempt
+        token = _attempt.set(attempt)
+        try:
+            return asyncio.ensure_future(fn()), attempt
+        finally:
+            _attempt.reset(token)
+
+    @staticmethod
+    async def _sending_for(task: "asyncio.Future[T]", attempt: _Attempt, delay: float) -> bool:
+        """Wait until task has been sending for delay seconds (True) or is done (False)."""
+        while not task.done():
+            if not attempt.sending.is_set():
+                sending = asyncio.ensure_future(attempt.sending.wait())
+                try:
+                    await asyncio.wait({task, sending}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    sending.cancel()
+                continue
+            remaining = attempt.since + delay - time.perf_counter()
+            if remaining <= 0:
+                return True
+            await asyncio.wait({task}, timeout=remaining)
+        return False
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn(), hedging it with a second fn() call if it is slow."""
+        if not self.enabled:
+            return await fn()
+        self.calls += 1
+        primary, primary_attempt = self._start(fn)
+        attempts = {primary: primary_attempt}
+        try:
+            delay = self.delay()
+            if delay is not None and await self._sending_for(primary, primary_attempt, delay):
+                if self._take_budget():
+                    hedge, hedge_attempt = self._start(fn)
+                    attempts[hedge] = hedge_attempt
+
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary if both finished together
+                for attempt in sorted(done, key=lambda task: task is not primary):
+                    if attempt.cancelled():
+                        continue
+                    if attempt.exception() is None:
+                        self._latencies.append(time.perf_counter() - attempts[attempt].since)
+                        if attempt is not primary:
+                            self.wins += 1
+                            LLM_HEDGE_WINS.inc(stage=self.name)
+                        return attempt.result()
+                    error = error or attempt.exception()
+            raise error or asyncio.CancelledError()
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
@@ -0,0 +1,43 @@
+from importlib import import_module
+from typing import Any, Callable
+import threading
+
+class LazyObject:
+    """
+    Stand-in for a shared service that is built by factory on first
+    attribute access and forwards everything to it from then on.
+
+    Lets a module expose the service as a plain attribute (which tests can
+    patch) without paying for its construction, or its imports, when the
+    module is imported.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names not set in __init__, i.e. the wrapped object's
+        return getattr(self._resolve(), name)
+
+    def __repr__(self) -> str:
+        state = "unresolved" if self._instance is None else repr(self._instance)
+        return f"<LazyObject {state}>"
+
+def lazy_import(target: str) -> LazyObject:
+    """
+    LazyObject for "package.module:factory": the module is only imported,
+    and the factory called, on first use.
+    """
+    module_name, _, factory_name = target.partition(":")
+    if not factory_name:
+        raise ValueError(f"Expected 'module:factory', got {target!r}")
+    return LazyObject(lambda: getattr(import_module(module_name), factory_name)())
@@ -0,0 +1,237 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import functools
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "resume_stage_duration_seconds", "Time spent per pipeline stage.", ["stage"]
+))
+STAGE_IN_FLIGHT = REGISTRY.register(Gauge(
+    "resume_stage_in_flight", "Pipeline stages currently running.", ["stage"]
+))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "resume_stage_errors_total", "Pipeline stages that raised an error.", ["stage"]
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "LLM tokens used, by stage and kind (prompt or completion).", ["stage", "kind"]
+))
+LLM_COST = REGISTRY.register(Counter(
+    "llm_cost_usd_total", "Estimated LLM spend in US dollars.", ["stage"]
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by cache, stage and result (hit or miss).",
+    ["cache", "stage", "result"]
+))
+SINGLE_FLIGHT_CALLS = REGISTRY.register(Counter(
+    "single_flight_calls_total",
+    "Deduplicated calls by stage and result (leader made the call, coalesced awaited it).",
+    ["stage", "result"]
+))
+SINGLE_FLIGHT_RATIO = REGISTRY.register(Gauge(
+    "single_flight_coalescing_ratio", "Share of calls served by a concurrent identical call.", ["stage"]
+))
+LLM_HEDGES = REGISTRY.register(Counter(
+    "llm_hedges_total", "Duplicate LLM calls sent because the first was slow.", ["stage"]
+))
+LLM_HEDGE_WINS = REGISTRY.register(Counter(
+    "llm_hedge_wins_total", "Hedged LLM calls where the duplicate finished first.", ["stage"]
+))
+
+# The stage running in the current task, used to attribute LLM usage
+current_stage: ContextVar[str] = ContextVar("current_stage", default="other")
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration measured by the caller."""
+    STAGE_DURATION.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """
+    Time a pipeline stage and count it as in flight while it runs.
+
+    Must not span a yield of a generator: the stage is kept in a context
+    variable that has to be reset in the context it was set in.
+    """
+    token = current_stage.set(stage)
+    STAGE_IN_FLIGHT.inc(stage=stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        record_stage(stage, time.perf_counter() - start)
+        current_stage.reset(token)
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """
+    Collect the seconds spent per stage by everything run inside the block,
+    including tasks it starts. Concurrent stages add up, so the totals can
+    exceed the wall-clock time.
+    """
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+def record_llm_usage(prompt_tokens: int, completion_tokens: int, cost: float = 0.0) -> None:
+    stage = current_stage.get()
+    LLM_TOKENS.inc(prompt_tokens, stage=stage, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, stage=stage, kind="completion")
+    if cost:
+        LLM_COST.inc(cost, stage=stage)
+
+def timed_stage(stage: str) -> Callable:
+    """Decorator form of track_stage for coroutine functions."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with track_stage(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,81 @@
+from typing import Optional, Union
+import hashlib
+import os
+import threading
+
+from app.models.resume import Resume
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.document_parser import PARSER_VERSION
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+class ParseCache:
+    """
+    Cache of parsed documents keyed by a hash of the file bytes and PARSER_VERSION.
+
+    Resumes are stored serialized as JSON in a memory tier bounded by total
+    size (LRU eviction) and an optional SQLite tier, so re-uploading the same
+    file skips parsing entirely.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: Optional[float] = None, path: Optional[str] = None,
+                 disk_max_entries: int = 1000):
+        disk = SQLiteCache(path, max_entries=disk_max_entries, ttl=ttl, table="parse_cache") if path else None
+        self._cache = TieredCache(
+            LRUCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes), disk
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ParseCache":
+        ttl = float(os.getenv("PARSE_CACHE_TTL", "0"))
+        return cls(
+            max_entries=int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "512")),
+            max_bytes=int(os.getenv("PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl=ttl if ttl > 0 else None,
+            path=os.getenv("PARSE_CACHE_PATH") or None,
+            disk_max_entries=int(os.getenv("PARSE_CACHE_DISK_MAX_ENTRIES", "1000"))
+        )
+
+    @staticmethod
+    def key_for_bytes(file_content: bytes, file_type: str) -> str:
+        digest = hashlib.sha256(f"{PARSER_VERSION}:{file_type}:".encode())
+        digest.update(file_content)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_for_path(path: Union[str, os.PathLike], file_type: str) -> str:
+        digest = hashlib.sha256(f"{PARSER_VERSION}:{file_type}:".encode())
+        with open(path, "rb") as f:
+            while block := f.read(HASH_BLOCK_SIZE):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Resume]:
+        return self._load(self._cache.get(key))
+
+    def set(self, key: str, resume: Resume) -> None:
+        self._cache.set(key, resume.model_dump_json())
+
+    async def aget(self, key: str) -> Optional[Resume]:
+        """get() for callers on the event loop: the disk tier is read in a thread."""
+        return self._load(await self._cache.aget(key))
+
+    async def aset(self, key: str, resume: Resume) -> None:
+        await self._cache.aset(key, resume.model_dump_json())
+
+    def _load(self, value: Optional[str]) -> Optional[Resume]:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_REQUESTS.inc(cache="parse", stage="parse", result="hit" if value is not None else "miss")
+        return None if value is None else Resume.model_validate_json(value)
+
+    def clear(self) -> None:
+        self._cache.clear()
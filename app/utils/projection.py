@@ -0,0 +1,56 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+def _model_of(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The model inside an annotation like Optional[List[Model]], and whether it is a list."""
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    is_list = get_origin(annotation) in (list, List)
+    if is_list:
+        annotation = get_args(annotation)[0]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, is_list
+    return None, is_list
+
+def field_tree(model: Type[BaseModel], paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    Turn dotted field paths into the nested include/exclude argument of
+    model_dump, e.g. ["a.b", "c"] -> {"a": {"b": True}, "c": True}. Paths
+    into a list of models apply to every item. Raises ValueError for fields
+    the model does not have.
+    """
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node, current = tree, model
+        names = path.split(".")
+        for depth, name in enumerate(names):
+            if current is None or name not in current.model_fields:
+                raise ValueError(f"Unknown response field: {path}")
+            if depth == len(names) - 1:
+                # A whole field wins over parts of it selected by another path
+                node[name] = True
+                break
+            if node.get(name) is True:
+                break
+            current, is_list = _model_of(current.model_fields[name].annotation)
+            node = node.setdefault(name, {})
+            if is_list:
+                node = node.setdefault("__all__", {})
+    return tree
+
+def project(instance: BaseModel, fields: Optional[List[str]] = None,
+            exclude: Optional[List[str]] = None, compact: bool = False) -> Dict[str, Any]:
+    """
+    JSON-ready dict of a model with only the given fields and without the
+    excluded ones (dotted paths, see field_tree). Compact also leaves out
+    fields that are null or at their default value.
+    """
+    model = type(instance)
+    return instance.model_dump(
+        mode="json",
+        include=field_tree(model, fields) if fields else None,
+        exclude=field_tree(model, exclude) if exclude else None,
+        exclude_none=compact,
+        exclude_defaults=compact
+    )
@@ -0,0 +1,50 @@
+from typing import Optional
+import asyncio
+import time
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at rate_per_minute.
+
+    acquire() waits until enough tokens are available. An amount larger than
+    the capacity waits for a full bucket and leaves it in debt, so oversized
+    requests are delayed rather than rejected. debit() charges tokens without
+    waiting, e.g. for usage that is only known after a call completes. A rate
+    of 0 disables limiting.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        if not self.enabled:
+            return
+        needed = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self._tokens >= needed:
+                self._tokens -= amount
+                return
+            await asyncio.sleep((needed - self._tokens) / self.rate)
+
+    def debit(self, amount: float) -> None:
+        if self.enabled:
+            self._refill()
+            self._tokens -= amount
@@ -0,0 +1,112 @@
+from typing import List, Optional
+import re
+
+from app.utils.section_segmenter import HEADING_PATTERN, KNOWN_HEADINGS, MAX_HEADING_WORDS
+
+# The rules the LLM formatting pass is asked to apply, done locally:
+# ALL-CAPS headers with one blank line before each, "•" bullets with two
+# spaces per nesting level, MM/YYYY dates, bold titles on dated entry lines,
+# and no tabs, repeated spaces or trailing whitespace.
+
+BULLET_PATTERN = re.compile(r"^(?P<indent>\s*)(?:[-*•·▪‣◦●○]|o(?=\s))\s+(?P<text>\S.*)$")
+MARKDOWN_HEADING_PATTERN = re.compile(r"^#{1,6}\s+(?P<text>.+?)\s*#*$")
+BOLD_LINE_PATTERN = re.compile(r"^\*\*(?P<text>[^*]+)\*\*:?$")
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+MONTH_NAME_DATE = re.compile(
+    r"\b(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?,?\s+(?P<year>(?:19|20)\d{2})\b",
+    re.IGNORECASE
+)
+# 3/2020, 03-2020 and 2020-03, but not parts of full dates like 12/03/2020 or 2020-03-01
+NUMERIC_DATE = re.compile(
+    r"(?<![\d/.\-])(?P<month>0?[1-9]|1[0-2])[/.\-](?P<year>(?:19|20)\d{2})(?![\d/.])(?!-\d{1,2}\b)"
+)
+ISO_MONTH = re.compile(r"(?<![\d/.\-])(?P<year>(?:19|20)\d{2})-(?P<month>0[1-9]|1[0-2])(?![\d/.\-])")
+
+DATE = r"(?:\d{2}/\d{4}|(?:19|20)\d{2})"
+DATE_RANGE = re.compile(
+    rf"(?P<start>{DATE})\s*(?:-+|–|—|to)\s*(?P<end>{DATE}|present|current|now)\b", re.IGNORECASE
+)
+# An entry line: a title or company followed by its dates at the end of the line
+ENTRY_LINE = re.compile(
+    rf"^(?P<title>[^•*#].*?)[\s,|–—\-]*(?P<dates>{DATE} - (?:{DATE}|present|current|now)|\d{{2}}/\d{{4}})$",
+    re.IGNORECASE
+)
+
+def _month_name_date(match: re.Match) -> str:
+    # "may" in running text is a verb; only a capitalized month counts
+    if not match.group("month")[0].isupper():
+        return match.group(0)
+    return f"{MONTHS[match.group('month')[:3].lower()]:02d}/{match.group('year')}"
+
+def _date_range(match: re.Match) -> str:
+    end = match.group("end")
+    return f"{match.group('start')} - {end.capitalize() if end.isalpha() else end}"
+
+def normalize_dates(line: str) -> str:
+    """Rewrite month-and-year dates as MM/YYYY and ranges as "MM/YYYY - MM/YYYY"."""
+    line = MONTH_NAME_DATE.sub(_month_name_date, line)
+    line = NUMERIC_DATE.sub(lambda m: f"{int(m.group('month')):02d}/{m.group('year')}", line)
+    line = ISO_MONTH.sub(lambda m: f"{m.group('month')}/{m.group('year')}", line)
+    return DATE_RANGE.sub(_date_range, line)
+
+def _heading(line: str) -> Optional[str]:
+    """
+    The heading text if the line is a section heading, else None: a markdown
+    heading, or a known heading or an ALL-CAPS line, optionally in bold. A
+    bold line alone is more likely a job title.
+    """
+    markdown = MARKDOWN_HEADING_PATTERN.match(line)
+    bold = BOLD_LINE_PATTERN.match(line)
+    if markdown or bold:
+        line = (markdown or bold).group("text").strip()
+    text = line.rstrip(":").strip()
+    if not HEADING_PATTERN.match(line) or len(text.split()) > MAX_HEADING_WORDS:
+        return None
+    normalized = " ".join(text.lower().split())
+    if markdown or normalized in KNOWN_HEADINGS or (text.isupper() and len(text) > 2):
+        return text.upper()
+    return None
+
+def _bold_entry(line: str) -> str:
+    """Bold the title part of a line that ends with its dates."""
+    if "**" in line:
+        return line
+    match = ENTRY_LINE.match(line)
+    if not match or not match.group("title").strip():
+        return line
+    return f"**{match.group('title').strip()}** | {match.group('dates')}"
+
+def format_resume_text(text: str) -> str:
+    """
+    Deterministic stand-in for the LLM formatting pass. Only layout changes:
+    the words of the resume are kept as they are.
+    """
+    lines: List[Optional[str]] = []
+    for raw_line in text.replace("\r\n", "\n").split("\n"):
+        line = raw_line.replace("\t", "  ").rstrip()
+        if not line.strip():
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        bullet = BULLET_PATTERN.match(line)
+        if bullet:
+            # Up to four spaces of indentation make one nesting level
+            level = min((len(bullet.group("indent")) + 3) // 4, 3)
+            content = normalize_dates(" ".join(bullet.group("text").split()))
+            lines.append("  " * level + "• " + content)
+            continue
+        line = " ".join(line.split())
+        heading = _heading(line)
+        if heading:
+            # One blank line before a heading; the None marker keeps blank lines out after it
+            if lines and lines[-1]:
+                lines.append("")
+            lines += [heading, None]
+            continue
+        lines.append(_bold_entry(normalize_dates(line)))
+    return "\n".join(line for line in lines if line is not None).strip("\n")
@@ -0,0 +1,132 @@
+from statistics import median
+from typing import List, NamedTuple, Optional
+import re
+
+from app.models.resume import ResumeSection
+
+# Common resume headings, compared after lowercasing and dropping a trailing colon
+KNOWN_HEADINGS = frozenset({
+    "summary", "professional summary", "executive summary", "profile", "professional profile",
+    "about me", "objective", "career objective", "experience", "work experience",
+    "professional experience", "employment", "employment history", "work history",
+    "relevant experience", "education", "education and training", "academic background",
+    "skills", "technical skills", "core competencies", "key skills", "competencies",
+    "projects", "key projects", "personal projects", "certifications", "certificates",
+    "licenses and certifications", "awards", "honors and awards", "achievements",
+    "publications", "research", "languages", "interests", "hobbies", "volunteer experience",
+    "volunteering", "leadership", "activities", "affiliations", "professional affiliations",
+    "training", "courses", "references", "contact", "contact information",
+})
+
+# Headings are short runs of words: no digits, commas, periods or e-mail/URL characters
+HEADING_PATTERN = re.compile(r"^[A-Za-z][A-Za-z &/'\-]{0,40}:?$")
+MAX_HEADING_WORDS = 5
+
+class TextLine(NamedTuple):
+    text: str
+    font_size: float  # Largest effective font size on the line
+    gap: Optional[float]  # Vertical distance from the previous line, None at a page top
+    bold: bool
+
+class LineCollector:
+    """
+    pypdf visitor_text callback that groups text fragments into lines and
+    records their font size, boldness and vertical position.
+    """
+
+    def __init__(self):
+        self.lines: List[TextLine] = []
+        self._fragments: List[str] = []
+        self._font_size = 0.0
+        self._bold = False
+        self._y: Optional[float] = None
+        self._previous_y: Optional[float] = None
+
+    def __call__(self, text, cm, tm, font_dict, font_size) -> None:
+        parts = text.split("\n")
+        for index, part in enumerate(parts):
+            if index > 0:
+                self._end_line()
+            if part.strip():
+                if not self._fragments:
+                    self._y = tm[5] * cm[3] + cm[5]
+                scale = abs(tm[3] * cm[3]) or 1.0
+                self._font_size = max(self._font_size, (font_size or 0.0) * scale)
+                base_font = str((font_dict or {}).get("/BaseFont", ""))
+                self._bold = self._bold or "bold" in base_font.lower()
+            self._fragments.append(part)
+
+    def finish(self) -> List[TextLine]:
+        self._end_line()
+        return self.lines
+
+    def _end_line(self) -> None:
+        text = "".join(self._fragments).strip()
+        if text:
+            gap = None
+            if self._previous_y is not None and self._y is not None:
+                gap = self._previous_y - self._y
+            self.lines.append(TextLine(text, self._font_size, gap, self._bold))
+            self._previous_y = self._y
+        self._fragments = []
+        self._font_size = 0.0
+        self._bold = False
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().rstrip(":").split())
+
+def is_heading(line: TextLine, body_font_size: float, typical_gap: Optional[float]) -> bool:
+    """Decide whether a line is a section heading from its text and layout signals."""
+    text = line.text.strip()
+    if not HEADING_PATTERN.match(text) or len(text.split()) > MAX_HEADING_WORDS:
+        return False
+    if _normalize(text) in KNOWN_HEADINGS:
+        return True
+    letters = [char for char in text if char.isalpha()]
+    score = 0.0
+    if letters and all(char.isupper() for char in letters):
+        score += 1
+    if body_font_size and line.font_size >= body_font_size * 1.15:
+        score += 1
+    if line.bold:
+        score += 1
+    if text.endswith(":"):
+        score += 0.5
+    if typical_gap and line.gap is not None and line.gap >= typical_gap * 1.4:
+        score += 0.5
+    return score >= 2
+
+def segment_lines(lines: List[TextLine]) -> List[ResumeSection]:
+    """
+    Split PDF text lines into resume sections, like parse_docx does for
+    Heading styles. Text before the first heading goes into a "Header"
+    section. Returns an empty list if no headings were found.
+    """
+    if not lines:
+        return []
+    # Body font size: the size most of the characters are set in
+    sized = [line.font_size for line in lines for _ in line.text if line.font_size]
+    body_font_size = median(sized) if sized else 0.0
+    gaps = [line.gap for line in lines if line.gap and line.gap > 0]
+    typical_gap = median(gaps) if gaps else None
+
+    sections: List[ResumeSection] = []
+    title = "Header"
+    content: List[str] = []
+    found_heading = False
+    for index, line in enumerate(lines):
+        # The first line is usually the candidate's name, set large and in capitals
+        heading = is_heading(line, body_font_size, typical_gap) and (
+            index > 0 or _normalize(line.text) in KNOWN_HEADINGS
+        )
+        if heading:
+            found_heading = True
+            if content:
+                sections.append(ResumeSection(title=title, content="\n".join(content)))
+            title = line.text.strip().rstrip(":").strip()
+            content = []
+        else:
+            content.append(line.text)
+    if content:
+        sections.append(ResumeSection(title=title, content="\n".join(content)))
+    return sections if found_heading else []
@@ -0,0 +1,72 @@
+from typing import Awaitable, Callable, Dict, TypeVar
+import asyncio
+
+from app.utils.metrics import SINGLE_FLIGHT_CALLS, SINGLE_FLIGHT_RATIO
+
+T = TypeVar("T")
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one.
+
+    The first caller for a key starts the call; callers arriving while it
+    runs await the same result, or get the same exception. Nothing is kept
+    once it finishes, so this complements a cache rather than replacing it.
+    The call runs in its own task: a cancelled caller does not cancel it for
+    the others, and it is only cancelled once every caller has gone.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    @property
+    def coalescing_ratio(self) -> float:
+        """Share of calls that were served by another caller's call."""
+        total = self.leaders + self.coalesced
+        return self.coalesced / total if total else 0.0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        # A call left over from another event loop (e.g. a closed one) can't be awaited here
+        if call is not None and call.task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            SINGLE_FLIGHT_CALLS.inc(stage=self.name, result="coalesced")
+        else:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._finish(key, call))
+            self.leaders += 1
+            SINGLE_FLIGHT_CALLS.inc(stage=self.name, result="leader")
+        SINGLE_FLIGHT_RATIO.set(self.coalescing_ratio, stage=self.name)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller was cancelled, so nobody needs the result any more.
+                # Forget the call now: it may take a while to wind down, and a
+                # new caller must start a fresh call rather than join this one
+                call.task.cancel()
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+    def _finish(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved; the callers that wanted it have re-raised it
+        if not call.task.cancelled():
+            call.task.exception()
@@ -0,0 +1,58 @@
+from functools import lru_cache
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text with OpenAI tokenizers,
+# used when tiktoken or its encoding files are unavailable (e.g. offline).
+CHARS_PER_TOKEN = 4
+
+# Always use the character estimate and never load tiktoken, whose first use
+# downloads the encoding: on offline hosts that waits for a network failure
+TOKEN_ESTIMATE_ONLY = os.getenv("TOKEN_ESTIMATE_ONLY", "false").lower() == "true"
+
+@lru_cache(maxsize=None)
+def _load_encoding(name: str):
+    # Cached by encoding name, so models sharing one only try to load it once
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating token counts: {str(e)}")
+        return None
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    if TOKEN_ESTIMATE_ONLY:
+        return None
+    try:
+        import tiktoken
+    except ImportError as e:
+        logger.warning(f"tiktoken unavailable, estimating token counts: {str(e)}")
+        return None
+    try:
+        name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        name = "cl100k_base"
+    return _load_encoding(name)
+
+async def load_encoding(model: str = "gpt-4") -> None:
+    """
+    Load the model's encoding in a thread, so that the first count_tokens call
+    on the event loop does not download it. Call once at startup.
+    """
+    await asyncio.to_thread(_get_encoding, model)
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """
+    Count the tokens in a piece of text locally, without calling the LLM.
+    Falls back to a character-based estimate if tiktoken cannot be loaded.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return max(1, round(len(text) / CHARS_PER_TOKEN))
+    return len(encoding.encode(text))
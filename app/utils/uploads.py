@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import asyncio
+import os
+import tempfile
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+from app.utils.document_parser import DOCUMENT_MAX_BYTES
+
+# Uploads larger than this are written to a temp file instead of kept in memory
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(DOCUMENT_MAX_BYTES)))
+
+# Allowance for the multipart boundaries, part headers and other form fields
+# around the file when checking a request's total size
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES."""
+
+class InvalidUploadError(ValueError):
+    """Raised when a request is not multipart form data with a file field."""
+
+@dataclass
+class SpooledUpload:
+    """An upload held either in memory (content) or in a temp file on disk (path)."""
+    size: int
+    content: Optional[bytes] = None
+    path: Optional[str] = None
+    filename: Optional[str] = None
+
+    @property
+    def source(self):
+        return self.path if self.path is not None else self.content
+
+    def close(self) -> None:
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+class _Spool:
+    """File bytes kept in memory up to spool_bytes, then moved to a temp file."""
+
+    def __init__(self, max_bytes: int, spool_bytes: int):
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.size = 0
+        self.buffer = bytearray()
+        self.file = None
+
+    async def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeError(f"Upload is larger than the {self.max_bytes} byte limit")
+        if self.file is None and self.size > self.spool_bytes:
+            self.file = tempfile.NamedTemporaryFile(prefix="resume-upload-", delete=False)
+            await asyncio.to_thread(self.file.write, bytes(self.buffer))
+            self.buffer.clear()
+        if self.file is not None:
+            await asyncio.to_thread(self.file.write, chunk)
+        else:
+            self.buffer.extend(chunk)
+
+    def finish(self, filename: Optional[str]) -> SpooledUpload:
+        if self.file is None:
+            return SpooledUpload(size=self.size, content=bytes(self.buffer), filename=filename)
+        self.file.close()
+        return SpooledUpload(size=self.size, path=self.file.name, filename=filename)
+
+    def discard(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            os.unlink(self.file.name)
+            self.file = None
+
+class _FieldReader:
+    """
+    Multipart parser callbacks that pick out the data of one file field. The
+    callbacks cannot await, so data is collected per body chunk for the
+    caller to write once the chunk is parsed.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.found = False
+        self.filename: Optional[str] = None
+        self._in_field = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._data: List[bytes] = []
+
+    def callbacks(self) -> Dict[str, Callable]:
+        return {
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+        }
+
+    def take(self) -> List[bytes]:
+        data, self._data = self._data, []
+        return data
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name, self._header_value = b"", b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._headers = {}
+        # Only the first part with the field's name is read
+        self._in_field = not self.found and options.get(b"name") == self.field.encode()
+        if self._in_field:
+            self.found = True
+            filename = options.get(b"filename")
+            self.filename = filename.decode("utf-8", "replace") if filename is not None else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self._data.append(data[start:end])
+
+async def receive_upload(request: Request, field: str = "file", max_bytes: Optional[int] = None,
+                         spool_bytes: Optional[int] = None) -> SpooledUpload:
+    """
+    Receive the file field of a multipart request straight from the request
+    body, keeping it in memory up to spool_bytes and in a temp file beyond
+    that. Fails with UploadTooLargeError before reading anything when the
+    Content-Length is over the limit, and otherwise as soon as more than
+    max_bytes of the file have arrived.
+    """
+    max_bytes = UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    spool_bytes = UPLOAD_SPOOL_BYTES if spool_bytes is None else spool_bytes
+    request_limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > request_limit:
+        raise UploadTooLargeError(
+            f"Upload is {content_length} bytes, larger than the {max_bytes} byte limit"
+        )
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise InvalidUploadError("Expected a multipart/form-data request")
+
+    spool = _Spool(max_bytes, spool_bytes)
+    reader = _FieldReader(field)
+    parser = MultipartParser(options[b"boundary"], reader.callbacks())
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > request_limit:
+                raise UploadTooLargeError(f"Upload is larger than the {max_bytes} byte limit")
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise InvalidUploadError(f"Malformed multipart body: {str(e)}")
+            for data in reader.take():
+                await spool.write(data)
+        parser.finalize()
+        if not reader.found:
+            raise InvalidUploadError(f"No {field} field in the upload")
+    except BaseException:
+        spool.discard()
+        raise
+    return spool.finish(reader.filename)
@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for Resume Rewriter LLM.
+"""
@@ -0,0 +1,118 @@
+"""
+Throughput of the FastAPI app under concurrent clients.
+
+By default the app runs in-process behind httpx's ASGI transport with the
+fake LLM backend, so the numbers cover routing, validation, parsing and
+the optimizer without any network. Pass --url to load a running server
+instead, e.g. one started with LLM_BACKEND=fake.
+
+Usage:
+    python -m benchmarks.bench_api [--concurrency 1 8 32] [--requests 64]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+# In-process runs use the fake backend with no caching, so every request does the full work
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LLM_FAKE_LATENCY", "lognormal")
+os.environ.setdefault("LLM_FAKE_LATENCY_MS", "100")
+os.environ.setdefault("LLM_FAKE_TOKENS_PER_SECOND", "0")
+os.environ.setdefault("LLM_CACHE_MAX_ENTRIES", "0")
+os.environ.setdefault("PARSE_CACHE_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_optimize import JOB, make_resume  # noqa: E402
+from benchmarks.bench_parser import make_docx_document  # noqa: E402
+from benchmarks.common import summarize  # noqa: E402
+
+SCENARIOS = ("optimize", "upload")
+
+def _make_client(url: Optional[str]) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(120.0)
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+    from fastapi import FastAPI
+    from app.api.resume_router import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=timeout
+    )
+
+def _request_factory(scenario: str):
+    if scenario == "optimize":
+        def optimize(client: httpx.AsyncClient, index: int):
+            payload = {
+                "resume": make_resume(variant=index).model_dump(),
+                "job_description": JOB.model_dump(),
+                "optimization_level": 0.5,
+            }
+            return client.post("/api/resume/optimize", json=payload)
+        return optimize
+    document = make_docx_document(10)
+
+    def upload(client: httpx.AsyncClient, index: int):
+        files = {"file": (f"resume-{index}.docx", document, "application/octet-stream")}
+        return client.post("/api/resume/upload", files=files)
+    return upload
+
+async def bench_scenario(client: httpx.AsyncClient, scenario: str, concurrency: int,
+                         requests: int) -> Dict[str, object]:
+    send = _request_factory(scenario)
+    limiter = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        async with limiter:
+            start = time.perf_counter()
+            response = await send(client, index)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        **summarize(latencies),
+    }
+
+async def run(concurrency_levels: List[int] = (1, 8, 32), requests: int = 64,
+              scenarios: List[str] = SCENARIOS, url: Optional[str] = None) -> List[Dict[str, object]]:
+    results = []
+    async with _make_client(url) as client:
+        try:
+            for scenario in scenarios:
+                for concurrency in concurrency_levels:
+                    results.append(await bench_scenario(client, scenario, concurrency, requests))
+        finally:
+            if not url:
+                from app.utils.async_parser import get_document_parser
+                get_document_parser().shutdown(wait=False)
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="Requests per scenario and level")
+    parser.add_argument("--scenario", choices=SCENARIOS, nargs="+", default=list(SCENARIOS))
+    parser.add_argument("--url", help="Base URL of a running server instead of the in-process app")
+    args = parser.parse_args()
+    results = asyncio.run(run(args.concurrency, args.requests, args.scenario, args.url))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+JobIndex lookup latency as the index grows.
+
+Each size is filled with generated job descriptions spread over a few
+resume namespaces, then queried with light edits of indexed descriptions
+(hits) and unrelated ones (misses).
+
+Usage:
+    python -m benchmarks.bench_job_index [--queries 200]
+"""
+import argparse
+import json
+import random
+from typing import Dict, List
+
+from app.services.job_index import JobIndex
+from benchmarks.common import summarize, time_calls
+
+INDEX_SIZES = (100, 1000, 10000)
+NAMESPACES = 20
+WORDS = (
+    "python fastapi postgresql kubernetes docker terraform aws gcp kafka redis react typescript "
+    "golang rust java spring airflow spark pandas pytorch mentoring ownership observability "
+    "microservices payments search ranking security compliance latency reliability billing"
+).split()
+
+def make_description(rng: random.Random, words: int = 120) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def bench_size(size: int, queries: int) -> Dict[str, object]:
+    rng = random.Random(size)
+    index = JobIndex(max_entries=size)
+    descriptions = [make_description(rng) for _ in range(size)]
+    for number, description in enumerate(descriptions):
+        index.add(f"resume-{number % NAMESPACES}", description, number)
+
+    def lookups(hit: bool):
+        picks = [rng.randrange(size) for _ in range(queries)]
+        texts = [
+            descriptions[pick] + " Hybrid role." if hit else make_description(rng) for pick in picks
+        ]
+        return lambda: [index.query(f"resume-{pick % NAMESPACES}", text)
+                        for pick, text in zip(picks, texts)]
+
+    results = {"entries": size}
+    for label, hit in (("hit", True), ("miss", False)):
+        latencies = time_calls(lookups(hit), repeat=3)
+        results[label] = summarize([latency / queries for latency in latencies])
+    return results
+
+def run(queries: int = 200) -> List[Dict[str, object]]:
+    return [bench_size(size, queries) for size in INDEX_SIZES]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.queries), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+End-to-end optimize_resume latency with the fake LLM backend.
+
+Every LLM call goes through FakeChatModel with the chosen latency
+distribution and streaming rate, and the LLM cache is disabled, so the
+numbers show the optimizer's own overhead and how well it overlaps calls.
+
+With --hedge-budget, slow section calls are hedged (see HedgePolicy), which
+is worth comparing against a run without it under --latency heavy_tail.
+
+Usage:
+    python -m benchmarks.bench_optimize [--requests 20] [--concurrency 4] [--hedge-budget 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from app.models.resume import JobDescription, Resume, ResumeSection  # noqa: E402
+from app.services.fake_llm import LATENCY_DISTRIBUTIONS, FakeChatModel  # noqa: E402
+from app.services.job_index import JobIndex  # noqa: E402
+from app.services.llm_cache import LLMCache  # noqa: E402
+from app.services.resume_optimizer import FORMATTERS, OPTIMIZATION_MODES, ResumeOptimizer  # noqa: E402
+from app.utils.hedging import HedgePolicy  # noqa: E402
+from benchmarks.common import summarize  # noqa: E402
+
+SECTION_LINE = "Built and operated Python services handling 10k requests per second"
+HEADINGS = ("Experience", "Projects", "Skills", "Education", "Certifications", "Publications")
+
+JOB = JobDescription(
+    title="Senior Python Engineer",
+    description=(
+        "We are looking for a Python engineer to build FastAPI services.\n"
+        "Experience with PostgreSQL, Kubernetes and distributed systems.\n"
+        "Benefits\nUnlimited PTO and free lunch."
+    )
+)
+
+def make_resume(num_sections: int = 6, lines_per_section: int = 5, variant: int = 0) -> Resume:
+    sections = [
+        ResumeSection(
+            title=HEADINGS[i % len(HEADINGS)],
+            content="\n".join(f"{SECTION_LINE} ({variant}.{i}.{j})" for j in range(lines_per_section))
+        )
+        for i in range(num_sections)
+    ]
+    return Resume(
+        sections=sections,
+        raw_text="\n\n".join(section.content for section in sections),
+        metadata={"file_type": "docx"}
+    )
+
+async def bench_mode(mode: str, requests: int, concurrency: int, llm: FakeChatModel,
+                     sections: int, hedge_budget: float = 0.0,
+                     formatter: str = "local") -> Dict[str, object]:
+    # Hedge from the first few samples on: the fake latencies are far below the default floor
+    hedge_policy = HedgePolicy("optimize_section", budget=hedge_budget, min_delay=0, min_samples=10)
+    optimizer = ResumeOptimizer(
+        cache=LLMCache(max_entries=0), job_index=JobIndex(max_entries=0), hedge_policy=hedge_policy
+    )
+    optimizer.llm = llm
+    limiter = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(variant: int) -> None:
+        # A distinct resume per request, so nothing is shared between requests
+        resume = make_resume(sections, variant=variant)
+        async with limiter:
+            start = time.perf_counter()
+            await optimizer.optimize_resume(resume, JOB, 0.5, mode=mode, formatter=formatter)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(variant) for variant in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "formatter": formatter,
+        "requests": requests,
+        "concurrency": concurrency,
+        "sections": sections,
+        "hedges": hedge_policy.hedges,
+        "throughput_rps": requests / elapsed,
+        **summarize(latencies),
+    }
+
+async def run(requests: int = 20, concurrency: int = 4, sections: int = 6,
+              latency: str = "lognormal", latency_ms: float = 200,
+              tokens_per_second: float = 200, seed: int = 0,
+              hedge_budget: float = 0.0, formatter: str = "local") -> List[Dict[str, object]]:
+    results = []
+    for mode in OPTIMIZATION_MODES:
+        llm = FakeChatModel(latency=latency, latency_ms=latency_ms,
+                            tokens_per_second=tokens_per_second, seed=seed)
+        result = await bench_mode(mode, requests, concurrency, llm, sections, hedge_budget, formatter)
+        results.append({"latency": latency, "latency_ms": latency_ms, **result})
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hedge-budget", type=float, default=0.0, help="Share of extra calls, e.g. 0.05")
+    parser.add_argument("--formatter", choices=FORMATTERS, default="local")
+    args = parser.parse_args()
+    results = asyncio.run(run(
+        args.requests, args.concurrency, args.sections, args.latency,
+        args.latency_ms, args.tokens_per_second, args.seed, args.hedge_budget, args.formatter
+    ))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare the "sectioned" and "one_shot" optimization modes on latency and token usage.
+
+The LLM is simulated: each call sleeps for a fixed round-trip latency plus a
+per-completion-token generation time, so the numbers reflect how many calls
+and how many tokens each mode needs rather than provider variance.
+
+Usage:
+    python -m benchmarks.bench_optimizer_modes [--sections 6] [--runs 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from app.models.resume import JobDescription, Resume, ResumeSection  # noqa: E402
+from app.services.job_index import JobIndex  # noqa: E402
+from app.services.llm_cache import LLMCache  # noqa: E402
+from app.services.resume_optimizer import OPTIMIZATION_MODES, ResumeOptimizer  # noqa: E402
+from app.utils.tokens import count_tokens  # noqa: E402
+
+SECTION_LINE = "• Built and operated Python services handling 10k requests per second"
+
+class SimulatedLLM:
+    def __init__(self, round_trip: float, per_token: float):
+        self.round_trip = round_trip
+        self.per_token = per_token
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def _reply(self, prompt: str) -> str:
+        if "Resume Sections (JSON):" in prompt:
+            raw = prompt.split("Resume Sections (JSON):", 1)[1].split("\n\n", 1)[0].strip()
+            sections = json.loads(raw)
+            return json.dumps({"sections": sections, "changes": ["Rewrote all sections"]})
+        if "Current Resume Section:" in prompt:
+            return prompt.split("Current Resume Section:", 1)[1].split("\n\n", 1)[0].strip()
+        return prompt.split("preserving all content:", 1)[-1].strip()
+
+    async def ainvoke(self, messages):
+        prompt = "\n".join(message.content for message in messages)
+        reply = self._reply(messages[-1].content)
+        completion_tokens = count_tokens(reply)
+        self.calls += 1
+        self.prompt_tokens += count_tokens(prompt)
+        self.completion_tokens += completion_tokens
+        await asyncio.sleep(self.round_trip + completion_tokens * self.per_token)
+        return AIMessage(content=reply)
+
+def make_resume(num_sections: int, lines_per_section: int) -> Resume:
+    sections = [
+        ResumeSection(
+            title=f"SECTION {i}",
+            content="\n".join(f"{SECTION_LINE} ({i}.{j})" for j in range(lines_per_section))
+        )
+        for i in range(num_sections)
+    ]
+    return Resume(
+        sections=sections,
+        raw_text="\n\n".join(section.content for section in sections),
+        metadata={"file_type": "docx"}
+    )
+
+async def bench_mode(mode: str, resume: Resume, job: JobDescription, runs: int,
+                     round_trip: float, per_token: float) -> dict:
+    latencies = []
+    llm = SimulatedLLM(round_trip, per_token)
+    # Caching and result reuse are disabled so that every run pays for its LLM calls
+    optimizer = ResumeOptimizer(cache=LLMCache(max_entries=0), job_index=JobIndex(max_entries=0))
+    optimizer.llm = llm
+    for _ in range(runs):
+        start = time.perf_counter()
+        await optimizer.optimize_resume(resume, job, 0.5, mode=mode)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "mode": mode,
+        "runs": runs,
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_max_s": max(latencies),
+        "llm_calls_per_run": llm.calls / runs,
+        "prompt_tokens_per_run": llm.prompt_tokens / runs,
+        "completion_tokens_per_run": llm.completion_tokens / runs,
+        "total_tokens_per_run": (llm.prompt_tokens + llm.completion_tokens) / runs,
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--lines", type=int, default=5, help="Lines per section")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--round-trip", type=float, default=0.2, help="Simulated seconds per call")
+    parser.add_argument("--per-token", type=float, default=0.002, help="Simulated seconds per output token")
+    args = parser.parse_args()
+
+    resume = make_resume(args.sections, args.lines)
+    job = JobDescription(
+        title="Senior Python Engineer",
+        description="We are looking for a Python engineer with FastAPI and distributed systems experience."
+    )
+    results = [
+        await bench_mode(mode, resume, job, args.runs, args.round_trip, args.per_token)
+        for mode in OPTIMIZATION_MODES
+    ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""
+Micro-benchmarks for DocumentParser.parse_pdf and parse_docx on generated
+documents of increasing size.
+
+Usage:
+    python -m benchmarks.bench_parser [--repeat 5]
+"""
+import argparse
+import json
+from typing import Dict, List
+
+from app.utils.document_parser import DocumentParser
+from benchmarks.common import summarize, time_calls
+from tests.documents import make_docx, make_pdf
+
+PDF_PAGES = (1, 5, 20, 50)
+DOCX_SECTIONS = (5, 25, 100)
+LINES_PER_PAGE = 40
+PARAGRAPHS_PER_SECTION = 8
+LINE = "Built and operated Python services handling 10k requests per second"
+HEADINGS = ("EXPERIENCE", "EDUCATION", "SKILLS", "PROJECTS", "CERTIFICATIONS")
+
+def make_pdf_document(pages: int) -> bytes:
+    content = []
+    for page in range(pages):
+        lines: List[object] = [(HEADINGS[page % len(HEADINGS)], 16)]
+        lines += [f"{LINE} ({page}.{line})" for line in range(LINES_PER_PAGE)]
+        content.append(lines)
+    return make_pdf(content)
+
+def make_docx_document(sections: int) -> bytes:
+    return make_docx([
+        (f"{HEADINGS[i % len(HEADINGS)]} {i}",
+         [f"{LINE} ({i}.{j})" for j in range(PARAGRAPHS_PER_SECTION)])
+        for i in range(sections)
+    ])
+
+def run(repeat: int = 5) -> List[Dict[str, object]]:
+    results = []
+    for pages in PDF_PAGES:
+        document = make_pdf_document(pages)
+        latencies = time_calls(lambda: DocumentParser.parse_pdf(document), repeat)
+        results.append({"parser": "pdf", "pages": pages, "bytes": len(document), **summarize(latencies)})
+    for sections in DOCX_SECTIONS:
+        document = make_docx_document(sections)
+        latencies = time_calls(lambda: DocumentParser.parse_docx(document), repeat)
+        results.append({"parser": "docx", "sections": sections, "bytes": len(document), **summarize(latencies)})
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+if __name__ == "__main__":
+    main()
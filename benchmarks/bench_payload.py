@@ -0,0 +1,67 @@
+"""
+Size of an /optimize response body per response shape, plain and gzipped.
+
+One optimization runs with the fake LLM backend, then its response is
+encoded the way the API would for each set of request options: the full
+response, without the original resume, sections only, and the compact
+forms of those.
+
+Usage:
+    python -m benchmarks.bench_payload [--sections 6] [--lines 5]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+from typing import Dict, List
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from app.models.resume import ResponseOptions  # noqa: E402
+from app.services.fake_llm import FakeChatModel  # noqa: E402
+from app.services.job_index import JobIndex  # noqa: E402
+from app.services.llm_cache import LLMCache  # noqa: E402
+from app.services.resume_optimizer import ResumeOptimizer  # noqa: E402
+from app.utils.projection import project  # noqa: E402
+from benchmarks.bench_optimize import JOB, make_resume  # noqa: E402
+
+SHAPES = {
+    "full": ResponseOptions(),
+    "no_original": ResponseOptions(exclude_fields=["original_resume"]),
+    "no_original_compact": ResponseOptions(exclude_fields=["original_resume"], compact=True),
+    "sections_only": ResponseOptions(fields=["optimized_resume.sections", "match_score"]),
+}
+
+def _encode(payload: Dict[str, object]) -> bytes:
+    # The separators JSONResponse uses
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+async def run(sections: int = 6, lines: int = 5) -> List[Dict[str, object]]:
+    optimizer = ResumeOptimizer(cache=LLMCache(max_entries=0), job_index=JobIndex(max_entries=0))
+    optimizer.llm = FakeChatModel(latency_ms=0, tokens_per_second=0)
+    response = await optimizer.optimize_resume(make_resume(sections, lines), JOB)
+
+    results = []
+    full_bytes = None
+    for shape, options in SHAPES.items():
+        body = _encode(project(response, options.fields, options.exclude_fields, options.compact))
+        full_bytes = full_bytes or len(body)
+        results.append({
+            "shape": shape,
+            "sections": sections,
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, compresslevel=6)),
+            "share_of_full": len(body) / full_bytes,
+        })
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--lines", type=int, default=5, help="Lines per section")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.sections, args.lines)), indent=2))
+
+if __name__ == "__main__":
+    main()
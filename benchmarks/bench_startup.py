@@ -0,0 +1,88 @@
+"""
+Cold start of the app: the time to import app.main in a fresh interpreter,
+with and without the Gradio UI, and the latency of the first optimize
+request, which pays for building the optimizer and LLM client lazily.
+
+Each run is a separate subprocess with the fake LLM backend, so nothing is
+shared between runs.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.common import summarize
+
+# Runs in the child: prints the import and first-request times in seconds
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter() - start
+
+import httpx
+
+# Built by hand: benchmarks.bench_optimize would import the optimizer up front
+LINE = "Built and operated Python services handling 10k requests per second"
+sections = [{"title": title, "content": "\\n".join([LINE] * 5)}
+            for title in ("Experience", "Projects", "Skills")]
+payload = {
+    "resume": {"sections": sections, "raw_text": "", "metadata": {"file_type": "docx"}},
+    "job_description": {"title": "Python Engineer", "description": "Python and FastAPI services."},
+}
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        response = await client.post("/api/resume/optimize", json=payload)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+print(json.dumps({"import": imported, "first_request": asyncio.run(first_request())}))
+"""
+
+CHILD_ENV = {
+    "LLM_BACKEND": "fake",
+    "LLM_FAKE_LATENCY": "fixed",
+    "LLM_FAKE_LATENCY_MS": "0",
+    "LLM_FAKE_TOKENS_PER_SECOND": "0",
+    "LLM_CACHE_MAX_ENTRIES": "0",
+}
+
+def measure(serve_ui: bool) -> Dict[str, float]:
+    env = {**os.environ, **CHILD_ENV, "SERVE_UI": "true" if serve_ui else "false"}
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - start
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {"process": elapsed, **timings}
+
+def run(repeat: int = 5) -> List[Dict[str, object]]:
+    results = []
+    for serve_ui in (True, False):
+        runs = [measure(serve_ui) for _ in range(repeat)]
+        results.append({
+            "serve_ui": serve_ui,
+            "import": summarize([r["import"] for r in runs]),
+            "first_request": summarize([r["first_request"] for r in runs]),
+            "process": summarize([r["process"] for r in runs]),
+        })
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Helpers shared by the benchmarks: timing summaries and run metadata.
+"""
+import platform
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List, Sequence
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of values, e.g. fraction=0.95 for p95."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(latencies: Sequence[float]) -> Dict[str, float]:
+    """Latency statistics in milliseconds."""
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "min_ms": min(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+def time_calls(fn: Callable[[], object], repeat: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run_metadata() -> Dict[str, str]:
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files written by benchmarks.run.
+
+Prints the relative change of each latency and throughput figure, and flags
+p95 latency regressions above the threshold. Exits with status 1 if any
+were found, so it can gate CI.
+
+Usage:
+    python -m benchmarks.compare old.json new.json [--threshold 0.1]
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+# Fields that identify a benchmark case rather than measure it
+KEY_FIELDS = (
+    "parser", "pages", "sections", "mode", "latency", "scenario", "concurrency", "serve_ui", "entries"
+)
+SUITES = ("parser", "optimize", "api", "startup", "job_index")
+METRICS = ("p50_ms", "p95_ms", "throughput_rps")
+
+def _cases(results: Dict[str, object]) -> Iterator[Tuple[str, Dict[str, float]]]:
+    for suite in SUITES:
+        for case in results.get(suite, []):
+            key = " ".join(f"{field}={case[field]}" for field in KEY_FIELDS if field in case)
+            # Some cases hold one latency summary per phase, e.g. startup's import and first request
+            nested = {name: value for name, value in case.items() if isinstance(value, dict)}
+            if not nested:
+                yield f"{suite}: {key}", case
+            for name, summary in nested.items():
+                yield f"{suite}: {key} {name}", summary
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed p95 slowdown, 0.1 = 10%%")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    old_cases = dict(_cases(old))
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    regressions = 0
+    for name, case in _cases(new):
+        previous = old_cases.get(name)
+        if previous is None:
+            continue
+        changes = []
+        for metric in METRICS:
+            if metric in case and previous.get(metric):
+                change = case[metric] / previous[metric] - 1
+                changes.append(f"{metric} {change:+.1%}")
+                if metric == "p95_ms" and change > args.threshold:
+                    regressions += 1
+                    changes[-1] += " REGRESSION"
+        print(f"{name}: {', '.join(changes)}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Run the benchmark suite and write the results as JSON.
+
+The output records the git commit, so result files from two commits can be
+compared with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.run [--output bench_results/HEAD.json] [--quick]
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from benchmarks import bench_api, bench_job_index, bench_optimize, bench_parser, bench_startup
+from benchmarks.common import run_metadata
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="JSON file to write, printed to stdout if omitted")
+    parser.add_argument("--quick", action="store_true", help="Fewer repetitions, for smoke runs")
+    args = parser.parse_args()
+
+    repeat, requests = (2, 8) if args.quick else (5, 32)
+    results = {
+        **run_metadata(),
+        "parser": bench_parser.run(repeat=repeat),
+        "optimize": asyncio.run(bench_optimize.run(requests=requests)),
+        "api": asyncio.run(bench_api.run(requests=requests)),
+        "startup": bench_startup.run(repeat=repeat),
+        "job_index": bench_job_index.run(queries=requests * 4),
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Wrote {args.output}")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
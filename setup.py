@@ -12,10 +12,17 @@ setup(
         "python-dotenv",
         "langchain",
         "langchain-openai",
+        "tiktoken",
+        "numpy",
         "python-docx",
         "pypdf",
         "gradio",
     ],
+    entry_points={
+        "console_scripts": [
+            "resume-rewriter=app.cli:main",
+        ],
+    },
     extras_require={
         "test": [
             "pytest",
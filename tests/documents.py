@@ -0,0 +1,77 @@
+"""
+Builders for small, real PDF and DOCX documents used by the parser tests.
+"""
+import io
+from typing import List, Sequence, Tuple
+
+from docx import Document
+
+
+def make_docx(sections: Sequence[Tuple[str, Sequence[str]]]) -> bytes:
+    """Build a DOCX with one Heading 1 per section followed by its paragraphs."""
+    document = Document()
+    for title, paragraphs in sections:
+        document.add_heading(title, level=1)
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_plain_docx(paragraphs: Sequence[str]) -> bytes:
+    """Build a DOCX of plain paragraphs, without any Heading styles."""
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: Sequence[Sequence[object]]) -> bytes:
+    """
+    Build a PDF with one page per entry in pages. Each line is either a
+    string (12pt) or a (text, font_size) tuple.
+    """
+    objects: List[bytes] = []
+    page_ids = [3 + 2 * i for i in range(len(pages))]
+    font_id = 3 + 2 * len(pages)
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    for page_id, lines in zip(page_ids, pages):
+        commands = ["BT"]
+        y = 750
+        for line in lines:
+            text, size = (line, 12) if isinstance(line, str) else line
+            commands.append(f"/F1 {size} Tf 1 0 0 1 72 {y} Tm ({_escape(text)}) Tj")
+            y -= int(size * 1.6)
+        commands.append("ET")
+        stream = "\n".join(commands).encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(
+            b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream"
+        )
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+    return bytes(output)
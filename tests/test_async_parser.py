@@ -0,0 +1,138 @@
+import asyncio
+import time
+import pytest
+from app.utils import async_parser
+from app.utils.async_parser import AsyncDocumentParser, ParserBusyError, ParserTimeoutError
+from app.utils.parse_cache import ParseCache
+from tests.documents import make_docx, make_pdf
+
+
+@pytest.fixture
+def docx_content():
+    return make_docx([("Experience", ["Built Python services"]), ("Skills", ["Python, SQL"])])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor_type", ["thread", "process"])
+async def test_parse_in_pool(executor_type, docx_content):
+    parser = AsyncDocumentParser(executor_type=executor_type, max_workers=1)
+    try:
+        resume = await parser.parse(docx_content, "docx")
+        pdf_resume = await parser.parse(make_pdf([["Jane Doe", "Python engineer"]]), "pdf")
+    finally:
+        parser.shutdown()
+
+    assert [section.title for section in resume.sections] == ["Experience", "Skills"]
+    assert "Python engineer" in pdf_resume.raw_text
+    assert parser.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_parse_does_not_block_event_loop(monkeypatch, docx_content):
+    def slow_parse(file_content, file_type):
+        time.sleep(0.2)
+        return "parsed"
+
+    monkeypatch.setattr(async_parser, "_parse", slow_parse)
+    parser = AsyncDocumentParser(executor_type="thread", max_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        assert await parser.parse(docx_content, "docx") == "parsed"
+    finally:
+        task.cancel()
+        parser.shutdown()
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_parse_timeout(monkeypatch, docx_content):
+    monkeypatch.setattr(async_parser, "_parse", lambda content, file_type: time.sleep(0.2))
+    parser = AsyncDocumentParser(executor_type="thread", timeout=0.05, max_pending=1)
+    try:
+        with pytest.raises(ParserTimeoutError):
+            await parser.parse(docx_content, "docx")
+        # The timed-out worker is still parsing, so it still takes a slot
+        assert parser.pending == 1
+        with pytest.raises(ParserBusyError):
+            await parser.parse(docx_content, "docx")
+        await asyncio.sleep(0.3)
+        assert parser.pending == 0
+    finally:
+        parser.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_cap(monkeypatch, docx_content):
+    monkeypatch.setattr(async_parser, "_parse", lambda content, file_type: time.sleep(0.1))
+    parser = AsyncDocumentParser(executor_type="thread", max_workers=1, max_pending=2)
+    try:
+        results = await asyncio.gather(
+            *(parser.parse(docx_content, "docx") for _ in range(3)), return_exceptions=True
+        )
+    finally:
+        parser.shutdown()
+
+    assert sum(isinstance(result, ParserBusyError) for result in results) == 1
+
+
+@pytest.mark.asyncio
+async def test_unsupported_file_type():
+    with pytest.raises(ValueError):
+        await AsyncDocumentParser(executor_type="thread").parse(b"text", "txt")
+
+
+@pytest.mark.asyncio
+async def test_parse_path(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf([["Jane Doe", "Python engineer"]]))
+    parser = AsyncDocumentParser(executor_type="process", max_workers=1)
+    try:
+        resume = await parser.parse_path(path, "pdf")
+    finally:
+        parser.shutdown()
+    assert resume.raw_text == "Jane Doe\nPython engineer"
+
+
+@pytest.mark.asyncio
+async def test_repeated_upload_served_from_parse_cache(monkeypatch, tmp_path, docx_content):
+    calls = []
+    real_parse = async_parser._parse
+
+    def counting_parse(file_content, file_type):
+        calls.append(file_type)
+        return real_parse(file_content, file_type)
+
+    monkeypatch.setattr(async_parser, "_parse", counting_parse)
+    cache = ParseCache(path=str(tmp_path / "parse.db"))
+    parser = AsyncDocumentParser(executor_type="thread", cache=cache)
+    try:
+        first = await parser.parse(docx_content, "docx")
+        second = await parser.parse(docx_content, "docx")
+        path = tmp_path / "resume.docx"
+        path.write_bytes(docx_content)
+        third = await parser.parse_path(path, "docx")
+    finally:
+        parser.shutdown()
+
+    assert calls == ["docx"]
+    assert first == second == third
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # The on-disk tier survives a restart
+    fresh = ParseCache(path=str(tmp_path / "parse.db"))
+    assert fresh.get(ParseCache.key_for_bytes(docx_content, "docx")) == first
+
+
+def test_parse_cache_key_depends_on_type_and_version(monkeypatch, docx_content):
+    key = ParseCache.key_for_bytes(docx_content, "docx")
+    assert key != ParseCache.key_for_bytes(docx_content, "pdf")
+    monkeypatch.setattr("app.utils.parse_cache.PARSER_VERSION", "next")
+    assert key != ParseCache.key_for_bytes(docx_content, "docx")
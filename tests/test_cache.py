@@ -0,0 +1,115 @@
+import pytest
+from app.services.llm_cache import LLMCache
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: Clock.now)
+    monkeypatch.setattr("app.utils.cache.time.time", lambda: Clock.now)
+    return Clock
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_lru_enforces_max_bytes():
+    cache = LRUCache(max_entries=10, max_bytes=6)
+    cache.set("a", "xxx")
+    cache.set("b", "yyy")
+    cache.set("c", "zzz")
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_lru_expires_entries(clock):
+    cache = LRUCache(max_entries=10, ttl=60)
+    cache.set("a", "1")
+    clock.now += 61
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_tier_ttl_and_eviction(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2, ttl=60)
+    cache.set("a", "1")
+    clock.now += 1
+    cache.set("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"  # refreshes access time, so "b" is evicted next
+    clock.now += 1
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    clock.now += 61
+    assert cache.get("c") is None
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    path = str(tmp_path / "cache.db")
+    TieredCache(LRUCache(), SQLiteCache(path)).set("key", "value")
+
+    # A fresh process only has the disk tier populated
+    cache = TieredCache(LRUCache(), SQLiteCache(path))
+    assert cache.get("key") == "value"
+    assert cache.memory.get("key") == "value"
+
+
+def test_sqlite_tier_trims_below_limit(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, max_entries=10)
+    for index in range(10):
+        clock.now += 1
+        cache.set(f"key-{index}", "value")
+    cache.set("key-0", "replaced")  # replacing an entry does not grow the cache
+
+    clock.now += 1
+    cache.set("key-10", "value")
+
+    # Trimmed to a tenth below the limit, oldest accesses first
+    assert SQLiteCache(path)._count == 9
+    assert cache.get("key-1") is None
+    assert cache.get("key-0") == "replaced"
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_async_access(tmp_path):
+    path = str(tmp_path / "cache.db")
+    await TieredCache(LRUCache(), SQLiteCache(path)).aset("key", "value")
+
+    cache = TieredCache(LRUCache(), SQLiteCache(path))
+    assert await cache.aget("key") == "value"
+    assert cache.memory.get("key") == "value"
+    assert await cache.aget("missing") is None
+
+
+def test_llm_cache_counts_hits_and_misses_per_stage():
+    cache = LLMCache()
+    key = LLMCache.make_key("model", "template", "section", "job", 0.5)
+    assert key == LLMCache.make_key("model", "template", "section", "job", 0.5)
+    assert key != LLMCache.make_key("model", "template", "section", "job", 0.6)
+
+    assert cache.get("optimize_section", key) is None
+    cache.set("optimize_section", key, "rewritten")
+    assert cache.get("optimize_section", key) == "rewritten"
+    assert cache.get("format_resume", key) == "rewritten"
+
+    assert cache.stats() == {
+        "optimize_section": {"hits": 1, "misses": 1},
+        "format_resume": {"hits": 1, "misses": 0},
+    }
@@ -0,0 +1,123 @@
+import json
+import pytest
+from app import cli
+from app.models.resume import JobDescription
+from app.services.fake_llm import FakeChatModel
+from app.services.job_index import JobIndex
+from app.services.llm_cache import LLMCache
+from app.services.resume_optimizer import ResumeOptimizer
+from app.utils.async_parser import AsyncDocumentParser
+from tests.documents import make_docx
+
+
+class CountingLLM(FakeChatModel):
+    def __init__(self):
+        super().__init__(latency_ms=0, tokens_per_second=0)
+        self.calls = 0
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.calls += 1
+        return await super().ainvoke(messages, *args, **kwargs)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    resumes = tmp_path / "resumes"
+    (resumes / "nested").mkdir(parents=True)
+    for path, skill in (("alice.docx", "Python"), ("nested/bob.docx", "Kubernetes")):
+        (resumes / path).write_bytes(make_docx([
+            ("EXPERIENCE", [f"Built {skill} services handling payments traffic for five years"]),
+        ]))
+    (resumes / "notes.txt").write_text("ignored")
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text(
+        json.dumps({"id": "py", "title": "Python Engineer", "description": "Python and FastAPI services"})
+        + "\n"
+        + json.dumps({"title": "SRE", "description": "Kubernetes operations and on-call"}) + "\n"
+    )
+    return resumes, jobs, tmp_path / "results.jsonl"
+
+
+@pytest.fixture
+def make_optimizer(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    def factory():
+        optimizer = ResumeOptimizer(cache=LLMCache(max_entries=0), job_index=JobIndex(max_entries=0))
+        optimizer.llm = CountingLLM()
+        return optimizer
+    return factory
+
+
+SRE_ID = cli.default_job_id(JobDescription(title="SRE", description="Kubernetes operations and on-call"))
+
+
+async def run(workspace, optimizer):
+    resumes, jobs, output = workspace
+    parser = AsyncDocumentParser(executor_type="thread", max_workers=2)
+    return await cli.run_batch(str(resumes), str(jobs), str(output), optimizer=optimizer,
+                               parser=parser, concurrency=2)
+
+
+def read_records(output):
+    return [json.loads(line) for line in output.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_run_writes_one_line_per_pair(workspace, make_optimizer):
+    summary = await run(workspace, make_optimizer())
+
+    assert (summary.succeeded, summary.failed, summary.skipped) == (4, 0, 0)
+    records = read_records(workspace[2])
+    assert sorted((r["resume"], r["job_id"]) for r in records) == sorted([
+        ("alice.docx", "py"), ("alice.docx", SRE_ID), ("nested/bob.docx", "py"), ("nested/bob.docx", SRE_ID)
+    ])
+    assert all(r["status"] == "succeeded" and r["result"]["optimized_resume"] for r in records)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_checkpoint(workspace, make_optimizer):
+    await run(workspace, make_optimizer())
+    output = workspace[2]
+    lines = output.read_text().splitlines()
+    # Keep one finished pair, a failed one and a line cut short mid-write
+    failed = {**json.loads(lines[1]), "status": "failed", "error": "boom"}
+    failed.pop("result")
+    output.write_text(lines[0] + "\n" + json.dumps(failed) + "\n" + lines[2][:40])
+
+    optimizer = make_optimizer()
+    summary = await run(workspace, optimizer)
+
+    assert (summary.succeeded, summary.skipped) == (3, 1)
+    assert optimizer.llm.calls == 3  # one section per pair, formatted locally
+    records = read_records(output)
+    succeeded = {(r["resume"], r["job_id"]) for r in records if r["status"] == "succeeded"}
+    assert len(succeeded) == 4
+
+
+@pytest.mark.asyncio
+async def test_reordered_jobs_file_keeps_checkpoint(workspace, make_optimizer):
+    await run(workspace, make_optimizer())
+    jobs = workspace[1]
+    jobs.write_text("\n".join(reversed(jobs.read_text().splitlines())) + "\n")
+
+    optimizer = make_optimizer()
+    summary = await run(workspace, optimizer)
+
+    assert (summary.succeeded, summary.skipped) == (0, 4)
+    assert optimizer.llm.calls == 0
+
+
+def test_load_jobs_from_csv(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(
+        "id,title,description,requirements\n"
+        "a,Engineer,Build APIs,Python; SQL\n"
+        ",Designer,Design things,\n"
+    )
+    jobs = cli.load_jobs(str(path))
+    assert [entry.job_id for entry in jobs] == [
+        "a", cli.default_job_id(JobDescription(title="Designer", description="Design things"))
+    ]
+    assert jobs[0].job.requirements == ["Python", "SQL"]
+    assert jobs[1].job.requirements is None
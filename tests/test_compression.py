@@ -0,0 +1,55 @@
+import gzip
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from app.utils.compression import GZipMiddleware
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    async def large():
+        return {"text": "Built Python services " * 50}
+
+    @app.get("/small")
+    async def small():
+        return {"text": "ok"}
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for number in range(3):
+                yield f"event: token\ndata: {number}\n\n" * 20
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def get_raw(client, path, accept_encoding="gzip"):
+    async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response.headers, b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+@pytest.mark.asyncio
+async def test_large_json_gzipped_when_accepted(client):
+    headers, body = await get_raw(client, "/large")
+    assert headers["content-encoding"] == "gzip"
+    assert b"Built Python services" in gzip.decompress(body)
+    assert len(body) < 200
+
+    headers, body = await get_raw(client, "/large", accept_encoding="identity")
+    assert "content-encoding" not in headers
+
+
+@pytest.mark.asyncio
+async def test_small_and_streamed_responses_sent_as_is(client):
+    headers, _ = await get_raw(client, "/small")
+    assert "content-encoding" not in headers
+
+    headers, body = await get_raw(client, "/events")
+    assert "content-encoding" not in headers
+    assert body.count(b"event: token") == 60
@@ -0,0 +1,98 @@
+import pytest
+from app.utils.document_parser import DocumentParser, DocumentTooLargeError, detect_file_type
+from app.utils.section_segmenter import TextLine, is_heading
+from tests.documents import make_docx, make_pdf
+
+
+@pytest.fixture
+def long_pdf():
+    return make_pdf([[f"Page {page} line {line}" for line in range(3)] for page in range(20)])
+
+
+def test_parse_pdf_keeps_page_order(long_pdf):
+    resume = DocumentParser.parse_pdf(long_pdf)
+
+    lines = resume.raw_text.split("\n")
+    assert lines == [f"Page {page} line {line}" for page in range(20) for line in range(3)]
+    assert resume.metadata == {"file_type": "pdf"}
+
+
+def test_parse_pdf_path_matches_bytes(tmp_path, long_pdf):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(long_pdf)
+
+    assert DocumentParser.parse_pdf_path(path) == DocumentParser.parse_pdf(long_pdf)
+
+
+def test_parse_docx_path_matches_bytes(tmp_path):
+    content = make_docx([("Experience", ["Built Python services"])])
+    path = tmp_path / "resume.docx"
+    path.write_bytes(content)
+
+    assert DocumentParser.parse_docx_path(path) == DocumentParser.parse_docx(content)
+
+
+def test_page_limit(long_pdf):
+    with pytest.raises(DocumentTooLargeError):
+        DocumentParser.parse_pdf(long_pdf, max_pages=10)
+
+
+def test_byte_limit(tmp_path, long_pdf):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(long_pdf)
+
+    with pytest.raises(DocumentTooLargeError):
+        DocumentParser.parse_pdf(long_pdf, max_bytes=100)
+    with pytest.raises(DocumentTooLargeError):
+        DocumentParser.parse_pdf_path(path, max_bytes=100)
+
+
+def test_detect_file_type(tmp_path):
+    pdf = make_pdf([["Jane Doe"]])
+    docx = make_docx([("Experience", ["Built things"])])
+    path = tmp_path / "upload"
+    path.write_bytes(docx)
+
+    assert detect_file_type(pdf) == "pdf"
+    assert detect_file_type(docx) == "docx"
+    assert detect_file_type(path) == "docx"
+    assert detect_file_type(b"PK\x03\x04 truncated zip") is None
+    assert detect_file_type(b"plain text resume") is None
+
+
+def test_parse_pdf_segments_sections():
+    pdf = make_pdf([
+        [("JANE DOE", 18), "jane@example.com | 555-1234", ("EXPERIENCE", 14),
+         "Senior Engineer, Acme 01/2020 - Present", "Built Python services", "Technical Skills:",
+         "Python, SQL, AWS"],
+        [("OPEN SOURCE", 14), "Maintainer of a FastAPI plugin", "Education", "BSc Computer Science"],
+    ])
+
+    resume = DocumentParser.parse_pdf(pdf)
+
+    assert [(section.title, section.content) for section in resume.sections] == [
+        ("Header", "JANE DOE\njane@example.com | 555-1234"),
+        ("EXPERIENCE", "Senior Engineer, Acme 01/2020 - Present\nBuilt Python services"),
+        ("Technical Skills", "Python, SQL, AWS"),
+        ("OPEN SOURCE", "Maintainer of a FastAPI plugin"),
+        ("Education", "BSc Computer Science"),
+    ]
+    assert "Built Python services" in resume.raw_text
+
+
+def test_parse_pdf_without_headings_keeps_single_section():
+    pdf = make_pdf([["Jane Doe", "Python engineer with ten years of experience"]])
+
+    resume = DocumentParser.parse_pdf(pdf)
+
+    assert [section.title for section in resume.sections] == ["Content"]
+    assert resume.sections[0].content == resume.raw_text
+
+
+def test_is_heading_signals():
+    body = 12.0
+    assert is_heading(TextLine("Experience", 12.0, 20.0, False), body, 20.0)
+    assert is_heading(TextLine("VOLUNTEER WORK", 12.0, 20.0, True), body, 20.0)
+    assert is_heading(TextLine("Side Projects", 15.0, 30.0, True), body, 20.0)
+    assert not is_heading(TextLine("PYTHON, SQL", 12.0, 20.0, True), body, 20.0)
+    assert not is_heading(TextLine("Side Projects", 12.0, 20.0, False), body, 20.0)
@@ -0,0 +1,104 @@
+import json
+import statistics
+import openai
+import pytest
+from langchain_core.messages import HumanMessage
+from app.models.resume import JobDescription, Resume, ResumeSection
+from app.services.fake_llm import FakeChatModel, rewrite_section
+from app.services.llm_cache import LLMCache
+from app.services.llm_provider import LLMProvider
+from app.services.resume_optimizer import ResumeOptimizer
+
+
+@pytest.fixture
+def resume():
+    return Resume(
+        sections=[
+            ResumeSection(title="Experience", content="built python services\n- ran postgres"),
+            ResumeSection(title="Education", content="BSc Computer Science"),
+        ],
+        raw_text="",
+        metadata={"file_type": "docx"}
+    )
+
+
+@pytest.fixture
+def fake_optimizer(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_FAKE_LATENCY_MS", "0")
+    monkeypatch.setenv("LLM_FAKE_TOKENS_PER_SECOND", "0")
+    provider = LLMProvider(backend="fake")
+    monkeypatch.setattr("app.services.resume_optimizer.get_llm_provider", lambda: provider)
+    return ResumeOptimizer(cache=LLMCache(max_entries=0))
+
+
+def test_rewrite_section_is_deterministic():
+    first = rewrite_section("built python services\n- ran postgres", "Python and Postgres role")
+
+    assert first == rewrite_section("built python services\n- ran postgres", "Python and Postgres role")
+    assert first == "• Built python services\n• Ran postgres\n• Relevant to the role: python, postgres"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["sectioned", "one_shot"])
+async def test_optimizer_runs_offline_with_fake_backend(fake_optimizer, resume, mode):
+    job = JobDescription(title="Engineer", description="Python developer with Postgres")
+
+    first = await fake_optimizer.optimize_resume(resume, job, mode=mode)
+    second = await fake_optimizer.optimize_resume(resume, job, mode=mode)
+
+    assert fake_optimizer.model_name == "fake-gpt-4-turbo-preview"
+    assert first.optimized_resume.sections[0].content.startswith("• Built python services")
+    assert first.optimized_resume.raw_text == second.optimized_resume.raw_text
+
+
+@pytest.mark.asyncio
+async def test_fake_stream_yields_reply_in_chunks():
+    model = FakeChatModel(latency_ms=0, tokens_per_second=0)
+    messages = [HumanMessage(content="Please format this resume while preserving all content: a  \n\n\n\nb")]
+
+    chunks = [chunk.content async for chunk in model.astream(messages)]
+
+    assert "".join(chunks) == "a\n\nb"
+    assert len(chunks) > 1
+
+
+@pytest.mark.asyncio
+async def test_fake_one_shot_reply_is_valid_json():
+    model = FakeChatModel(latency_ms=0, tokens_per_second=0)
+    sections = json.dumps([{"title": "Skills", "content": "Python"}])
+    prompt = f"Job Description: Python\n\nResume Sections (JSON): {sections}\n\nPlease rewrite every section"
+
+    reply = json.loads((await model.ainvoke([HumanMessage(content=prompt)])).content)
+
+    assert reply["sections"] == [
+        {"title": "SKILLS", "content": "• Python\n• Relevant to the role: python"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fake_injects_retryable_errors():
+    model = FakeChatModel(latency_ms=0, error_rate=1.0, error_status=429)
+
+    with pytest.raises(openai.RateLimitError):
+        await model.ainvoke([HumanMessage(content="hello")])
+
+
+def test_latency_distributions():
+    fixed = FakeChatModel(latency="fixed", latency_ms=200, seed=1)
+    lognormal = FakeChatModel(latency="lognormal", latency_ms=200, latency_sigma=0.5, seed=1)
+    heavy = FakeChatModel(latency="heavy_tail", latency_ms=200, tail_alpha=1.5, seed=1)
+
+    assert {fixed.sample_latency() for _ in range(10)} == {0.2}
+    lognormal_samples = [lognormal.sample_latency() for _ in range(2000)]
+    assert 0.17 < statistics.median(lognormal_samples) < 0.23
+    heavy_samples = sorted(heavy.sample_latency() for _ in range(2000))
+    assert heavy_samples[0] >= 0.2
+    assert heavy_samples[int(0.99 * len(heavy_samples))] > 5 * statistics.median(heavy_samples)
+
+
+def test_unknown_backend_and_distribution_rejected():
+    with pytest.raises(ValueError):
+        LLMProvider(backend="llama")
+    with pytest.raises(ValueError):
+        FakeChatModel(latency="uniform")
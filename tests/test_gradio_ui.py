@@ -3,6 +3,13 @@ from app.gradio_ui import process_resume
 from app.models.resume import Resume, ResumeSection
 from unittest.mock import MagicMock, patch
 
+async def run_process_resume(*args):
+    """Drain the streaming process_resume handler and return its final output."""
+    result = None
+    async for result in process_resume(*args):
+        pass
+    return result
+
 # Create test fixtures
 @pytest.fixture
 def sample_pdf_content():
@@ -40,27 +47,32 @@ def mock_resume_optimizer():
                 'changes_made': ["Changed something"],
                 'match_score': 0.8
             })
+
+        async def stream_optimize_resume(self, resume, job_description, optimization_level,
+                                         session=None):
+            yield {"event": "section_start", "index": 0, "title": "Test"}
+            yield {"event": "token", "index": 0, "text": "Optimized "}
+            yield {"event": "section_end", "index": 0, "text": "Optimized content", "changes": []}
+            yield {"event": "done", "result": await self.optimize_resume(
+                resume, job_description, optimization_level
+            )}
     return MockResumeOptimizer()
 
 @pytest.fixture
 def mock_document_parser():
     class MockDocumentParser:
-        @staticmethod
-        def parse_pdf(file_content):
+        async def parse(self, file_content, file_type):
+            label = file_type.upper()
             return Resume(
-                sections=[ResumeSection(title="Test", content="PDF content")],
-                raw_text="PDF content",
-                metadata={"file_type": "pdf"}
+                sections=[ResumeSection(title="Test", content=f"{label} content")],
+                raw_text=f"{label} content",
+                metadata={"file_type": file_type}
             )
 
-        @staticmethod
-        def parse_docx(file_content):
-            return Resume(
-                sections=[ResumeSection(title="Test", content="DOCX content")],
-                raw_text="DOCX content",
-                metadata={"file_type": "docx"}
-            )
-    return MockDocumentParser
+        async def parse_path(self, path, file_type):
+            with open(path, "rb") as f:
+                return await self.parse(f.read(), file_type)
+    return MockDocumentParser()
 
 @pytest.fixture
 def mock_gradio_file():
@@ -98,12 +110,12 @@ def mock_gradio_named_string(tmp_path):
 @pytest.mark.asyncio
 async def test_process_resume_pdf(mock_file, sample_pdf_content, mock_resume_optimizer, mock_document_parser):
     with patch('app.gradio_ui.resume_optimizer', mock_resume_optimizer), \
-         patch('app.gradio_ui.DocumentParser', mock_document_parser):
+         patch('app.gradio_ui.document_parser', mock_document_parser):
         # Create a mock PDF file
         pdf_file = mock_file(sample_pdf_content, "test.pdf")
         
         # Test the process_resume function
-        result = await process_resume(
+        result = await run_process_resume(
             pdf_file,
             "Software Engineer",
             "Python developer needed",
@@ -122,12 +134,12 @@ async def test_process_resume_pdf(mock_file, sample_pdf_content, mock_resume_opt
 @pytest.mark.asyncio
 async def test_process_resume_docx(mock_file, sample_docx_content, mock_resume_optimizer, mock_document_parser):
     with patch('app.gradio_ui.resume_optimizer', mock_resume_optimizer), \
-         patch('app.gradio_ui.DocumentParser', mock_document_parser):
+         patch('app.gradio_ui.document_parser', mock_document_parser):
         # Create a mock DOCX file
         docx_file = mock_file(sample_docx_content, "test.docx")
         
         # Test the process_resume function
-        result = await process_resume(
+        result = await run_process_resume(
             docx_file,
             "Software Engineer",
             "Python developer needed",
@@ -146,7 +158,7 @@ async def test_process_resume_docx(mock_file, sample_docx_content, mock_resume_o
 @pytest.mark.asyncio
 async def test_process_resume_no_file():
     # Test with no file
-    result = await process_resume(
+    result = await run_process_resume(
         None,
         "Software Engineer",
         "Python developer needed",
@@ -161,12 +173,12 @@ async def test_process_resume_no_file():
 @pytest.mark.asyncio
 async def test_process_resume_unsupported_format(mock_file, mock_resume_optimizer, mock_document_parser):
     with patch('app.gradio_ui.resume_optimizer', mock_resume_optimizer), \
-         patch('app.gradio_ui.DocumentParser', mock_document_parser):
+         patch('app.gradio_ui.document_parser', mock_document_parser):
         # Create a mock file with unsupported extension
         unsupported_file = mock_file(b"content", "test.txt")
         
         # Test the process_resume function
-        result = await process_resume(
+        result = await run_process_resume(
             unsupported_file,
             "Software Engineer",
             "Python developer needed",
@@ -181,12 +193,12 @@ async def test_process_resume_unsupported_format(mock_file, mock_resume_optimize
 @pytest.mark.asyncio
 async def test_process_resume_gradio_pdf(mock_gradio_file, sample_pdf_content, mock_resume_optimizer, mock_document_parser):
     with patch('app.gradio_ui.resume_optimizer', mock_resume_optimizer), \
-         patch('app.gradio_ui.DocumentParser', mock_document_parser):
+         patch('app.gradio_ui.document_parser', mock_document_parser):
         # Create a mock Gradio PDF file
         pdf_file = mock_gradio_file(sample_pdf_content, "test.pdf")
         
         # Test the process_resume function
-        result = await process_resume(
+        result = await run_process_resume(
             pdf_file,
             "Software Engineer",
             "Python developer needed",
@@ -205,12 +217,12 @@ async def test_process_resume_gradio_pdf(mock_gradio_file, sample_pdf_content, m
 @pytest.mark.asyncio
 async def test_process_resume_gradio_docx(mock_gradio_file, sample_docx_content, mock_resume_optimizer, mock_document_parser):
     with patch('app.gradio_ui.resume_optimizer', mock_resume_optimizer), \
-         patch('app.gradio_ui.DocumentParser', mock_document_parser):
+         patch('app.gradio_ui.document_parser', mock_document_parser):
         # Create a mock Gradio DOCX file
         docx_file = mock_gradio_file(sample_docx_content, "test.docx")
         
         # Test the process_resume function
-        result = await process_resume(
+        result = await run_process_resume(
             docx_file,
             "Software Engineer",
             "Python developer needed",
@@ -229,12 +241,12 @@ async def test_process_resume_gradio_docx(mock_gradio_file, sample_docx_content,
 @pytest.mark.asyncio
 async def test_process_resume_gradio_named_string(mock_gradio_named_string, sample_pdf_content, mock_resume_optimizer, mock_document_parser):
     with patch('app.gradio_ui.resume_optimizer', mock_resume_optimizer), \
-         patch('app.gradio_ui.DocumentParser', mock_document_parser):
+         patch('app.gradio_ui.document_parser', mock_document_parser):
         # Create a mock Gradio NamedString that points to a temporary file
         pdf_file = mock_gradio_named_string(sample_pdf_content, "test.pdf")
         
         # Test the process_resume function
-        result = await process_resume(
+        result = await run_process_resume(
             pdf_file,
             "Software Engineer",
             "Python developer needed",
@@ -248,4 +260,23 @@ async def test_process_resume_gradio_named_string(mock_gradio_named_string, samp
         assert isinstance(result[0], str)  # optimized text
         assert isinstance(result[1], str)  # changes
         assert isinstance(result[2], float)  # match score
-        assert result[2] == 0.8  # match score from mock
\ No newline at end of file
+        assert result[2] == 0.8  # match score from mock
+
+@pytest.mark.asyncio
+async def test_process_resume_streams_partial_text(mock_file, sample_pdf_content, mock_resume_optimizer, mock_document_parser):
+    with patch('app.gradio_ui.resume_optimizer', mock_resume_optimizer), \
+         patch('app.gradio_ui.document_parser', mock_document_parser):
+        pdf_file = mock_file(sample_pdf_content, "test.pdf")
+
+        outputs = [output async for output in process_resume(
+            pdf_file,
+            "Software Engineer",
+            "Python developer needed",
+            "Test Corp",
+            0.5
+        )]
+
+        # Partial text is shown before the final result arrives
+        assert outputs[0] == ("", "", 0.0)
+        assert outputs[1] == ("Optimized ", "", 0.0)
+        assert outputs[-1] == ("Optimized content", "• Changed something", 0.8)
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from app.utils.hedging import HedgePolicy, mark_sending, mark_waiting
+from app.utils.metrics import LLM_HEDGE_WINS, LLM_HEDGES
+
+
+class Backend:
+    """Each call takes the next delay in line (then the last one) and may fail."""
+
+    def __init__(self, delays, fail=()):
+        self.delays = list(delays)
+        self.fail = set(fail)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        number = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delays[min(number, len(self.delays) - 1)])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if number in self.fail:
+            raise RuntimeError(f"call {number} failed")
+        return number
+
+
+class LimitedBackend:
+    """Waits for a rate limiter and backs off after failures before sending, like RateLimitedChatModel."""
+
+    def __init__(self, limiter_wait, send_time, backoffs=0):
+        self.limiter_wait = limiter_wait
+        self.send_time = send_time
+        self.backoffs = backoffs
+        self.calls = 0
+
+    async def __call__(self):
+        number = self.calls
+        self.calls += 1
+        for _ in range(self.backoffs + 1):
+            mark_waiting()
+            await asyncio.sleep(self.limiter_wait)
+            mark_sending()
+            await asyncio.sleep(self.send_time)
+        return number
+
+
+async def warm_up(policy, calls=3):
+    backend = Backend([0])
+    for _ in range(calls):
+        await policy.run(backend)
+
+
+@pytest.mark.asyncio
+async def test_disabled_policy_never_hedges():
+    policy = HedgePolicy("test_disabled", min_samples=1, min_delay=0)
+    backend = Backend([0, 0.05])
+    await warm_up(policy)
+    assert await policy.run(backend) == 0
+    assert backend.calls == 1
+    assert policy.delay() is None
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled():
+    policy = HedgePolicy("test_hedge", budget=0.5, min_samples=3, min_delay=0.01)
+    await warm_up(policy)
+    assert policy.delay() == 0.01
+
+    backend = Backend([1.0, 0])
+    assert await policy.run(backend) == 1
+    await asyncio.sleep(0)
+    assert backend.calls == 2
+    assert backend.cancelled == 1
+    assert (policy.hedges, policy.wins) == (1, 1)
+    assert LLM_HEDGES.value(stage="test_hedge") == 1
+    assert LLM_HEDGE_WINS.value(stage="test_hedge") == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedging_before_enough_samples():
+    policy = HedgePolicy("test_samples", budget=1.0, min_samples=5, min_delay=0)
+    backend = Backend([0.02, 0])
+    assert await policy.run(backend) == 0
+    assert backend.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hedges_capped_by_budget():
+    # The median stays at the fast warm-up latency, so every later call is slow enough to hedge
+    policy = HedgePolicy("test_budget", budget=0.1, percentile=0.5, min_samples=3, min_delay=0.005)
+    await warm_up(policy, calls=7)
+
+    backend = Backend([0.02])
+    for _ in range(3):
+        await policy.run(backend)
+
+    # 10 calls at a 10% budget allow one hedge
+    assert policy.hedges == 1
+    assert backend.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_hedge_covers_failed_primary_and_errors_surface():
+    policy = HedgePolicy("test_errors", budget=1.0, min_samples=3, min_delay=0.01)
+    await warm_up(policy)
+
+    backend = Backend([0.05, 0.1], fail={0})
+    assert await policy.run(backend) == 1
+
+    backend = Backend([0.05, 0.1], fail={0, 1})
+    with pytest.raises(RuntimeError, match="call 0 failed"):
+        await policy.run(backend)
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_starts_once_request_is_sent():
+    policy = HedgePolicy("test_limiter_wait", budget=1.0, min_samples=3, min_delay=0.02)
+    await warm_up(policy)
+
+    # Queued at the rate limiter and backing off for far longer than the delay
+    backend = LimitedBackend(limiter_wait=0.05, send_time=0.005, backoffs=2)
+    assert await policy.run(backend) == 0
+    assert backend.calls == 1
+    assert policy.hedges == 0
+
+    # Slow once sent: hedged after the delay
+    backend = LimitedBackend(limiter_wait=0.05, send_time=0.2)
+    assert await policy.run(backend) == 0
+    assert backend.calls == 2
+    assert policy.hedges == 1
@@ -3,6 +3,13 @@ from pathlib import Path
 from app.gradio_ui import process_resume
 
 
+async def run_process_resume(*args):
+    result = None
+    async for result in process_resume(*args):
+        pass
+    return result
+
+
 # mark test as special to run since it uses llm
 @pytest.mark.llm
 @pytest.mark.asyncio
@@ -31,7 +38,7 @@ async def test_process_real_pdf():
         file_wrapper = FileWrapper(content, pdf_path.name)
     
     # Test the process_resume function with real data
-    result = await process_resume(
+    result = await run_process_resume(
         file_wrapper,
         "Software Engineer",
         "Looking for a Python developer with experience in machine learning and web development.",
@@ -0,0 +1,59 @@
+import pytest
+from app.services.job_index import JobIndex
+
+JOB = (
+    "Senior Python engineer to design, build and operate FastAPI microservices. "
+    "You will own PostgreSQL schemas, deploy on Kubernetes, review code, mentor "
+    "junior engineers and improve observability across distributed systems."
+)
+
+
+def test_finds_light_edit_but_not_unrelated_job():
+    index = JobIndex(threshold=0.7)
+    index.add("resume-1", JOB, "result")
+
+    match = index.query("resume-1", JOB + " Hybrid role.")
+    assert match is not None
+    assert match.value == "result"
+    assert 0.7 <= match.similarity < 1.0
+
+    assert index.query("resume-1", "Pastry chef for a French bakery, early mornings.") is None
+    assert index.hits == 1 and index.misses == 1
+
+
+def test_entries_only_match_within_their_namespace():
+    index = JobIndex()
+    index.add("resume-1", JOB, "result")
+    assert index.query("resume-2", JOB) is None
+    assert index.query("resume-1", JOB).similarity == 1.0
+
+
+def test_identical_description_replaces_entry():
+    index = JobIndex()
+    index.add("resume-1", JOB, "old")
+    index.add("resume-1", JOB, "new")
+    assert len(index) == 1
+    assert index.query("resume-1", JOB).value == "new"
+
+
+def test_evicts_least_recently_used():
+    index = JobIndex(max_entries=2)
+    jobs = [f"{name} engineer building payment systems in {name}" for name in ("rust", "golang", "scala")]
+    index.add("r", jobs[0], 0)
+    index.add("r", jobs[1], 1)
+    assert index.query("r", jobs[0]).value == 0
+    index.add("r", jobs[2], 2)
+
+    assert len(index) == 2
+    assert index.query("r", jobs[1]) is None
+    assert index.query("r", jobs[0]).value == 0
+
+
+def test_disabled_and_invalid_configurations():
+    index = JobIndex(max_entries=0)
+    index.add("r", JOB, "result")
+    assert index.query("r", JOB) is None
+    with pytest.raises(ValueError):
+        JobIndex(num_perm=100, bands=16)
+    with pytest.raises(ValueError):
+        JobIndex(threshold=0)
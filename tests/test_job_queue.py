@@ -0,0 +1,143 @@
+import asyncio
+import sqlite3
+import pytest
+from app.models.resume import (
+    JobDescription, OptimizationRequest, OptimizationResponse, Resume, ResumeSection
+)
+from app.services.job_queue import JobQueue, JobStore, QueueFullError
+
+
+class FakeOptimizer:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.release = asyncio.Event()
+        if not delay:
+            self.release.set()
+
+    async def optimize_resume(self, resume, job_description, optimization_level, mode, formatter):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        return OptimizationResponse(
+            original_resume=resume, optimized_resume=resume,
+            changes_made=[f"Optimized at {optimization_level}"], match_score=0.5
+        )
+
+
+@pytest.fixture
+def optimization_request():
+    return OptimizationRequest(
+        resume=Resume(sections=[ResumeSection(title="Experience", content="Wrote Python")], raw_text=""),
+        job_description=JobDescription(title="Engineer", description="Python developer needed"),
+        optimization_level=0.7
+    )
+
+
+async def wait_for_status(queue, job_id, status):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} never reached {status}")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background(tmp_path, optimization_request):
+    queue = JobQueue(FakeOptimizer(), path=str(tmp_path / "jobs.db"), workers=2)
+    try:
+        job = await queue.submit(optimization_request)
+        assert job.status == "queued"
+
+        done = await wait_for_status(queue, job.job_id, "succeeded")
+
+        assert done.result.changes_made == ["Optimized at 0.7"]
+        assert done.started_at is not None and done.finished_at >= done.started_at
+        assert queue.depth == 0
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error(tmp_path, optimization_request):
+    queue = JobQueue(FakeOptimizer(fail=True), path=str(tmp_path / "jobs.db"))
+    try:
+        job = await queue.submit(optimization_request)
+        failed = await wait_for_status(queue, job.job_id, "failed")
+        assert failed.error == "LLM unavailable"
+        assert failed.result is None
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_when_queue_is_full(tmp_path, optimization_request):
+    optimizer = FakeOptimizer(delay=1)
+    queue = JobQueue(optimizer, path=str(tmp_path / "jobs.db"), workers=1, max_depth=2)
+    try:
+        await queue.submit(optimization_request)
+        await queue.submit(optimization_request)
+        with pytest.raises(QueueFullError):
+            await queue.submit(optimization_request)
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_unfinished_jobs_resume_after_restart(tmp_path, optimization_request):
+    path = str(tmp_path / "jobs.db")
+    stalled = JobQueue(FakeOptimizer(delay=1), path=path, workers=1)
+    running = await stalled.submit(optimization_request)
+    queued = await stalled.submit(optimization_request)
+    await wait_for_status(stalled, running.job_id, "running")
+    await stalled.stop()
+
+    optimizer = FakeOptimizer()
+    restarted = JobQueue(optimizer, path=path, workers=1)
+    try:
+        await restarted.start()
+        await wait_for_status(restarted, running.job_id, "succeeded")
+        await wait_for_status(restarted, queued.job_id, "succeeded")
+        assert optimizer.calls == 2
+    finally:
+        await restarted.stop()
+
+
+def test_store_purges_expired_finished_jobs(tmp_path, optimization_request):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    finished = store.create(optimization_request)
+    pending = store.create(optimization_request)
+    store.mark_failed(finished.job_id, "boom")
+
+    assert store.purge_finished(older_than=float("inf")) == 1
+    assert store.get(finished.job_id) is None
+    assert store.get(pending.job_id).status == "queued"
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_store_error_fails_job_and_keeps_worker(tmp_path, optimization_request, monkeypatch):
+    queue = JobQueue(FakeOptimizer(), path=str(tmp_path / "jobs.db"), workers=1)
+    try:
+        await queue.start()
+        mark_running = queue._store.mark_running
+        failures = iter([True])
+
+        def flaky_mark_running(job_id):
+            if next(failures, False):
+                raise sqlite3.OperationalError("database is locked")
+            mark_running(job_id)
+
+        monkeypatch.setattr(queue._store, "mark_running", flaky_mark_running)
+        first = await queue.submit(optimization_request)
+        second = await queue.submit(optimization_request)
+
+        failed = await wait_for_status(queue, first.job_id, "failed")
+        assert failed.error == "database is locked"
+        await wait_for_status(queue, second.job_id, "succeeded")
+        assert queue.depth == 0
+    finally:
+        await queue.stop()
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import pytest
+from app.utils.lazy import LazyObject, lazy_import
+
+
+def test_lazy_object_builds_once_on_first_use():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "value"
+
+    lazy = LazyObject(factory)
+    assert calls == []
+    assert lazy.upper() == "VALUE"
+    assert lazy.lower() == "value"
+    assert calls == [1]
+
+
+def test_lazy_import_defers_module_import():
+    lazy = lazy_import("json:JSONDecoder")
+    assert "unresolved" in repr(lazy)
+    assert lazy.decode("[1]") == [1]
+    with pytest.raises(ValueError):
+        lazy_import("json")
+
+
+def test_api_only_startup_skips_heavy_imports():
+    # A fresh interpreter, since this test session has imported everything already
+    code = (
+        "import sys, app.main\n"
+        "print(sorted(m for m in ('gradio', 'langchain', 'openai', 'pypdf', 'docx') if m in sys.modules))"
+    )
+    env = {**os.environ, "SERVE_UI": "false"}
+    completed = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True,
+                               text=True, check=True)
+    assert completed.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,124 @@
+import time
+import httpx
+import openai
+import pytest
+from app.services.llm_provider import LLMProvider, RateLimitedChatModel
+from app.utils.rate_limit import TokenBucket
+from app.utils.tokens import count_tokens
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+def api_error(status, headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    error_type = openai.RateLimitError if status == 429 else openai.APIStatusError
+    return error_type("error", response=response, body=None)
+
+
+class FlakyLLM:
+    model_name = "gpt-4"
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return FakeMessage("rewritten section")
+
+    async def astream(self, messages):
+        self.calls += 1
+        yield FakeMessage("partial ")
+        if self.errors:
+            raise self.errors.pop(0)
+        yield FakeMessage("section")
+
+
+def make_model(llm, **kwargs):
+    provider = LLMProvider(retry_base_delay=0.01, **kwargs)
+    return RateLimitedChatModel(llm, provider)
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limit_honoring_retry_after():
+    llm = FlakyLLM([api_error(429, {"retry-after": "0.2"}), api_error(503)])
+    model = make_model(llm)
+
+    start = time.monotonic()
+    response = await model.ainvoke([FakeMessage("prompt")])
+
+    assert response.content == "rewritten section"
+    assert llm.calls == 3
+    assert time.monotonic() - start >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_are_raised():
+    llm = FlakyLLM([api_error(400)])
+    model = make_model(llm)
+
+    with pytest.raises(openai.APIStatusError):
+        await model.ainvoke([FakeMessage("prompt")])
+    assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    llm = FlakyLLM([api_error(429)] * 3)
+    model = make_model(llm, max_retries=2)
+
+    with pytest.raises(openai.RateLimitError):
+        await model.ainvoke([FakeMessage("prompt")])
+    assert llm.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_is_not_retried_after_partial_output():
+    llm = FlakyLLM([api_error(503)])
+    model = make_model(llm)
+
+    chunks = []
+    with pytest.raises(openai.APIStatusError):
+        async for chunk in model.astream([FakeMessage("prompt")]):
+            chunks.append(chunk.content)
+    assert chunks == ["partial "]
+    assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 10 per second
+
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire(1)
+
+    assert time.monotonic() - start >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_completion_tokens_are_charged_after_the_call():
+    model = make_model(FlakyLLM([]), tokens_per_minute=10000)
+
+    prompt = "Rewrite this resume section for a Python role. " * 10
+    await model.ainvoke([FakeMessage(prompt)])
+
+    # Prompt tokens plus the completion were taken from the bucket
+    assert model.provider.token_bucket.available < 10000 - count_tokens(prompt, "gpt-4")
+
+
+def test_provider_shares_connection_pool(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    provider = LLMProvider()
+
+    first = provider.chat_model("gpt-4")
+    second = provider.chat_model("gpt-4")
+
+    assert first.llm.async_client._client._client is provider.http_client
+    assert second.llm.async_client._client._client is provider.http_client
@@ -0,0 +1,86 @@
+import time
+import pytest
+from app.models.resume import JobDescription, Resume, ResumeSection
+from app.services.match_scorer import MatchScorer, tokenize
+
+
+@pytest.fixture
+def resume():
+    sections = [
+        ResumeSection(title="Experience", content="Built Python microservices with FastAPI and PostgreSQL on AWS"),
+        ResumeSection(title="Education", content="BSc Computer Science, State University"),
+        ResumeSection(title="Skills", content="Python, Docker, Kubernetes, C++, node.js"),
+    ]
+    return Resume(sections=sections, raw_text="\n".join(section.content for section in sections))
+
+
+@pytest.fixture
+def python_job():
+    return JobDescription(
+        title="Backend Engineer",
+        description="We need a Python engineer to build FastAPI microservices on AWS with PostgreSQL.",
+        requirements=["Python", "FastAPI", "Terraform"]
+    )
+
+
+@pytest.fixture
+def unrelated_job():
+    return JobDescription(
+        title="Pastry Chef",
+        description="Bake croissants and design seasonal dessert menus for our bakery."
+    )
+
+
+def test_tokenize_keeps_tech_terms():
+    assert tokenize("Experience with C++, C# and Node.js.") == ["experience", "c++", "c#", "node.js"]
+
+
+def test_relevant_job_scores_higher(resume, python_job, unrelated_job):
+    scorer = MatchScorer()
+    relevant, unrelated = scorer.score_many(resume, [python_job, unrelated_job])
+
+    assert relevant.score > unrelated.score
+    assert unrelated.similarity == 0.0
+    assert 0.0 <= relevant.score <= 1.0
+
+
+def test_keyword_coverage_against_requirements(resume, python_job):
+    result = MatchScorer().score(resume, python_job)
+
+    assert result.matched_keywords == ["Python", "FastAPI"]
+    assert result.missing_keywords == ["Terraform"]
+    assert result.keyword_coverage == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_section_breakdown(resume, python_job):
+    result = MatchScorer().score(resume, python_job)
+
+    scores = {section.title: section.score for section in result.section_scores}
+    assert list(scores) == ["Experience", "Education", "Skills"]
+    assert scores["Experience"] > scores["Education"]
+
+
+def test_score_many_returns_one_result_per_job(resume, python_job, unrelated_job):
+    scorer = MatchScorer()
+    batch = scorer.score_many(resume, [unrelated_job, python_job, unrelated_job])
+
+    assert len(batch) == 3
+    assert batch[0] == batch[2]
+    assert batch[1].score > batch[0].score
+    assert scorer.score_many(resume, []) == []
+
+
+def test_scoring_is_fast(resume, python_job):
+    scorer = MatchScorer()
+    jobs = [python_job] * 50
+    start = time.perf_counter()
+    scorer.score_many(resume, jobs)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_score_does_not_depend_on_other_jobs_in_batch(resume, python_job, unrelated_job):
+    scorer = MatchScorer()
+    alone = scorer.score(resume, python_job)
+
+    assert scorer.score_many(resume, [python_job, unrelated_job])[0] == alone
+    assert scorer.score_many(resume, [unrelated_job, python_job, python_job])[1] == alone
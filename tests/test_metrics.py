@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from app.utils.metrics import (
+    Counter, Gauge, Histogram, MetricsRegistry, STAGE_DURATION, STAGE_ERRORS, collect_timings,
+    current_stage, record_llm_usage, LLM_TOKENS, timed_stage, track_stage
+)
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Requests.", ["route"]))
+    in_flight = registry.register(Gauge("in_flight", "In flight."))
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ["route"], buckets=(0.1, 1.0)))
+
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    in_flight.inc()
+    latency.observe(0.05, route="/a")
+    latency.observe(0.1, route="/a")
+    latency.observe(5, route="/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a\\"b"} 3' in lines
+    assert "in_flight 1" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 5.15' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_metric_rejects_wrong_labels():
+    counter = Counter("calls_total", "Calls.", ["stage"])
+    with pytest.raises(ValueError):
+        counter.inc(route="/a")
+    with pytest.raises(ValueError):
+        counter.inc(-1, stage="x")
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_are_collected_across_tasks():
+    @timed_stage("test_child")
+    async def child():
+        await asyncio.sleep(0.01)
+        return current_stage.get()
+
+    before = STAGE_DURATION.count(stage="test_child")
+    with collect_timings() as timings:
+        with track_stage("test_parent"):
+            stages = await asyncio.gather(child(), child())
+
+    assert stages == ["test_child", "test_child"]
+    assert STAGE_DURATION.count(stage="test_child") == before + 2
+    assert timings["test_child"] >= 0.02
+    assert timings["test_parent"] >= 0.01
+    assert current_stage.get() == "other"
+
+
+def test_failed_stage_counts_error():
+    before = STAGE_ERRORS.value(stage="test_failing")
+    with pytest.raises(RuntimeError):
+        with track_stage("test_failing"):
+            raise RuntimeError("boom")
+    assert STAGE_ERRORS.value(stage="test_failing") == before + 1
+
+
+def test_llm_usage_is_attributed_to_current_stage():
+    before = LLM_TOKENS.value(stage="test_usage", kind="prompt")
+    with track_stage("test_usage"):
+        record_llm_usage(120, 30, cost=0.0021)
+    assert LLM_TOKENS.value(stage="test_usage", kind="prompt") == before + 120
@@ -0,0 +1,54 @@
+from app.models.resume import ResumeSection
+from app.services.optimization_session import OptimizationSession, SessionStore
+
+
+def test_section_key_ignores_unrelated_job_lines():
+    session = OptimizationSession()
+    section = ResumeSection(title="Skills", content="Python and Docker")
+
+    key = session.section_key(section, "Python developer\nGreat team")
+
+    assert key == session.section_key(section, "Python developer\nFantastic team")
+    assert key != session.section_key(section, "Senior Python developer\nGreat team")
+    assert key != session.section_key(ResumeSection(title="Tools", content="Python and Docker"),
+                                      "Python developer\nGreat team")
+
+
+def test_lookup_respects_level_tolerance():
+    session = OptimizationSession(level_tolerance=0.1)
+    session.remember("key", "rewritten", ["changed"], 0.5)
+
+    assert session.lookup("key", 0.6).text == "rewritten"
+    assert session.lookup("key", 0.7) is None
+    assert session.reused == 1
+
+
+def test_tolerance_allows_float_error():
+    session = OptimizationSession(level_tolerance=0.1)
+    session.remember("key", "rewritten", ["changed"], 0.3)
+
+    assert session.lookup("key", 0.4).text == "rewritten"
+    assert session.lookup("key", 0.45) is None
+
+
+def test_retain_drops_removed_sections():
+    session = OptimizationSession()
+    session.remember("a", "A", [], 0.5)
+    session.remember("b", "B", [], 0.5)
+
+    session.retain(["b"])
+
+    assert session.lookup("a", 0.5) is None
+    assert session.lookup("b", 0.5).text == "B"
+
+
+def test_session_store_reuses_and_evicts():
+    store = SessionStore(max_entries=2, ttl=None)
+    first = store.get("one")
+
+    assert store.get("one") is first
+    store.get("two")
+    store.get("three")
+
+    assert len(store) == 2
+    assert store.get("one") is not first
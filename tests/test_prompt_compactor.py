@@ -0,0 +1,99 @@
+from app.services.prompt_compactor import PromptCompactor
+from app.utils import tokens
+
+
+JOB_POSTING = """Senior Python Engineer
+
+Responsibilities:
+Build FastAPI services for our payments platform.
+Build FastAPI services for our payments platform.
+Own PostgreSQL schema design.
+
+Benefits
+Unlimited PTO and free snacks.
+401k matching.
+
+Requirements:
+5+ years of Python.
+
+We are an equal opportunity employer and value diversity.
+"""
+
+
+def test_strip_boilerplate_drops_benefits_eeo_and_duplicates():
+    text = PromptCompactor.strip_boilerplate(JOB_POSTING)
+
+    assert "FastAPI" in text
+    assert text.count("Build FastAPI services") == 1
+    assert "Requirements:" in text and "5+ years of Python." in text
+    assert "PTO" not in text
+    assert "401k" not in text
+    assert "equal opportunity" not in text
+
+
+def test_prepare_job_applies_budget():
+    compactor = PromptCompactor(job_token_budget=10)
+    job = compactor.prepare_job(JOB_POSTING)
+
+    assert job.tokens <= 10
+    assert job.original_tokens > job.tokens
+    assert job.tokens_saved == job.original_tokens - job.tokens
+    assert job.text.startswith("Senior Python Engineer")
+
+
+def test_job_for_section_keeps_minimum_budget():
+    compactor = PromptCompactor(call_token_budget=50, min_job_tokens=5)
+    job = compactor.prepare_job(JOB_POSTING)
+
+    short = compactor.job_for_section(job, "Python")
+    long = compactor.job_for_section(job, "word " * 200)
+
+    assert short == job.text
+    assert 0 < compactor.count(long) <= 5
+
+
+def test_truncate_cuts_single_long_line():
+    compactor = PromptCompactor()
+
+    assert compactor.truncate("x" * 100, 5) == "x" * 20
+    assert compactor.truncate("short", None) == "short"
+
+
+def test_passthrough_by_title_and_length():
+    compactor = PromptCompactor(passthrough_max_tokens=3)
+
+    assert compactor.is_passthrough("Contact Information:", "Jane Doe, 12 Long Street, Springfield")
+    assert compactor.is_passthrough("Skills", "Python")
+    assert not compactor.is_passthrough("Experience", "Built payment services in Python and Go")
+
+
+def test_contact_block_passes_through_only_beside_other_sections():
+    compactor = PromptCompactor()
+    contact = "Jane Doe\njane@example.com | +1 555 123 4567 | linkedin.com/in/janedoe"
+    resume_body = "Jane Doe\nSenior engineer who built payment services in Python and Go for ten years"
+
+    assert compactor.is_passthrough("Header", contact, section_count=3)
+    assert not compactor.is_passthrough("Header", contact, section_count=1)
+    assert not compactor.is_passthrough("Header", resume_body, section_count=3)
+
+
+def test_contact_details_in_known_sections_are_rewritten():
+    compactor = PromptCompactor()
+    sections = [
+        ("Summary", "Backend engineer focused on payments and reliability. Portfolio: https://jane.dev"),
+        ("Projects", "Ledger: double-entry bookkeeping service in Go, github.com/jane/ledger, "
+                     "https://github.com/jane/ledger"),
+        ("Experience", "Acme Corp, Senior Engineer 2019-2024. Reference: John Smith +1 555 987 6543"),
+    ]
+
+    for title, content in sections:
+        assert not compactor.is_passthrough(title, content, section_count=4), title
+
+
+def test_token_estimate_only_skips_tiktoken(monkeypatch):
+    monkeypatch.setattr(tokens, "TOKEN_ESTIMATE_ONLY", True)
+    tokens._get_encoding.cache_clear()
+    try:
+        assert tokens.count_tokens("x" * 40, "gpt-4") == 40 // tokens.CHARS_PER_TOKEN
+    finally:
+        tokens._get_encoding.cache_clear()
@@ -0,0 +1,49 @@
+from app.utils.resume_formatter import format_resume_text, normalize_dates
+
+
+OPTIMIZED_RESUME = """## Experience
+
+
+Senior Engineer, Acme Corp\tJan 2020 – present
+-   Built   Python services for payments
+* Led a team of 4
+    * Mentored 2 interns
+
+**Skills**:
+Python, SQL
+education
+BSc Mathematics, 2014-09 - 2018-06
+"""
+
+
+def test_format_applies_layout_rules():
+    assert format_resume_text(OPTIMIZED_RESUME) == (
+        "EXPERIENCE\n"
+        "**Senior Engineer, Acme Corp** | 01/2020 - Present\n"
+        "• Built Python services for payments\n"
+        "• Led a team of 4\n"
+        "  • Mentored 2 interns\n"
+        "\n"
+        "SKILLS\n"
+        "Python, SQL\n"
+        "\n"
+        "EDUCATION\n"
+        "**BSc Mathematics** | 09/2014 - 06/2018"
+    )
+
+
+def test_format_is_idempotent():
+    once = format_resume_text(OPTIMIZED_RESUME)
+    assert format_resume_text(once) == once
+
+
+def test_format_keeps_words_and_bold_titles():
+    text = "**Staff Engineer**\nWe may 2020 expand into Europe\nIncreased revenue by 20% in 2019"
+    assert format_resume_text(text) == text
+
+
+def test_normalize_dates():
+    assert normalize_dates("March 2021 to Dec. 2022") == "03/2021 - 12/2022"
+    assert normalize_dates("3/2021-2022") == "03/2021 - 2022"
+    # Full dates are left alone
+    assert normalize_dates("Started 12/03/2020") == "Started 12/03/2020"
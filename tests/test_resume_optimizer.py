@@ -0,0 +1,524 @@
+import asyncio
+import json
+import pytest
+from app.models.resume import Resume, ResumeSection, JobDescription
+from app.services.job_index import JobIndex
+from app.services.llm_cache import LLMCache
+from app.services.optimization_session import OptimizationSession
+from app.services.prompt_compactor import PromptCompactor
+from app.services.resume_optimizer import JOB_REUSE_CHANGE, PASSTHROUGH_CHANGE, ResumeOptimizer
+from app.utils.document_parser import DocumentParser
+from tests.documents import make_plain_docx
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """Stand-in for ChatOpenAI that records concurrency and echoes the section."""
+
+    def __init__(self, delay=0.01, fail_on=None, one_shot_reply=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.one_shot_reply = one_shot_reply
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            prompt = messages[-1].content
+            if self.fail_on and self.fail_on in prompt:
+                raise RuntimeError("LLM unavailable")
+            if "Resume Sections (JSON):" in prompt:
+                if self.one_shot_reply is not None:
+                    return FakeMessage(self.one_shot_reply)
+                raw = prompt.split("Resume Sections (JSON):")[1].split("\n")[0].strip()
+                sections = [
+                    {"title": item["title"].upper(), "content": f"OPTIMIZED {item['content']}"}
+                    for item in json.loads(raw)
+                ]
+                return FakeMessage(json.dumps({"sections": sections, "changes": ["Rewrote all"]}))
+            if "Current Resume Section:" in prompt:
+                section = prompt.split("Current Resume Section:")[1].split("\n")[0].strip()
+                return FakeMessage(f"OPTIMIZED {section}")
+            return FakeMessage(prompt.split("preserving all content:")[-1].strip())
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def sample_resume():
+    return Resume(
+        sections=[
+            ResumeSection(title=f"Section {i}", content=f"section-{i}")
+            for i in range(6)
+        ],
+        raw_text="",
+        metadata={"file_type": "docx"}
+    )
+
+
+@pytest.fixture
+def job_description():
+    return JobDescription(title="Engineer", description="Python developer needed")
+
+
+@pytest.fixture
+def make_optimizer(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    def factory(llm, compactor=None, **kwargs):
+        # Repeat requests would otherwise be answered by the job index before the LLM cache
+        kwargs.setdefault("job_index", JobIndex(max_entries=0))
+        optimizer = ResumeOptimizer(**kwargs)
+        optimizer.llm = llm
+        # The sample sections are tiny; only pass through sections by title here
+        optimizer.compactor = compactor or PromptCompactor(passthrough_max_tokens=0)
+        return optimizer
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_sections_run_concurrently_within_limit(make_optimizer, sample_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, max_concurrency=3)
+
+    result = await optimizer.optimize_resume(sample_resume, job_description)
+
+    assert llm.max_in_flight == 3
+    assert llm.calls == len(sample_resume.sections)  # formatted locally, without an LLM call
+    assert result.optimized_resume.raw_text == "\n\n".join(
+        f"OPTIMIZED section-{i}" for i in range(6)
+    )
+
+
+@pytest.mark.asyncio
+async def test_llm_formatter_is_opt_in(make_optimizer, skills_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm)
+
+    local = await optimizer.optimize_resume(skills_resume, job_description)
+    assert llm.calls == 3
+    assert "format_resume" not in optimizer.cache.stats()
+
+    await optimizer.optimize_resume(skills_resume, job_description, formatter="llm")
+    assert llm.calls == 3 + 1  # sections cached, one formatting call
+    assert local.optimized_resume.raw_text.startswith("OPTIMIZED Built Python services")
+
+    with pytest.raises(ValueError):
+        await optimizer.optimize_resume(skills_resume, job_description, formatter="bogus")
+
+
+@pytest.mark.asyncio
+async def test_failed_section_falls_back_to_original(make_optimizer, sample_resume, job_description):
+    llm = FakeLLM(fail_on="section-2")
+    optimizer = make_optimizer(llm, max_concurrency=6)
+
+    result = await optimizer.optimize_resume(sample_resume, job_description)
+
+    sections = result.optimized_resume.raw_text.split("\n\n")
+    assert sections[2] == "section-2"
+    assert sections[3] == "OPTIMIZED section-3"
+    assert any(change.startswith("Error during optimization") for change in result.changes_made)
+
+
+def test_invalid_concurrency(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with pytest.raises(ValueError):
+        ResumeOptimizer(max_concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_one_shot_mode_uses_single_call(make_optimizer, sample_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm)
+
+    result = await optimizer.optimize_resume(sample_resume, job_description, mode="one_shot")
+
+    assert llm.calls == 1
+    assert [section.title for section in result.optimized_resume.sections] == [
+        f"SECTION {i}" for i in range(6)
+    ]
+    assert result.optimized_resume.sections[4].content == "OPTIMIZED section-4"
+    assert result.changes_made == ["Rewrote all"]
+
+
+@pytest.mark.asyncio
+async def test_one_shot_falls_back_on_malformed_response(make_optimizer, sample_resume, job_description):
+    llm = FakeLLM(one_shot_reply="not json")
+    optimizer = make_optimizer(llm)
+
+    result = await optimizer.optimize_resume(sample_resume, job_description, mode="one_shot")
+
+    assert llm.calls == 1 + len(sample_resume.sections)
+    assert result.optimized_resume.raw_text.split("\n\n")[0] == "OPTIMIZED section-0"
+
+
+@pytest.mark.asyncio
+async def test_unknown_mode_rejected(make_optimizer, sample_resume, job_description):
+    optimizer = make_optimizer(FakeLLM())
+    with pytest.raises(ValueError):
+        await optimizer.optimize_resume(sample_resume, job_description, mode="bogus")
+
+
+@pytest.mark.asyncio
+async def test_repeated_request_served_from_cache(make_optimizer, sample_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm)
+
+    first = await optimizer.optimize_resume(sample_resume, job_description, formatter="llm")
+    calls_after_first = llm.calls
+    second = await optimizer.optimize_resume(sample_resume, job_description, formatter="llm")
+
+    assert llm.calls == calls_after_first
+    assert second.optimized_resume.raw_text == first.optimized_resume.raw_text
+    assert optimizer.cache.stats()["optimize_section"] == {"hits": 6, "misses": 6}
+    assert optimizer.cache.stats()["format_resume"] == {"hits": 1, "misses": 1}
+
+    # A different optimization level misses the section cache
+    await optimizer.optimize_resume(sample_resume, job_description, optimization_level=0.9)
+    assert llm.calls == calls_after_first + len(sample_resume.sections)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_llm_calls(make_optimizer, sample_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, cache=LLMCache(max_entries=0))
+
+    results = await asyncio.gather(*(
+        optimizer.optimize_resume(sample_resume, job_description, formatter="llm") for _ in range(3)
+    ))
+
+    assert llm.calls == len(sample_resume.sections) + 1
+    assert len({result.optimized_resume.raw_text for result in results}) == 1
+    assert optimizer._section_flight.coalesced == 2 * len(sample_resume.sections)
+    assert optimizer._format_flight.coalesced == 2
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request_holds_no_limiter_slot(make_optimizer, job_description):
+    llm = FakeLLM(delay=0.05)
+    optimizer = make_optimizer(llm, cache=LLMCache(max_entries=0))
+    resume = Resume(sections=[ResumeSection(title="Summary", content="section-0")], raw_text="")
+    leader_limiter, follower_limiter = asyncio.Semaphore(1), asyncio.Semaphore(1)
+
+    requests = [
+        asyncio.create_task(optimizer.optimize_resume(
+            resume, job_description, limiter=limiter, formatter="llm"
+        ))
+        for limiter in (leader_limiter, follower_limiter)
+    ]
+    await asyncio.sleep(0.02)
+
+    # The follower waits on the leader's call without taking a slot of its own
+    assert leader_limiter.locked()
+    assert not follower_limiter.locked()
+    await asyncio.gather(*requests)
+    assert llm.calls == 2
+    assert optimizer._section_flight.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_job_reuses_previous_result(make_optimizer, sample_resume):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, cache=LLMCache(max_entries=0), job_index=JobIndex(threshold=0.7))
+    description = (
+        "We are hiring a senior Python developer to build and operate FastAPI services "
+        "backed by PostgreSQL, deployed on Kubernetes, with strong testing practices "
+        "and experience mentoring engineers across distributed teams."
+    )
+    first = await optimizer.optimize_resume(
+        sample_resume, JobDescription(title="Engineer", description=description)
+    )
+    calls = llm.calls
+
+    repost = JobDescription(title="Engineer", description=description + " Remote friendly.")
+    second = await optimizer.optimize_resume(sample_resume, repost)
+
+    assert llm.calls == calls
+    assert second.optimized_resume.raw_text == first.optimized_resume.raw_text
+    assert second.changes_made[-1].startswith(JOB_REUSE_CHANGE)
+
+    # A different job, or another level for the same job, is optimized from scratch
+    other = JobDescription(title="Chef", description="Line cook for a busy seafood restaurant kitchen.")
+    await optimizer.optimize_resume(sample_resume, other)
+    assert llm.calls == 2 * calls
+    await optimizer.optimize_resume(sample_resume, repost, optimization_level=0.9)
+    assert llm.calls == 3 * calls
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_job_reruns_sections_for_changed_requirement(make_optimizer, skills_resume):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, cache=LLMCache(max_entries=0), job_index=JobIndex(threshold=0.6))
+    lines = [
+        "We are hiring a senior backend engineer to build payment services for merchants across Europe.",
+        "Required stack: Python and Django.",
+        "You will run Kubernetes clusters, review designs and mentor engineers across distributed teams.",
+        "We offer remote work, a learning budget and a generous parental leave policy.",
+    ]
+    python_job = JobDescription(title="Engineer", description="\n".join(lines))
+    lines[1] = "Required stack: Java and Spring Boot."
+    java_job = JobDescription(title="Engineer", description="\n".join(lines))
+
+    await optimizer.optimize_resume(skills_resume, python_job)
+    assert llm.calls == 3
+    result = await optimizer.optimize_resume(skills_resume, java_job)
+
+    # Only the experience section mentions Python, so only it is rewritten again
+    assert llm.calls == 3 + 1
+    assert result.changes_made[-1].startswith(f"{JOB_REUSE_CHANGE} for 2 of 3 sections")
+
+
+class FakeChunk(FakeMessage):
+    pass
+
+
+class StreamingFakeLLM(FakeLLM):
+    async def astream(self, messages):
+        message = await self.ainvoke(messages)
+        for word in message.content.split(" "):
+            yield FakeChunk(word + " ")
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_sections_in_order(make_optimizer, sample_resume, job_description):
+    llm = StreamingFakeLLM(fail_on="section-3")
+    optimizer = make_optimizer(llm, max_concurrency=3)
+
+    events = [event async for event in optimizer.stream_optimize_resume(sample_resume, job_description)]
+
+    starts = [event["index"] for event in events if event["event"] == "section_start"]
+    assert starts == list(range(6))
+    tokens = [event for event in events if event["event"] == "token"]
+    assert tokens[0] == {"event": "token", "index": 0, "text": "OPTIMIZED "}
+    ends = [event for event in events if event["event"] == "section_end"]
+    assert ends[3]["text"] == "section-3"
+    assert ends[4]["text"] == "OPTIMIZED section-4"
+    assert [event["event"] for event in events[-2:]] == ["formatted", "done"]
+    result = events[-1]["result"]
+    assert result.optimized_resume.raw_text.split("\n\n")[3] == "section-3"
+    assert llm.max_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_batch_shares_concurrency_budget(make_optimizer, sample_resume):
+    llm = FakeLLM(fail_on="Rust")
+    optimizer = make_optimizer(llm, max_concurrency=6)
+    jobs = [
+        JobDescription(title=f"Job {i}", description=f"{language} developer needed")
+        for i, language in enumerate(["Python", "Go", "Rust"])
+    ]
+
+    results = [
+        item async for item in optimizer.optimize_batch(
+            [sample_resume], jobs, max_concurrency=2
+        )
+    ]
+
+    assert sorted(item.index for item in results) == [0, 1, 2]
+    assert llm.max_in_flight == 2
+    by_job = {item.job_index: item for item in results}
+    assert by_job[0].result.optimized_resume.sections[0].content == "OPTIMIZED section-0"
+    # Failed section calls fall back per section, not per item
+    assert by_job[2].error is None
+    assert by_job[2].result.optimized_resume.sections[0].content == "section-0"
+
+
+@pytest.mark.asyncio
+async def test_batch_starts_items_as_earlier_ones_finish(make_optimizer, sample_resume):
+    optimizer = make_optimizer(FakeLLM())
+    started = 0
+    optimize_resume = optimizer.optimize_resume
+
+    async def counting_optimize_resume(*args, **kwargs):
+        nonlocal started
+        started += 1
+        return await optimize_resume(*args, **kwargs)
+
+    optimizer.optimize_resume = counting_optimize_resume
+    jobs = [JobDescription(title=f"Job {i}", description=f"Role {i}") for i in range(6)]
+    batch = optimizer.optimize_batch([sample_resume], jobs, max_concurrency=2)
+
+    first = await batch.__anext__()
+    assert started == 2
+    rest = [item async for item in batch]
+    assert sorted(item.index for item in [first, *rest]) == list(range(6))
+    assert started == 6
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_many_to_many(make_optimizer, sample_resume, job_description):
+    optimizer = make_optimizer(FakeLLM())
+    with pytest.raises(ValueError):
+        async for _ in optimizer.optimize_batch(
+            [sample_resume, sample_resume], [job_description, job_description]
+        ):
+            pass
+
+
+@pytest.fixture
+def mixed_resume():
+    return Resume(
+        sections=[
+            ResumeSection(title="Contact", content="Jane Doe, jane@example.com"),
+            ResumeSection(title="Experience", content="Built Python services for payments"),
+            ResumeSection(title="Skills", content="Python"),
+        ],
+        raw_text="",
+        metadata={"file_type": "docx"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_trivial_sections_skip_llm(make_optimizer, mixed_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, compactor=PromptCompactor(passthrough_max_tokens=3))
+
+    result = await optimizer.optimize_resume(mixed_resume, job_description)
+
+    assert llm.calls == 1  # experience section only
+    contents = [section.content for section in result.optimized_resume.sections]
+    assert contents == [
+        "Jane Doe, jane@example.com", "OPTIMIZED Built Python services for payments", "Python"
+    ]
+    assert PASSTHROUGH_CHANGE in result.changes_made
+    assert result.tokens_saved > 0
+
+
+@pytest.mark.asyncio
+async def test_one_shot_sends_only_rewritable_sections(make_optimizer, mixed_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, compactor=PromptCompactor(passthrough_max_tokens=3))
+
+    result = await optimizer.optimize_resume(mixed_resume, job_description, mode="one_shot")
+
+    assert llm.calls == 1
+    sections = result.optimized_resume.sections
+    assert [section.title for section in sections] == ["Contact", "EXPERIENCE", "Skills"]
+    assert sections[1].content == "OPTIMIZED Built Python services for payments"
+    assert result.tokens_saved > 0
+
+
+@pytest.mark.asyncio
+async def test_stream_passes_trivial_sections_through(make_optimizer, mixed_resume, job_description):
+    llm = StreamingFakeLLM()
+    optimizer = make_optimizer(llm, compactor=PromptCompactor(passthrough_max_tokens=3))
+
+    events = [event async for event in optimizer.stream_optimize_resume(mixed_resume, job_description)]
+
+    section_ends = [event for event in events if event["event"] == "section_end"]
+    assert section_ends[0]["text"] == "Jane Doe, jane@example.com"
+    assert section_ends[0]["changes"] == [PASSTHROUGH_CHANGE]
+    assert llm.calls == 1  # experience section only
+
+
+@pytest.fixture
+def skills_resume():
+    return Resume(
+        sections=[
+            ResumeSection(title="Experience", content="Built Python services"),
+            ResumeSection(title="Skills", content="Kubernetes and Docker"),
+            ResumeSection(title="Education", content="BSc Mathematics"),
+        ],
+        raw_text="",
+        metadata={"file_type": "docx"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_reruns_only_sections_affected_by_job_edit(make_optimizer, skills_resume):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, cache=LLMCache(max_entries=0))
+    session = OptimizationSession()
+    first_job = JobDescription(title="Engineer", description="Python services\nKubernetes clusters")
+    edited_job = JobDescription(title="Engineer", description="Python services\nKubernetes at scale")
+
+    await optimizer.optimize_resume(skills_resume, first_job, session=session, formatter="llm")
+    assert llm.calls == 4  # three sections + formatting pass
+
+    result = await optimizer.optimize_resume(skills_resume, edited_job, session=session, formatter="llm")
+
+    # Only the skills section mentions Kubernetes. The fake rewrite comes back
+    # identical, so the merged text is unchanged and formatting is reused too
+    assert llm.calls == 4 + 1
+    assert session.reused == 2
+    assert [section.content for section in result.optimized_resume.sections] == [
+        "OPTIMIZED Built Python services", "OPTIMIZED Kubernetes and Docker", "OPTIMIZED BSc Mathematics"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_session_repeat_request_makes_no_llm_calls(make_optimizer, skills_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, cache=LLMCache(max_entries=0))
+    session = OptimizationSession()
+
+    first = await optimizer.optimize_resume(skills_resume, job_description, session=session)
+    calls = llm.calls
+    second = await optimizer.optimize_resume(skills_resume, job_description, session=session)
+    assert llm.calls == calls
+    assert second.optimized_resume.raw_text == first.optimized_resume.raw_text
+
+    await optimizer.optimize_resume(skills_resume, job_description, optimization_level=0.9,
+                                    session=session)
+    assert llm.calls == calls + 3  # a level change affects every section
+
+
+@pytest.mark.asyncio
+async def test_session_slider_step_reruns_sections(make_optimizer, skills_resume, job_description):
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, cache=LLMCache(max_entries=0))
+    session = OptimizationSession()
+
+    await optimizer.optimize_resume(skills_resume, job_description, session=session)
+    calls = llm.calls
+    await optimizer.optimize_resume(skills_resume, job_description,
+                                    optimization_level=0.6, session=session)
+
+    # One notch of the UI slider is a new input for every section
+    assert llm.calls == 2 * calls
+
+
+@pytest.mark.asyncio
+async def test_session_retries_failed_sections(make_optimizer, skills_resume, job_description):
+    optimizer = make_optimizer(FakeLLM(fail_on="Kubernetes"), cache=LLMCache(max_entries=0))
+    session = OptimizationSession()
+    await optimizer.optimize_resume(skills_resume, job_description, session=session)
+
+    optimizer.llm = StreamingFakeLLM()
+    events = [
+        event async for event in optimizer.stream_optimize_resume(
+            skills_resume, job_description, session=session
+        )
+    ]
+
+    assert optimizer.llm.calls == 1  # the failed section only
+    ends = [event["text"] for event in events if event["event"] == "section_end"]
+    assert ends[1] == "OPTIMIZED Kubernetes and Docker"
+
+
+@pytest.mark.asyncio
+async def test_docx_without_headings_is_rewritten(make_optimizer, job_description):
+    resume = DocumentParser.parse_docx(make_plain_docx([
+        "Jane Doe, jane@example.com",
+        "Senior engineer who built payment services in Python and Go",
+        "Led a team of four engineers running PostgreSQL in production",
+    ]))
+    assert [section.title for section in resume.sections] == ["Header"]
+    llm = FakeLLM()
+    optimizer = make_optimizer(llm, compactor=PromptCompactor())
+
+    result = await optimizer.optimize_resume(resume, job_description)
+
+    assert llm.calls == 1
+    assert PASSTHROUGH_CHANGE not in result.changes_made
+    assert result.optimized_resume.sections[0].content.startswith("OPTIMIZED")
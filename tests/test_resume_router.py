@@ -0,0 +1,366 @@
+import httpx
+import json
+import os
+import pytest
+from fastapi import FastAPI
+from unittest.mock import patch
+from app.api.resume_router import router
+from app.models.resume import BatchOptimizationResult, OptimizationResponse, Resume
+from app.utils.async_parser import AsyncDocumentParser
+from tests.documents import make_docx, make_pdf
+
+
+@pytest.fixture
+def optimization_payload():
+    return {
+        "resume": {
+            "sections": [{"title": "Experience", "content": "Wrote Python"}],
+            "raw_text": "Wrote Python",
+        },
+        "job_description": {"title": "Engineer", "description": "Python developer needed"},
+        "optimization_level": 0.5,
+    }
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def parse_sse(body):
+    events = []
+    for message in body.strip().split("\n\n"):
+        name, data = message.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_optimize_stream_emits_server_sent_events(client, optimization_payload):
+    class StreamingOptimizer:
+        async def stream_optimize_resume(self, resume, job_description, optimization_level, formatter):
+            yield {"event": "section_start", "index": 0, "title": "Experience"}
+            yield {"event": "token", "index": 0, "text": "Built"}
+            yield {"event": "done", "result": OptimizationResponse(
+                original_resume=resume, optimized_resume=resume,
+                changes_made=["Changed"], match_score=0.5
+            )}
+
+    with patch("app.api.resume_router.resume_optimizer", StreamingOptimizer()):
+        response = await client.post("/api/resume/optimize/stream", json=optimization_payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["section_start", "token", "done"]
+    assert events[1][1] == {"index": 0, "text": "Built"}
+    assert events[2][1]["result"]["match_score"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_optimize_stream_rejects_one_shot_mode(client, optimization_payload):
+    payload = {**optimization_payload, "mode": "one_shot"}
+    response = await client.post("/api/resume/optimize/stream", json=payload)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_optimize_batch_streams_ndjson(client, optimization_payload):
+    resume = Resume(sections=[], raw_text="")
+
+    class BatchOptimizer:
+        async def optimize_batch(self, resumes, job_descriptions, optimization_level, mode, formatter):
+            for index in reversed(range(len(job_descriptions))):
+                yield BatchOptimizationResult(
+                    index=index, resume_index=0, job_index=index,
+                    result=OptimizationResponse(
+                        original_resume=resume, optimized_resume=resume,
+                        changes_made=[], match_score=0.1 * index
+                    )
+                )
+
+    payload = {
+        "resume": optimization_payload["resume"],
+        "job_descriptions": [optimization_payload["job_description"]] * 2,
+    }
+    with patch("app.api.resume_router.resume_optimizer", BatchOptimizer()):
+        response = await client.post("/api/resume/optimize/batch", json=payload)
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.strip().split("\n")]
+    assert [line["index"] for line in lines] == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_optimize_batch_requires_one_side_single(client, optimization_payload):
+    payload = {
+        "resumes": [optimization_payload["resume"]],
+        "job_descriptions": [optimization_payload["job_description"]],
+    }
+    response = await client.post("/api/resume/optimize/batch", json=payload)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_optimize_batch_rejects_too_many_items(client, optimization_payload, monkeypatch):
+    monkeypatch.setattr("app.models.resume.BATCH_MAX_ITEMS", 2)
+    payload = {
+        "resume": optimization_payload["resume"],
+        "job_descriptions": [optimization_payload["job_description"]] * 3,
+    }
+    response = await client.post("/api/resume/optimize/batch", json=payload)
+    assert response.status_code == 422
+    assert "at most 2 items" in response.text
+
+
+@pytest.fixture
+def thread_parser():
+    parser = AsyncDocumentParser(executor_type="thread", max_workers=1)
+    with patch("app.api.resume_router.document_parser", parser):
+        yield parser
+    parser.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_upload_parses_docx(client, thread_parser):
+    content = make_docx([("Experience", ["Built Python services"])])
+    response = await client.post(
+        "/api/resume/upload",
+        files={"file": ("resume.docx", content, "application/octet-stream")}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sections"] == [{"title": "Experience", "content": "Built Python services"}]
+    assert body["metadata"] == {"file_type": "docx", "filename": "resume.docx", "size": len(content)}
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_unsupported_type(client, thread_parser):
+    response = await client.post(
+        "/api/resume/upload",
+        files={"file": ("resume.txt", b"plain text", "text/plain")}
+    )
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_upload_detects_type_by_content_and_spools_to_disk(client, thread_parser, monkeypatch):
+    monkeypatch.setattr("app.utils.uploads.UPLOAD_SPOOL_BYTES", 16)
+    parsed_paths = []
+    parse_path = thread_parser.parse_path
+
+    async def recording_parse_path(path, file_type):
+        parsed_paths.append(path)
+        return await parse_path(path, file_type)
+
+    monkeypatch.setattr(thread_parser, "parse_path", recording_parse_path)
+    content = make_pdf([["Jane Doe", "Python engineer"]])
+    response = await client.post(
+        "/api/resume/upload",
+        files={"file": ("upload.bin", content, "application/octet-stream")}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["raw_text"] == "Jane Doe\nPython engineer"
+    assert len(parsed_paths) == 1
+    # The spooled temp file is removed once parsing is done
+    assert not os.path.exists(parsed_paths[0])
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_oversized_file(client, thread_parser, monkeypatch):
+    monkeypatch.setattr("app.utils.uploads.UPLOAD_MAX_BYTES", 100)
+    response = await client.post(
+        "/api/resume/upload",
+        files={"file": ("resume.pdf", make_pdf([["x" * 200]]), "application/pdf")}
+    )
+    assert response.status_code == 413
+
+
+class CountingBody:
+    """A multipart request body sent in chunks, counting how many were read."""
+
+    def __init__(self, chunks=100, chunk_bytes=1024):
+        self.chunks = chunks
+        self.chunk_bytes = chunk_bytes
+        self.sent = 0
+
+    async def __aiter__(self):
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="r.pdf"\r\n\r\n'
+        for _ in range(self.chunks):
+            self.sent += 1
+            yield b"x" * self.chunk_bytes
+        yield b"\r\n--b--\r\n"
+
+
+@pytest.mark.asyncio
+async def test_upload_limit_applies_before_body_is_read(client, thread_parser, monkeypatch):
+    monkeypatch.setattr("app.utils.uploads.UPLOAD_MAX_BYTES", 10 * 1024)
+    monkeypatch.setattr("app.utils.uploads.MULTIPART_OVERHEAD_BYTES", 1024)
+    headers = {"content-type": "multipart/form-data; boundary=b"}
+
+    # A declared length over the limit is rejected without reading the body
+    body = CountingBody()
+    response = await client.post(
+        "/api/resume/upload", content=body, headers={**headers, "content-length": "200000"}
+    )
+    assert response.status_code == 413
+    assert body.sent == 0
+
+    # Without one, reading stops once the limit is passed
+    body = CountingBody()
+    response = await client.post("/api/resume/upload", content=body, headers=headers)
+    assert response.status_code == 413
+    assert body.sent <= 12
+
+
+@pytest.mark.asyncio
+async def test_upload_without_file_field_rejected(client, thread_parser):
+    response = await client.post("/api/resume/upload", files={"other": ("r.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_pdf_extension_with_other_content(client, thread_parser):
+    response = await client.post(
+        "/api/resume/upload",
+        files={"file": ("resume.pdf", b"PK\x03\x04 not really a zip", "application/pdf")}
+    )
+    assert response.status_code == 415
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    from app.services.job_queue import JobQueue
+
+    class InstantOptimizer:
+        async def optimize_resume(self, resume, job_description, optimization_level, mode, formatter):
+            return OptimizationResponse(
+                original_resume=resume, optimized_resume=resume,
+                changes_made=["Changed"], match_score=0.5
+            )
+
+    queue = JobQueue(InstantOptimizer(), path=str(tmp_path / "jobs.db"), workers=1, max_depth=1)
+    with patch("app.api.resume_router.job_queue", queue):
+        yield queue
+
+
+@pytest.mark.asyncio
+async def test_optimize_job_is_accepted_and_polled(client, job_queue, optimization_payload):
+    response = await client.post("/api/resume/optimize/jobs", json=optimization_payload)
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert response.headers["location"].endswith(f"/api/resume/optimize/jobs/{job['job_id']}")
+
+    await job_queue._queue.join()
+    polled = await client.get(f"/api/resume/optimize/jobs/{job['job_id']}")
+    await job_queue.stop()
+
+    assert polled.status_code == 200
+    assert polled.json()["status"] == "succeeded"
+    assert polled.json()["result"]["changes_made"] == ["Changed"]
+
+
+@pytest.mark.asyncio
+async def test_optimize_job_rejected_when_queue_full(client, job_queue, optimization_payload):
+    job_queue.max_depth = 0
+
+    response = await client.post("/api/resume/optimize/jobs", json=optimization_payload)
+    await job_queue.stop()
+
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_returns_404(client, job_queue):
+    response = await client.get("/api/resume/optimize/jobs/missing")
+    await job_queue.stop()
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_optimize_includes_stage_timings_on_request(client, optimization_payload, monkeypatch):
+    from app.services.fake_llm import FakeChatModel
+    from app.services.job_index import JobIndex
+    from app.services.llm_cache import LLMCache
+    from app.services.resume_optimizer import ResumeOptimizer
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    optimizer = ResumeOptimizer(cache=LLMCache(max_entries=0), job_index=JobIndex(max_entries=0))
+    optimizer.llm = FakeChatModel(latency_ms=0, tokens_per_second=0)
+    optimization_payload["resume"]["sections"][0]["content"] = (
+        "Wrote Python services for payments and ran PostgreSQL clusters in production"
+    )
+
+    with patch("app.api.resume_router.resume_optimizer", optimizer):
+        plain = await client.post("/api/resume/optimize", json=optimization_payload)
+        timed = await client.post(
+            "/api/resume/optimize", json={**optimization_payload, "include_timings": True}
+        )
+
+    assert plain.json()["timings"] is None
+    timings = timed.json()["timings"]
+    assert {"optimize", "optimize_section", "format_local", "match_score"} <= set(timings)
+
+
+class EchoOptimizer:
+    async def optimize_resume(self, resume, job_description, optimization_level, mode, formatter):
+        return OptimizationResponse(
+            original_resume=resume, optimized_resume=resume, changes_made=["Changed"], match_score=0.5
+        )
+
+
+@pytest.mark.asyncio
+async def test_optimize_returns_only_requested_fields(client, optimization_payload):
+    with patch("app.api.resume_router.resume_optimizer", EchoOptimizer()):
+        sections = await client.post("/api/resume/optimize", json={
+            **optimization_payload, "fields": ["optimized_resume.sections.content", "match_score"]
+        })
+        without_original = await client.post("/api/resume/optimize", json={
+            **optimization_payload, "exclude_fields": ["original_resume"], "compact": True
+        })
+
+    assert sections.json() == {
+        "optimized_resume": {"sections": [{"content": "Wrote Python"}]}, "match_score": 0.5
+    }
+    body = without_original.json()
+    assert "original_resume" not in body
+    # Null and default fields are left out too
+    assert "match_details" not in body and "tokens_saved" not in body
+    assert body["optimized_resume"]["raw_text"] == "Wrote Python"
+
+
+@pytest.mark.asyncio
+async def test_unknown_response_field_rejected(client, optimization_payload):
+    response = await client.post(
+        "/api/resume/optimize", json={**optimization_payload, "fields": ["optimized_resume.bogus"]}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_optimize_batch_trims_results(client, optimization_payload):
+    class BatchOptimizer:
+        async def optimize_batch(self, resumes, job_descriptions, optimization_level, mode, formatter):
+            response = await EchoOptimizer().optimize_resume(resumes[0], None, 0.5, mode, formatter)
+            yield BatchOptimizationResult(index=0, resume_index=0, job_index=0, result=response)
+
+    payload = {
+        "resume": optimization_payload["resume"],
+        "job_descriptions": [optimization_payload["job_description"]],
+        "fields": ["match_score"],
+        "compact": True,
+    }
+    with patch("app.api.resume_router.resume_optimizer", BatchOptimizer()):
+        response = await client.post("/api/resume/optimize/batch", json=payload)
+
+    assert json.loads(response.text) == {
+        "index": 0, "resume_index": 0, "job_index": 0, "result": {"match_score": 0.5}
+    }
@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from app.utils.metrics import SINGLE_FLIGHT_CALLS
+from app.utils.single_flight import SingleFlight
+
+
+class Call:
+    def __init__(self, result="done", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test_share")
+    call = Call()
+    callers = [asyncio.create_task(flight.do("key", call)) for _ in range(4)]
+    other = asyncio.create_task(flight.do("other", Call("other-result").__call__))
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await asyncio.gather(*callers) == ["done"] * 4
+    assert call.calls == 1
+    assert flight.coalescing_ratio == 3 / 5
+    assert SINGLE_FLIGHT_CALLS.value(stage="test_share", result="coalesced") == 3
+    assert flight.in_flight == 1
+    other.cancel()
+    await asyncio.gather(other, return_exceptions=True)
+
+    # Finished calls are not remembered
+    again = Call("again")
+    again.release.set()
+    assert await flight.do("key", again) == "again"
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_every_caller():
+    flight = SingleFlight("test_error")
+    call = Call(error=RuntimeError("LLM unavailable"))
+    callers = [asyncio.create_task(flight.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    call.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert call.calls == 1
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test_cancel_one")
+    call = Call()
+    leader = asyncio.create_task(flight.do("key", call))
+    follower = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await follower == "done"
+    assert leader.cancelled()
+    assert not call.cancelled
+
+
+@pytest.mark.asyncio
+async def test_call_cancelled_once_every_caller_is_gone():
+    flight = SingleFlight("test_cancel_all")
+    call = Call()
+    callers = [asyncio.create_task(flight.do("key", call)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert call.cancelled
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_new_caller_does_not_join_a_cancelled_call():
+    flight = SingleFlight("test_cancel_cleanup")
+    cleanup = asyncio.Event()
+
+    async def slow_cleanup():
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await cleanup.wait()
+
+    caller = asyncio.create_task(flight.do("key", slow_cleanup))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.gather(caller, return_exceptions=True)
+
+    # The cancelled call is still running its cleanup, which ends shortly
+    asyncio.get_running_loop().call_later(0.01, cleanup.set)
+    fresh = Call("fresh")
+    fresh.release.set()
+    assert await flight.do("key", fresh) == "fresh"
+    assert fresh.calls == 1
+    await asyncio.sleep(0.02)